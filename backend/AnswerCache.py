@@ -0,0 +1,143 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """
+    Semantic cache for direct answers. Questions are embedded and a new
+    question is answered from the cache when a previous one is similar enough.
+    Entries expire after a TTL and are evicted in LRU order.
+    """
+
+    def __init__(self,
+                 embedding_function: Callable[[List[str]], List],
+                 similarity_threshold: float = 0.92,
+                 ttl_seconds: float = 24 * 3600,
+                 max_entries: int = 256,
+                 clock=None):
+        """
+        Initialize SemanticAnswerCache.
+
+        Args:
+            embedding_function: Callable mapping a list of texts to embeddings
+            similarity_threshold: Minimum cosine similarity for a cache hit
+            ttl_seconds: Time to live of a cached answer
+            max_entries: Maximum number of cached answers (LRU eviction)
+            clock: Callable returning the current timestamp for the TTL (defaults to time.time)
+        """
+        self.embedding_function = embedding_function
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock or time.time
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Embed and L2-normalize a question."""
+        embedding = np.asarray(self.embedding_function([text])[0], dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding = embedding / norm
+        return embedding
+
+    def _evict_expired(self, now: float):
+        """Drop entries older than the TTL. Caller must hold the lock."""
+        expired = [
+            key for key, entry in self._entries.items()
+            if now - entry["created_at"] > self.ttl_seconds
+        ]
+        for key in expired:
+            del self._entries[key]
+
+    def lookup(self, question: str) -> Dict:
+        """
+        Look up a cached answer for a question.
+
+        Args:
+            question: User question
+
+        Returns:
+            Dict with the cached answer, the matched question and its
+            similarity. On a miss "answer" is None and the question embedding
+            is returned under "embedding" so it can be reused by store().
+        """
+        embedding = self._embed(question)
+        now = self.clock()
+
+        with self._lock:
+            self._evict_expired(now)
+
+            if self._entries:
+                keys = list(self._entries.keys())
+                matrix = np.stack([self._entries[key]["embedding"] for key in keys])
+                similarities = matrix @ embedding
+                best = int(np.argmax(similarities))
+
+                if similarities[best] >= self.similarity_threshold:
+                    key = keys[best]
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    entry = self._entries[key]
+                    return {
+                        "answer": entry["answer"],
+                        "question": entry["question"],
+                        "similarity": float(similarities[best])
+                    }
+
+            self.misses += 1
+
+        return {"answer": None, "embedding": embedding}
+
+    def store(self, question: str, answer: str, embedding: Optional[np.ndarray] = None):
+        """
+        Store an answer in the cache.
+
+        Args:
+            question: User question
+            answer: Generated answer
+            embedding: Precomputed normalized question embedding (optional)
+        """
+        if embedding is None:
+            embedding = self._embed(question)
+
+        with self._lock:
+            key = uuid.uuid4().hex
+            self._entries[key] = {
+                "question": question,
+                "answer": answer,
+                "embedding": embedding,
+                "created_at": self.clock()
+            }
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached answers."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache hit/miss metrics.
+
+        Returns:
+            Dict with hit/miss counts, hit rate and current size
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries)
+            }
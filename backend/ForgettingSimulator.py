@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import threading
+import time
+from typing import Dict, List
+import numpy as np
+
+import chromadb
+from MemoryRanker import MemoryRanker, SECONDS_PER_DAY
+
+# Rough on-disk size of one text memory in Chroma: a 384-d float32
+# embedding, its HNSW links, the document, the metadata and SQLite overhead.
+# Calibrate against a real store with measure_bytes_per_memory.
+DEFAULT_BYTES_PER_MEMORY = 4096
+
+
+class SimulatedClock:
+    """
+    Manually advanced clock to pass as MemoryBank(clock=...).
+
+    Lets a real bank, its sweeper and its background jobs see months of
+    forgetting in seconds instead of patching timestamps.
+    """
+
+    def __init__(self, start: float = None):
+        """
+        Initialize SimulatedClock.
+
+        Args:
+            start: Initial timestamp (defaults to time.time())
+        """
+        self.now = time.time() if start is None else start
+        self._lock = threading.Lock()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float = 0.0, days: float = 0.0) -> float:
+        """
+        Move the clock forward.
+
+        Args:
+            seconds: Seconds to advance
+            days: Days to advance
+
+        Returns:
+            The new timestamp
+        """
+        with self._lock:
+            self.now += seconds + days * SECONDS_PER_DAY
+            return self.now
+
+
+def measure_bytes_per_memory(persist_directory: str) -> float:
+    """
+    Average on-disk bytes per stored memory of an existing memory store.
+
+    Args:
+        persist_directory: Memory storage directory, e.g. ./memory_storage
+
+    Returns:
+        Directory size divided by the number of records in all collections
+    """
+    client = chromadb.PersistentClient(path=persist_directory)
+    records = sum(collection.count() for collection in client.list_collections())
+    size = sum(
+        os.path.getsize(os.path.join(directory, name))
+        for directory, _, names in os.walk(persist_directory) for name in names
+    )
+    return size / records if records else float(DEFAULT_BYTES_PER_MEMORY)
+
+
+def simulate_forgetting(n_users: int = 100,
+                        days: float = 180.0,
+                        memories_per_user_per_day: float = 20.0,
+                        retrievals_per_user_per_day: float = 20.0,
+                        results_per_retrieval: int = 3,
+                        recall_bias: float = 1.0,
+                        default_memory_strength: float = 1.0,
+                        threshold: float = 0.1,
+                        step_hours: float = 6.0,
+                        bytes_per_memory: float = DEFAULT_BYTES_PER_MEMORY,
+                        seed: int = 0) -> Dict:
+    """
+    Replay synthetic activity over simulated time with the bank's forgetting rules.
+
+    Every memory is a row of numpy arrays, so a step costs a few vector
+    operations over the live memories. Each step writes new memories with
+    default_memory_strength, applies retrievals (each returned memory gets
+    +1 strength and a fresh last access time, as in
+    MemoryBank._update_memory_strength) and deletes memories whose
+    retention fell below the threshold, as the sweeper does. Retrievals
+    pick memories with probability proportional to retention**recall_bias,
+    a stand-in for the similarity and retention blend of the ranker; users
+    are alike, so they are pooled.
+
+    Args:
+        n_users: Number of users
+        days: Simulated days
+        memories_per_user_per_day: New memories per user and day
+        retrievals_per_user_per_day: Retrievals per user and day
+        results_per_retrieval: Memories returned (and strengthened) per retrieval
+        recall_bias: 0 picks retrieved memories uniformly, higher values
+            favour well-retained memories
+        default_memory_strength: Initial strength S (days) of new memories
+        threshold: Retention below which memories are deleted (0 disables cleanup)
+        step_hours: Simulated hours per step
+        bytes_per_memory: Storage per memory used for the size estimates
+        seed: Random seed
+
+    Returns:
+        Dict with the final memory count, created/deleted/access totals, a
+        daily series of counts, storage and retention percentiles, the final
+        retention histogram and the steady growth rate in memories and bytes
+    """
+    rng = np.random.default_rng(seed)
+    ranker = MemoryRanker(forgetting_enabled=True)
+    step_seconds = step_hours * 3600
+    steps = int(round(days * SECONDS_PER_DAY / step_seconds))
+    now = 0.0
+
+    last_access = np.zeros(0, dtype=np.float64)
+    strength = np.zeros(0, dtype=np.float64)
+    created = deleted = accesses = 0
+    daily = []
+    next_day = 0.0
+
+    for _ in range(steps):
+        now += step_seconds
+
+        # New memories, written at random times within the step
+        new = rng.poisson(n_users * memories_per_user_per_day * step_seconds / SECONDS_PER_DAY)
+        if new:
+            last_access = np.concatenate([last_access, now - rng.random(new) * step_seconds])
+            strength = np.concatenate([strength, np.full(new, default_memory_strength)])
+            created += new
+
+        # Retrievals strengthen the memories they return
+        retention = ranker.retention(last_access, strength, now)
+        picks = rng.poisson(n_users * retrievals_per_user_per_day * step_seconds / SECONDS_PER_DAY) * results_per_retrieval
+        if picks and len(retention):
+            weights = retention ** recall_bias if recall_bias else np.ones_like(retention)
+            total = weights.sum()
+            if total > 0:
+                accessed = np.unique(rng.choice(len(weights), size=picks, p=weights / total))
+                strength[accessed] += 1.0
+                last_access[accessed] = now
+                retention[accessed] = 1.0
+                accesses += len(accessed)
+
+        # Sweep
+        if threshold > 0:
+            alive = retention >= threshold
+            deleted += int(len(alive) - alive.sum())
+            last_access = last_access[alive]
+            strength = strength[alive]
+            retention = retention[alive]
+
+        if now >= next_day:
+            percentiles = np.percentile(retention, [10, 50, 90]) if len(retention) else np.zeros(3)
+            daily.append({
+                "day": round(now / SECONDS_PER_DAY, 3),
+                "memories": int(len(retention)),
+                "storage_bytes": float(len(retention) * bytes_per_memory),
+                "retention_p10": float(percentiles[0]),
+                "retention_p50": float(percentiles[1]),
+                "retention_p90": float(percentiles[2]),
+                "mean_strength": float(strength.mean()) if len(strength) else 0.0
+            })
+            next_day += SECONDS_PER_DAY
+
+    # Growth over the last quarter of the run (the warm-up is excluded)
+    tail = daily[-max(2, len(daily) // 4):]
+    growth = float(np.polyfit(
+        [point["day"] for point in tail], [point["memories"] for point in tail], 1
+    )[0]) if len(tail) >= 2 else 0.0
+
+    retention = ranker.retention(last_access, strength, now)
+    counts, edges = np.histogram(retention, bins=10, range=(0.0, 1.0))
+    return {
+        "default_memory_strength": default_memory_strength,
+        "threshold": threshold,
+        "memories": int(len(retention)),
+        "storage_bytes": float(len(retention) * bytes_per_memory),
+        "created": int(created),
+        "deleted": int(deleted),
+        "accesses": int(accesses),
+        "growth_memories_per_day": growth,
+        "growth_bytes_per_day": growth * bytes_per_memory,
+        "projected_storage_bytes_1y": float(len(retention) + max(growth, 0.0) * 365) * bytes_per_memory,
+        "retention_histogram": {"edges": edges.tolist(), "counts": counts.tolist()},
+        "daily": daily
+    }
+
+
+def plan_capacity(strengths: List[float], thresholds: List[float], **kwargs) -> List[Dict]:
+    """
+    Run simulate_forgetting for every strength and threshold combination.
+
+    Args:
+        strengths: default_memory_strength values to compare
+        thresholds: Cleanup thresholds to compare
+        **kwargs: Remaining simulate_forgetting arguments, shared by all runs
+
+    Returns:
+        One simulate_forgetting result per combination
+    """
+    return [
+        simulate_forgetting(default_memory_strength=strength, threshold=threshold, **kwargs)
+        for strength in strengths for threshold in thresholds
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate memory growth and retention under the forgetting curve")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--days", type=float, default=180.0)
+    parser.add_argument("--memories-per-day", type=float, default=20.0, help="New memories per user and day")
+    parser.add_argument("--retrievals-per-day", type=float, default=20.0, help="Retrievals per user and day")
+    parser.add_argument("--results-per-retrieval", type=int, default=3)
+    parser.add_argument("--recall-bias", type=float, default=1.0)
+    parser.add_argument("--strengths", type=float, nargs="+", default=[1.0], help="default_memory_strength values")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.1], help="Cleanup thresholds (0 = never)")
+    parser.add_argument("--step-hours", type=float, default=6.0)
+    parser.add_argument("--bytes-per-memory", type=float, default=DEFAULT_BYTES_PER_MEMORY)
+    parser.add_argument("--calibrate", help="Memory storage directory to measure bytes per memory from")
+    parser.add_argument("--daily", action="store_true", help="Include the daily series in the output")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    bytes_per_memory = measure_bytes_per_memory(args.calibrate) if args.calibrate else args.bytes_per_memory
+    start_time = time.time()
+    results = plan_capacity(
+        args.strengths,
+        args.thresholds,
+        n_users=args.users,
+        days=args.days,
+        memories_per_user_per_day=args.memories_per_day,
+        retrievals_per_user_per_day=args.retrievals_per_day,
+        results_per_retrieval=args.results_per_retrieval,
+        recall_bias=args.recall_bias,
+        step_hours=args.step_hours,
+        bytes_per_memory=bytes_per_memory,
+        seed=args.seed
+    )
+    if not args.daily:
+        for result in results:
+            result.pop("daily")
+
+    print(json.dumps({
+        "bytes_per_memory": bytes_per_memory,
+        "seconds": time.time() - start_time,
+        "runs": results
+    }, indent=2))
@@ -0,0 +1,275 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+_KINDS = ("conversations", "emotional_images")
+
+
+class _UserTier:
+    """Recent memories of one user and kind, with a contiguous normalized embedding matrix."""
+
+    def __init__(self, ids, documents, metadatas, embeddings, complete: bool):
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = list(metadatas)
+        self.matrix = _normalize(embeddings) if self.ids else np.zeros((0, 0), dtype=np.float32)
+        self.positions = {item_id: i for i, item_id in enumerate(self.ids)}
+        # True when the tier holds every memory the user has of this kind
+        self.complete = complete
+        self.last_used = time.time()
+
+
+def _normalize(embeddings) -> np.ndarray:
+    matrix = np.array(embeddings, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+class HotMemoryTier:
+    """
+    In-process tier holding the most recent memories of each active user.
+
+    A user's recent conversations or emotional images are loaded on first
+    retrieval and searched with one matrix-vector product instead of a
+    Chroma query. Writes made through the bank are appended, strength
+    updates are patched in, and users idle for longer than idle_seconds are
+    evicted. When the tier holds all of a user's memories its results are
+    exact; otherwise they are only used when they are close enough to the
+    query, and the caller falls back to Chroma.
+    """
+
+    def __init__(self,
+                 max_items_per_user: int = 500,
+                 max_users: int = 256,
+                 idle_seconds: float = 900.0,
+                 min_similarity: float = 0.5):
+        """
+        Initialize HotMemoryTier.
+
+        Args:
+            max_items_per_user: Most recent memories kept per user and kind
+            max_users: Maximum number of (user, kind) entries kept
+            idle_seconds: Entries unused for this long are evicted
+            min_similarity: When the tier holds only part of a user's memories,
+                the weakest of the top results must be at least this similar
+                to the query for the tier to answer
+        """
+        self.max_items_per_user = max_items_per_user
+        self.max_users = max_users
+        self.idle_seconds = idle_seconds
+        self.min_similarity = min_similarity
+
+        self._entries = OrderedDict()
+        # Loads in flight per key, and a generation bumped by writes and
+        # invalidations meanwhile, so a load that raced a write is not kept.
+        # Both only exist while a load of the key is running.
+        self._loading = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = {kind: 0 for kind in _KINDS}
+        self.fallbacks = {kind: 0 for kind in _KINDS}
+        self.loads = 0
+        self.evictions = 0
+        self.search_seconds = 0.0
+        self.searches = 0
+
+    def _evict(self, now: float):
+        """Drop idle and least recently used entries. Caller must hold the lock."""
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_users and now - entry.last_used < self.idle_seconds:
+                break
+            del self._entries[key]
+            self.evictions += 1
+
+    def _get(self, kind: str, user_id: str, loader: Callable) -> _UserTier:
+        key = (user_id, kind)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.last_used = time.time()
+                return entry
+            self._loading[key] = self._loading.get(key, 0) + 1
+            generation = self._generations.get(key, 0)
+
+        try:
+            ids, documents, metadatas, embeddings, complete = loader(self.max_items_per_user)
+            entry = _UserTier(ids, documents, metadatas, embeddings, complete)
+        except Exception:
+            with self._lock:
+                self._finish_load(key)
+            raise
+
+        with self._lock:
+            self.loads += 1
+            if generation == self._generations.get(key, 0):
+                self._entries[key] = entry
+                self._evict(time.time())
+            self._finish_load(key)
+        return entry
+
+    def _finish_load(self, key):
+        """Forget the generation of a key once no load of it is running. Caller must hold the lock."""
+        self._loading[key] -= 1
+        if not self._loading[key]:
+            del self._loading[key]
+            self._generations.pop(key, None)
+
+    def _bump(self, key):
+        """Make running loads of a key discard their result. Caller must hold the lock."""
+        if key in self._loading:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def search(self,
+               kind: str,
+               user_id: str,
+               query_embedding,
+               requested: int,
+               n_results: int,
+               loader: Callable) -> Optional[Dict]:
+        """
+        Search a user's recent memories.
+
+        Args:
+            kind: "conversations" or "emotional_images"
+            user_id: User ID
+            query_embedding: Query embedding in the kind's space
+            requested: Number of candidates to return
+            n_results: Number of results the caller will keep
+            loader: Called with max_items_per_user on a miss; returns ids,
+                documents, metadatas, embeddings and whether that is all of
+                the user's memories
+
+        Returns:
+            Dict with ids, documents, metadatas and cosine distances of the
+            closest candidates, or None when Chroma must be queried instead
+        """
+        entry = self._get(kind, user_id, loader)
+
+        start_time = time.time()
+        with self._lock:
+            if entry.ids:
+                query = _normalize(query_embedding)[0]
+                similarities = entry.matrix @ query
+                top = np.argsort(-similarities)[:requested]
+            else:
+                similarities = np.zeros(0, dtype=np.float32)
+                top = []
+
+            sufficient = entry.complete or (
+                len(top) >= n_results and similarities[top[n_results - 1]] >= self.min_similarity
+            )
+            result = {
+                "ids": [entry.ids[i] for i in top],
+                "documents": [entry.documents[i] for i in top],
+                "metadatas": [entry.metadatas[i] for i in top],
+                "distances": [float(1.0 - similarities[i]) for i in top]
+            } if sufficient else None
+
+            self.search_seconds += time.time() - start_time
+            self.searches += 1
+            if sufficient:
+                self.hits[kind] += 1
+            else:
+                self.fallbacks[kind] += 1
+        return result
+
+    def add(self, kind: str, user_id: str, ids: List[str], documents: List[str], metadatas: List[Dict], embeddings):
+        """
+        Append newly written memories of a user (no-op if the user is not loaded).
+
+        Args:
+            kind: "conversations" or "emotional_images"
+            user_id: User ID
+            ids: Memory IDs
+            documents: Their documents
+            metadatas: Their metadata
+            embeddings: Their embeddings
+        """
+        key = (user_id, kind)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._bump(key)
+                return
+
+            rows = _normalize(embeddings)
+            for item_id, document, metadata, row in zip(ids, documents, metadatas, rows):
+                position = entry.positions.get(item_id)
+                if position is not None:
+                    # Replayed write
+                    entry.documents[position] = document
+                    entry.metadatas[position] = metadata
+                    entry.matrix[position] = row
+                    continue
+                entry.positions[item_id] = len(entry.ids)
+                entry.ids.append(item_id)
+                entry.documents.append(document)
+                entry.metadatas.append(metadata)
+                entry.matrix = np.vstack([entry.matrix, row[None, :]]) if entry.matrix.size else row[None, :].copy()
+
+            # Keep only the most recent items
+            overflow = len(entry.ids) - self.max_items_per_user
+            if overflow > 0:
+                entry.ids = entry.ids[overflow:]
+                entry.documents = entry.documents[overflow:]
+                entry.metadatas = entry.metadatas[overflow:]
+                entry.matrix = entry.matrix[overflow:].copy()
+                entry.positions = {item_id: i for i, item_id in enumerate(entry.ids)}
+                entry.complete = False
+
+    def update_metadata(self, kind: str, user_id: str, ids: List[str], metadatas: List[Dict]):
+        """Patch the metadata of cached memories after a strength update."""
+        with self._lock:
+            entry = self._entries.get((user_id, kind))
+            if entry is None:
+                return
+            for item_id, metadata in zip(ids, metadatas):
+                position = entry.positions.get(item_id)
+                if position is not None:
+                    entry.metadatas[position] = metadata
+
+    def invalidate(self, user_id: str, kind: str = None):
+        """
+        Drop a user's cached memories (after deletes).
+
+        Args:
+            user_id: User ID
+            kind: Kind to drop, or None for all kinds
+        """
+        with self._lock:
+            for cached_kind in (_KINDS if kind is None else (kind,)):
+                key = (user_id, cached_kind)
+                self._bump(key)
+                self._entries.pop(key, None)
+
+    def get_stats(self) -> Dict:
+        """
+        Get tier metrics.
+
+        Returns:
+            Dict with per-kind hits, fallbacks and hit rate, loaded entries,
+            cached items, evictions and the mean search latency
+        """
+        with self._lock:
+            self._evict(time.time())
+            stats = {
+                "entries": len(self._entries),
+                "items": sum(len(entry.ids) for entry in self._entries.values()),
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "mean_search_ms": self.search_seconds * 1000 / self.searches if self.searches else 0.0
+            }
+            for kind in _KINDS:
+                total = self.hits[kind] + self.fallbacks[kind]
+                stats[kind] = {
+                    "hits": self.hits[kind],
+                    "fallbacks": self.fallbacks[kind],
+                    "hit_rate": self.hits[kind] / total if total else 0.0
+                }
+            return stats
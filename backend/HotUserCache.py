@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+_FIELDS = ("portrait", "summaries")
+
+
+class HotUserCache:
+    """
+    In-process cache of rarely changing per-user state (portrait and event
+    summaries) read on every turn. Entries are replaced or invalidated by the
+    MemoryBank methods that write that state, and whole users are evicted in
+    LRU order once max_users is reached.
+    """
+
+    def __init__(self, max_users: int = 256):
+        """
+        Initialize HotUserCache.
+
+        Args:
+            max_users: Maximum number of users kept in the cache
+        """
+        self.max_users = max_users
+
+        self._users = OrderedDict()
+        # Bumped on every invalidation, so a read that raced a write is not cached
+        self._generations = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = {field: 0 for field in _FIELDS}
+        self.misses = {field: 0 for field in _FIELDS}
+        self.evictions = 0
+
+    def get(self, user_id: str, field: str) -> Tuple[bool, object]:
+        """
+        Look up a cached value.
+
+        Args:
+            user_id: User ID
+            field: "portrait" or "summaries"
+
+        Returns:
+            (found, value); value may be None when "no value" itself is cached
+        """
+        with self._lock:
+            state = self._users.get(user_id)
+            if state is not None and field in state:
+                self._users.move_to_end(user_id)
+                self.hits[field] += 1
+                return True, state[field]
+            self.misses[field] += 1
+            return False, None
+
+    def generation(self, user_id: str) -> int:
+        """Current invalidation generation of a user, taken before loading from the store."""
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def put(self, user_id: str, field: str, value, generation: int = None):
+        """
+        Cache a value (write-through from the bank's writes, or after a read).
+
+        Args:
+            user_id: User ID
+            field: "portrait" or "summaries"
+            value: Value to cache
+            generation: Generation taken before the value was read; the value is
+                dropped if the user was invalidated since
+        """
+        with self._lock:
+            if generation is not None and generation != self._generations.get(user_id, 0):
+                return
+            self._users.setdefault(user_id, {})[field] = value
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: str, field: str = None):
+        """
+        Drop cached state of a user.
+
+        Args:
+            user_id: User ID
+            field: Field to drop, or None for all of the user's state
+        """
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            state = self._users.get(user_id)
+            if state is None:
+                return
+            if field is None:
+                del self._users[user_id]
+            else:
+                state.pop(field, None)
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache metrics.
+
+        Returns:
+            Dict with per-field hits, misses and hit rate, cached users and evictions
+        """
+        with self._lock:
+            stats = {"cached_users": len(self._users), "evictions": self.evictions}
+            for field in _FIELDS:
+                total = self.hits[field] + self.misses[field]
+                stats[field] = {
+                    "hits": self.hits[field],
+                    "misses": self.misses[field],
+                    "hit_rate": self.hits[field] / total if total else 0.0
+                }
+            return stats
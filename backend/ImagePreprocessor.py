@@ -0,0 +1,168 @@
+import base64
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from PIL import Image
+
+# llava:7b uses a CLIP ViT-L/14 vision tower at 336x336, anything bigger is
+# downsampled by the model anyway
+DEFAULT_TARGET_SIZE = 336
+DEFAULT_JPEG_QUALITY = 85
+
+
+def perceptual_hash(image: Image.Image, hash_size: int = 8) -> int:
+    """
+    Compute a difference hash (dHash) of an image.
+
+    The image is reduced to a (hash_size + 1) x hash_size grayscale thumbnail
+    and each bit records whether a pixel is brighter than its right neighbour,
+    so small changes in noise, compression or lighting barely move the hash.
+
+    Returns:
+        The hash as an integer of hash_size * hash_size bits
+    """
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = list(small.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    """Number of differing bits between two perceptual hashes."""
+    return bin(hash_a ^ hash_b).count("1")
+
+
+class ImagePreprocessor:
+    """
+    Prepares camera frames before they are sent to the vision model or stored
+    in memory: downsizes to the model input size, re-encodes as JPEG and caches
+    the encoded payload by content hash.
+    """
+
+    def __init__(self,
+                 target_size: int = DEFAULT_TARGET_SIZE,
+                 jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+                 cache_size: int = 32):
+        """
+        Initialize ImagePreprocessor.
+
+        Args:
+            target_size: Longest side (in pixels) of the prepared image
+            jpeg_quality: JPEG quality used when re-encoding
+            cache_size: Maximum number of prepared images kept in the cache
+        """
+        self.target_size = target_size
+        self.jpeg_quality = jpeg_quality
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.original_bytes = 0
+        self.prepared_bytes = 0
+
+    def prepare(self, image_path: str) -> Optional[Dict]:
+        """
+        Prepare an image from disk.
+
+        Args:
+            image_path: Path to the uploaded image
+
+        Returns:
+            Dict with the resized PIL image, JPEG bytes, base64 payload,
+            content hash and perceptual hash, or None if the image could not
+            be read
+        """
+        try:
+            with open(image_path, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            print(f"Error reading image {image_path}: {e}")
+            return None
+
+        return self.prepare_bytes(raw)
+
+    def prepare_bytes(self, raw: bytes) -> Optional[Dict]:
+        """
+        Prepare an image from its raw encoded bytes.
+
+        Args:
+            raw: Encoded image bytes (PNG, JPEG, ...)
+
+        Returns:
+            Prepared image dict, or None if the bytes are not a valid image
+        """
+        content_hash = hashlib.sha256(raw).hexdigest()
+
+        with self._lock:
+            cached = self._cache.get(content_hash)
+            if cached is not None:
+                self._cache.move_to_end(content_hash)
+                self.hits += 1
+                return cached
+
+        try:
+            image = Image.open(io.BytesIO(raw))
+            image = image.convert("RGB")
+            image.thumbnail((self.target_size, self.target_size), Image.LANCZOS)
+
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=self.jpeg_quality, optimize=True)
+            jpeg_bytes = buffer.getvalue()
+        except Exception as e:
+            print(f"Error preparing image: {e}")
+            return None
+
+        prepared = {
+            "content_hash": content_hash,
+            "perceptual_hash": perceptual_hash(image),
+            "image": image,
+            "jpeg_bytes": jpeg_bytes,
+            "base64": base64.b64encode(jpeg_bytes).decode("utf-8"),
+            "original_size": len(raw),
+            "prepared_size": len(jpeg_bytes)
+        }
+
+        with self._lock:
+            self.misses += 1
+            self.original_bytes += len(raw)
+            self.prepared_bytes += len(jpeg_bytes)
+
+            self._cache[content_hash] = prepared
+            self._cache.move_to_end(content_hash)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return prepared
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache and payload size metrics.
+
+        Returns:
+            Dict with hit/miss counts and byte totals
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "cached_items": len(self._cache),
+                "original_bytes": self.original_bytes,
+                "prepared_bytes": self.prepared_bytes,
+                "compression_ratio": (
+                    self.original_bytes / self.prepared_bytes if self.prepared_bytes else 0.0
+                )
+            }
@@ -0,0 +1,196 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from typing import Dict, Iterable
+from PIL import Image
+
+DEFAULT_THUMBNAIL_SIZE = 128
+
+
+class ImageStore:
+    """
+    Content-addressed store for emotional images.
+
+    Files are named by the SHA-256 of their JPEG bytes (root/ab/abcd....jpg),
+    so identical frames are stored once however many memories point at them.
+    A small JPEG thumbnail is kept next to every image for previews. Files
+    no memory points at any more are removed with remove().
+    """
+
+    def __init__(self,
+                 root: str = "./images",
+                 thumbnail_size: int = DEFAULT_THUMBNAIL_SIZE,
+                 jpeg_quality: int = 85,
+                 grace_seconds: float = 600.0):
+        """
+        Initialize ImageStore.
+
+        Args:
+            root: Directory holding the images and the thumbnails/ subdirectory
+            thumbnail_size: Longest side (in pixels) of the thumbnails
+            jpeg_quality: JPEG quality used when encoding images and thumbnails
+            grace_seconds: Files written or deduplicated more recently are never removed
+        """
+        self.root = root
+        self.thumbnail_root = os.path.join(root, "thumbnails")
+        self.thumbnail_size = thumbnail_size
+        self.jpeg_quality = jpeg_quality
+        self.grace_seconds = grace_seconds
+
+        self._lock = threading.Lock()
+        self._totals = None
+
+        # Metrics
+        self.stored = 0
+        self.deduplicated = 0
+        self.removed = 0
+
+    def _path(self, root: str, content_hash: str) -> str:
+        return os.path.join(root, content_hash[:2], f"{content_hash}.jpg")
+
+    def _write(self, path: str, data: bytes):
+        """Write a file atomically, so a crash never leaves a torn image."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def put(self, image: Image.Image = None, jpeg_bytes: bytes = None) -> Dict:
+        """
+        Store an image unless the same content is already stored.
+
+        Args:
+            image: PIL image (encoded as JPEG)
+            jpeg_bytes: Already encoded JPEG, used as is
+
+        Returns:
+            Dict with content_hash, path, thumbnail_path, bytes and whether it was new
+        """
+        if jpeg_bytes is None:
+            buffer = io.BytesIO()
+            image.convert("RGB").save(buffer, format="JPEG", quality=self.jpeg_quality)
+            jpeg_bytes = buffer.getvalue()
+
+        content_hash = hashlib.sha256(jpeg_bytes).hexdigest()
+        path = self._path(self.root, content_hash)
+        thumbnail_path = self._path(self.thumbnail_root, content_hash)
+
+        is_new = not os.path.exists(path)
+        if not is_new:
+            try:
+                # Marks the file as in use for remove() until its memory is stored
+                os.utime(path)
+            except FileNotFoundError:
+                is_new = True
+        thumbnail_bytes = 0
+        if is_new:
+            self._write(path, jpeg_bytes)
+
+            thumbnail = Image.open(io.BytesIO(jpeg_bytes)).convert("RGB")
+            thumbnail.thumbnail((self.thumbnail_size, self.thumbnail_size))
+            buffer = io.BytesIO()
+            thumbnail.save(buffer, format="JPEG", quality=self.jpeg_quality)
+            self._write(thumbnail_path, buffer.getvalue())
+            thumbnail_bytes = len(buffer.getvalue())
+
+        with self._lock:
+            if is_new:
+                self.stored += 1
+                if self._totals is not None:
+                    self._totals["files"] += 1
+                    self._totals["bytes"] += len(jpeg_bytes)
+                    self._totals["thumbnail_bytes"] += thumbnail_bytes
+            else:
+                self.deduplicated += 1
+
+        return {
+            "content_hash": content_hash,
+            "path": path,
+            "thumbnail_path": thumbnail_path,
+            "bytes": len(jpeg_bytes),
+            "new": is_new
+        }
+
+    def remove(self, paths: Iterable[str]) -> int:
+        """
+        Delete stored images and their thumbnails.
+
+        The caller makes sure no memory refers to them any more. Files
+        written or deduplicated within grace_seconds are kept, since a memory
+        pointing at them may still be on its way into Chroma.
+
+        Args:
+            paths: Image paths from put()
+
+        Returns:
+            Number of images deleted
+        """
+        removed = 0
+        for path in paths:
+            content_hash = os.path.basename(path)[:-len(".jpg")]
+            # Only files of this store
+            if os.path.abspath(path) != os.path.abspath(self._path(self.root, content_hash)):
+                continue
+            try:
+                if time.time() - os.path.getmtime(path) < self.grace_seconds:
+                    continue
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+
+            thumbnail_path = self._path(self.thumbnail_root, content_hash)
+            thumbnail_bytes = 0
+            try:
+                thumbnail_bytes = os.path.getsize(thumbnail_path)
+                os.remove(thumbnail_path)
+            except FileNotFoundError:
+                pass
+
+            removed += 1
+            with self._lock:
+                self.removed += 1
+                if self._totals is not None:
+                    self._totals["files"] -= 1
+                    self._totals["bytes"] -= size
+                    self._totals["thumbnail_bytes"] -= thumbnail_bytes
+        return removed
+
+    def _scan(self) -> Dict:
+        """Measure the files already on disk (once, then tracked incrementally)."""
+        totals = {"files": 0, "bytes": 0, "thumbnail_bytes": 0}
+        for directory, _, files in os.walk(self.root):
+            is_thumbnail = os.path.abspath(directory).startswith(os.path.abspath(self.thumbnail_root))
+            for name in files:
+                if not name.endswith(".jpg"):
+                    continue
+                size = os.path.getsize(os.path.join(directory, name))
+                if is_thumbnail:
+                    totals["thumbnail_bytes"] += size
+                else:
+                    totals["files"] += 1
+                    totals["bytes"] += size
+        return totals
+
+    def get_stats(self) -> Dict:
+        """
+        Get storage metrics.
+
+        Returns:
+            Dict with stored files, image and thumbnail bytes, and new,
+            deduplicated and removed images since startup
+        """
+        with self._lock:
+            if self._totals is None:
+                self._totals = self._scan()
+            return {
+                "files": self._totals["files"],
+                "bytes": self._totals["bytes"],
+                "thumbnail_bytes": self._totals["thumbnail_bytes"],
+                "stored": self.stored,
+                "deduplicated": self.deduplicated,
+                "removed": self.removed
+            }
@@ -1,25 +1,72 @@
 from crewai import Agent, Task, Crew
 from langchain_community.llms import Ollama
 from langchain.tools import Tool
-import base64
 import requests
 import os
+import re
 import threading
+import functools
 from typing import Dict, Any, List, Optional
 import json
+from collections import OrderedDict
 import time
 from datetime import datetime
-from PIL import Image
 from MemoryBank import MemoryBank
+from ImagePreprocessor import ImagePreprocessor, hamming_distance
+from AnswerCache import SemanticAnswerCache
+from MemoryWriter import get_memory_writer
+
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+
+# Question types whose direct answers do not depend on who is asking
+CACHEABLE_QUESTION_TYPES = {"factual", "location"}
+PERSONAL_WORDS = {
+    "i", "me", "my", "mine", "myself", "we", "our", "ours", "us",
+    "eu", "meu", "minha", "meus", "minhas", "comigo", "nós", "nosso", "nossa"
+}
+EMOTIONAL_WORDS = {
+    "feel", "feels", "feeling", "feelings", "felt", "emotion", "emotions", "emotional",
+    "mood", "moods", "happy", "happiness", "sad", "sadness", "angry", "anger", "upset",
+    "anxious", "anxiety", "lonely", "afraid", "scared", "stressed", "depressed",
+    "sinto", "sente", "sentindo", "emoção", "emoções", "humor", "feliz", "triste"
+}
+# Questions mentioning these are about the scene in front of the camera
+VISUAL_WORDS = {
+    "see", "seeing", "look", "looks", "looking", "image", "picture", "photo", "camera",
+    "this", "these", "that", "those", "here", "wearing", "holding", "color", "colour",
+    "room", "face", "seem", "seems", "appear", "appears", "background", "front",
+    "vê", "ver", "veja", "olha", "olhe", "imagem", "foto", "câmera", "isso", "isto", "aqui", "rosto"
+}
+# Frames within this many differing dHash bits (of 64) count as the same scene
+FRAME_CHANGE_THRESHOLD = 6
+# Seconds a previous visual analysis may be reused for an unchanged scene
+VISUAL_ANALYSIS_MAX_AGE = 300
+
+# Answers to these change over time and must never be served from the cache
+TIME_SENSITIVE_WORDS = {
+    "time", "today", "tonight", "now", "tomorrow", "yesterday", "date", "day",
+    "weather", "current", "currently", "latest", "news", "recent", "recently",
+    "hoje", "agora", "amanhã", "ontem", "hora", "horas", "data", "dia", "clima", "notícias"
+}
+
+def _question_words(question: str) -> set:
+    """Lowercase whole words of a question"""
+    return set(re.findall(r"\w+", question.lower()))
 
 class DualResponseContextualAnalyzer:
     def __init__(self, 
-                 ollama_base_url="http://localhost:11434",
+                 ollama_base_url=OLLAMA_BASE_URL,
                  memory_bank: Optional[MemoryBank] = None,
                  persist_directory: str = "./contextual_memory_storage"):
         self.ollama_base_url = ollama_base_url
         self.analysis_cache = {}
         self._lock = threading.Lock()
+        self.image_preprocessor = ImagePreprocessor()
+        
+        # Last analyzed frame per user, for visual analysis reuse
+        self.last_visual_analysis = OrderedDict()
+        self.max_tracked_users = 1024
+        self.visual_route_counts = {"analyze": 0, "reuse": 0, "skip": 0}
         
         # Initialize or use provided MemoryBank
         if memory_bank is None:
@@ -29,38 +76,40 @@ class DualResponseContextualAnalyzer:
             )
         else:
             self.memory_bank = memory_bank
+        
+        # Memory writes go through the bank's write-behind queue, off the response path
+        self.memory_writer = get_memory_writer(self.memory_bank)
+        
+        # Semantic cache for factual direct answers
+        self.answer_cache = SemanticAnswerCache(
+            # Shares the bank's query embedding LRU, so the question is encoded once per turn
+            embedding_function=lambda texts: [self.memory_bank.embed_query(text) for text in texts],
+            clock=self.memory_bank.clock
+        )
     
     def encode_image_to_base64(self, image_path: str) -> str:
-        """Encode image to base64"""
-        try:
-            with open(image_path, "rb") as f:
-                return base64.b64encode(f.read()).decode('utf-8')
-        except Exception as e:
+        """Encode image to base64, downsized to the vision model input size"""
+        prepared = self.image_preprocessor.prepare(image_path)
+        if prepared is None:
             return None
+        return prepared["base64"]
     
     def generate_direct_answer(self, user_question: str, user_id: str = "default_user") -> str:
         """Generate a direct answer to the user's question using text model"""
         try:
-            # Get memory context for personalized response
-            memory_context = self.memory_bank.get_prompt_context(user_id, user_question)
-            
-            # Create prompt for direct answer
-            direct_answer_prompt = f"""
-USER QUESTION: {user_question}
-
-USER CONTEXT (from memory):
-- User Name: {memory_context['user_name']}
-- Session: {memory_context['session_count']}
-- User Profile: {memory_context['user_portrait']}
-- Previous Interactions: {memory_context['memory_records'][:500]}...
-
-TASK: Provide a direct, helpful answer to the user's question. Consider their background and previous interactions to personalize your response. Be concise but informative.
-
-If this is a factual question (like "Where is France?"), provide the factual answer.
-If this is a personal question, consider their history and context.
-If this is a complex question, break it down clearly.
-
-DIRECT ANSWER:"""
+            # Factual questions can be answered from the semantic cache
+            cache_entry = None
+            if self._is_cacheable_question(user_question):
+                cache_entry = self.answer_cache.lookup(user_question)
+                if cache_entry["answer"] is not None:
+                    print(f"💾 Direct answer served from cache (similarity {cache_entry['similarity']:.2f})")
+                    return cache_entry["answer"]
+                
+                # Cached answers are shared between users, so they are
+                # generated without any user's memory in the prompt
+                direct_answer_prompt = self._create_factual_answer_prompt(user_question)
+            else:
+                direct_answer_prompt = self._create_personal_answer_prompt(user_question, user_id)
 
             # Call text model for direct answer
             response = requests.post(
@@ -80,6 +129,8 @@ DIRECT ANSWER:"""
             
             if response.status_code == 200:
                 direct_answer = response.json().get("response", "").strip()
+                if cache_entry is not None and direct_answer:
+                    self.answer_cache.store(user_question, direct_answer, cache_entry["embedding"])
                 return direct_answer
             else:
                 return f"I apologize, but I'm having trouble generating a response right now."
@@ -87,6 +138,37 @@ DIRECT ANSWER:"""
         except Exception as e:
             return f"Let me help you with that question, though I'm experiencing some technical difficulties: {str(e)}"
     
+    def _create_factual_answer_prompt(self, user_question: str) -> str:
+        """Create a direct answer prompt without any user memory context"""
+        return f"""
+USER QUESTION: {user_question}
+
+TASK: Provide a direct, factual answer to the question. Be concise but informative.
+
+DIRECT ANSWER:"""
+    
+    def _create_personal_answer_prompt(self, user_question: str, user_id: str) -> str:
+        """Create a direct answer prompt personalized with the user's memory context"""
+        # Get memory context for personalized response
+        memory_context = self.memory_bank.get_prompt_context(user_id, user_question)
+        
+        return f"""
+USER QUESTION: {user_question}
+
+USER CONTEXT (from memory):
+- User Name: {memory_context['user_name']}
+- Session: {memory_context['session_count']}
+- User Profile: {memory_context['user_portrait']}
+- Previous Interactions: {memory_context['memory_records'][:500]}...
+
+TASK: Provide a direct, helpful answer to the user's question. Consider their background and previous interactions to personalize your response. Be concise but informative.
+
+If this is a factual question (like "Where is France?"), provide the factual answer.
+If this is a personal question, consider their history and context.
+If this is a complex question, break it down clearly.
+
+DIRECT ANSWER:"""
+    
     def dual_contextual_analysis(self, 
                                 image_path: str, 
                                 user_question: str, 
@@ -106,19 +188,70 @@ DIRECT ANSWER:"""
             print("🤖 Generating direct answer...")
             direct_answer = self.generate_direct_answer(user_question, user_id)
             
-            # STEP 2: Get memory context for visual analysis
-            memory_context = self.memory_bank.get_prompt_context(user_id, user_question)
-            
-            # STEP 3: Encode image for analysis
-            image_b64 = self.encode_image_to_base64(image_path)
-            if not image_b64:
+            # STEP 2: Prepare image for analysis (resized, JPEG, cached by content hash)
+            prepared_image = self.image_preprocessor.prepare(image_path)
+            if not prepared_image:
                 return {"error": "Failed to encode image"}
+            image_b64 = prepared_image["base64"]
+            print(f"📦 Image payload: {prepared_image['original_size']} -> {prepared_image['prepared_size']} bytes "
+                  f"({prepared_image['image'].size[0]}x{prepared_image['image'].size[1]})")
+            
+            # STEP 3: Decide whether the vision model has to run at all
+            route, previous = self._route_visual_analysis(user_id, user_question, prepared_image)
             
-            # STEP 4: Create dual-purpose analysis prompt
+            if route == "skip":
+                print("⏭️ Question does not involve the scene, skipping visual analysis")
+                self._store_dual_analysis_in_memory(
+                    user_id=user_id,
+                    image_path=image_path,
+                    user_question=user_question,
+                    direct_answer=direct_answer,
+                    visual_analysis={},
+                    raw_visual_response="",
+                    store_image=False
+                )
+                return {
+                    "success": True,
+                    "direct_answer": direct_answer,
+                    "visual_analysis": {},
+                    "user_question": user_question,
+                    "memory_context_used": True,
+                    "visual_route": route,
+                    "image_stats": self.image_preprocessor.get_stats()
+                }
+            
+            if route == "reuse":
+                print("♻️ Scene unchanged since last turn, reusing previous visual analysis")
+                # The frame is a near-duplicate of one already stored, so only
+                # the conversation is written
+                self._store_dual_analysis_in_memory(
+                    user_id=user_id,
+                    image_path=image_path,
+                    user_question=user_question,
+                    direct_answer=direct_answer,
+                    visual_analysis=previous["visual_analysis"],
+                    raw_visual_response=previous["raw_visual_response"],
+                    store_image=False
+                )
+                return {
+                    "success": True,
+                    "direct_answer": direct_answer,
+                    "visual_analysis": previous["visual_analysis"],
+                    "raw_visual_response": previous["raw_visual_response"],
+                    "user_question": user_question,
+                    "memory_context_used": True,
+                    "visual_route": route,
+                    "image_stats": self.image_preprocessor.get_stats()
+                }
+            
+            # STEP 4: Get memory context for visual analysis
+            memory_context = self.memory_bank.get_prompt_context(user_id, user_question)
+            
+            # STEP 5: Create dual-purpose analysis prompt
             print("🖼️ Performing contextual image analysis...")
             dual_prompt = self._create_dual_analysis_prompt(user_question, direct_answer, memory_context)
             
-            # STEP 5: API call for visual analysis
+            # STEP 6: API call for visual analysis
             response = requests.post(
                 f"{self.ollama_base_url}/api/generate",
                 json={
@@ -141,6 +274,9 @@ DIRECT ANSWER:"""
                 # Parse the dual response
                 structured_result = self._parse_dual_response(visual_analysis, user_question, direct_answer)
                 
+                # Remember this frame so the next turn can reuse the analysis
+                self._remember_visual_analysis(user_id, prepared_image, structured_result, visual_analysis)
+                
                 # Store both responses in memory
                 self._store_dual_analysis_in_memory(
                     user_id=user_id,
@@ -148,7 +284,8 @@ DIRECT ANSWER:"""
                     user_question=user_question,
                     direct_answer=direct_answer,
                     visual_analysis=structured_result,
-                    raw_visual_response=visual_analysis
+                    raw_visual_response=visual_analysis,
+                    prepared_image=prepared_image
                 )
                 
                 return {
@@ -157,7 +294,9 @@ DIRECT ANSWER:"""
                     "visual_analysis": structured_result,
                     "raw_visual_response": visual_analysis,
                     "user_question": user_question,
-                    "memory_context_used": True
+                    "memory_context_used": True,
+                    "visual_route": route,
+                    "image_stats": self.image_preprocessor.get_stats()
                 }
             else:
                 return {
@@ -170,6 +309,53 @@ DIRECT ANSWER:"""
         except Exception as e:
             return {"error": f"Dual analysis failed: {str(e)}"}
     
+    def _needs_visual_analysis(self, question: str) -> bool:
+        """Check whether answering the question could involve the camera frame"""
+        words = _question_words(question)
+        if words & (VISUAL_WORDS | EMOTIONAL_WORDS | PERSONAL_WORDS):
+            return True
+        
+        # General knowledge questions don't depend on the scene
+        return self._classify_question_type(question) not in CACHEABLE_QUESTION_TYPES
+    
+    def _route_visual_analysis(self, user_id: str, question: str, prepared_image: Dict):
+        """
+        Decide how to produce the visual analysis for this turn.
+        
+        Returns:
+            Tuple of route ("skip", "reuse" or "analyze") and the previous
+            analysis for the user (None unless route is "reuse")
+        """
+        if not self._needs_visual_analysis(question):
+            route, previous = "skip", None
+        else:
+            with self._lock:
+                previous = self.last_visual_analysis.get(user_id)
+            
+            if (previous is not None
+                    and time.time() - previous["timestamp"] <= VISUAL_ANALYSIS_MAX_AGE
+                    and hamming_distance(previous["perceptual_hash"], prepared_image["perceptual_hash"]) <= FRAME_CHANGE_THRESHOLD):
+                route = "reuse"
+            else:
+                route, previous = "analyze", None
+        
+        with self._lock:
+            self.visual_route_counts[route] += 1
+        return route, previous
+    
+    def _remember_visual_analysis(self, user_id: str, prepared_image: Dict, visual_analysis: Dict, raw_visual_response: str):
+        """Record the user's last analyzed frame and its analysis"""
+        with self._lock:
+            self.last_visual_analysis[user_id] = {
+                "perceptual_hash": prepared_image["perceptual_hash"],
+                "visual_analysis": visual_analysis,
+                "raw_visual_response": raw_visual_response,
+                "timestamp": time.time()
+            }
+            self.last_visual_analysis.move_to_end(user_id)
+            while len(self.last_visual_analysis) > self.max_tracked_users:
+                self.last_visual_analysis.popitem(last=False)
+    
     def _create_dual_analysis_prompt(self, user_question: str, direct_answer: str, memory_context: Dict) -> str:
         """Create a prompt that handles both direct answer and visual analysis"""
         
@@ -279,8 +465,10 @@ Remember: The user already received the direct answer "{direct_answer}". Now pro
                                      user_question: str, 
                                      direct_answer: str,
                                      visual_analysis: Dict, 
-                                     raw_visual_response: str):
-        """Store both direct answer and visual analysis in memory"""
+                                     raw_visual_response: str,
+                                     prepared_image: Optional[Dict] = None,
+                                     store_image: bool = True):
+        """Queue both direct answer and visual analysis for storage in memory"""
         try:
             # Store the complete interaction
             full_response = f"Question: {user_question}\n"
@@ -288,7 +476,7 @@ Remember: The user already received the direct answer "{direct_answer}". Now pro
             full_response += f"Visual Context: {visual_analysis.get('visual_context', '')}\n"
             full_response += f"Personal Insights: {visual_analysis.get('personal_connections', '')}"
             
-            self.memory_bank.add_conversation(
+            self.memory_writer.submit_conversation(
                 user_id=user_id,
                 conversation_text=full_response,
                 user_input=user_question,
@@ -296,24 +484,27 @@ Remember: The user already received the direct answer "{direct_answer}". Now pro
                 metadata={
                     "analysis_type": "dual_response_contextual",
                     "has_direct_answer": True,
-                    "has_visual_analysis": True,
-                    "image_analyzed": True,
+                    "has_visual_analysis": bool(visual_analysis),
+                    "image_analyzed": store_image,
                     "image_path": image_path,
                     "question_type": self._classify_question_type(user_question)
                 }
             )
             
-            # Store emotional image if relevant
-            if os.path.exists(image_path):
+            # Store emotional image if relevant, reusing the frame prepared for llava
+            if store_image and prepared_image is None and os.path.exists(image_path):
+                prepared_image = self.image_preprocessor.prepare(image_path)
+            
+            if store_image and prepared_image is not None:
                 try:
-                    pil_image = Image.open(image_path)
+                    pil_image = prepared_image["image"]
                     
                     emotion_description = f"Dual analysis from {datetime.now().strftime('%Y-%m-%d %H:%M')}: "
                     emotion_description += f"User asked '{user_question}'. "
                     emotion_description += f"Direct answer: {direct_answer[:100]}... "
                     emotion_description += f"Visual context: {visual_analysis.get('visual_context', '')[:100]}..."
                     
-                    self.memory_bank.add_emotional_image(
+                    self.memory_writer.submit_emotional_image(
                         user_id=user_id,
                         image=pil_image,
                         emotion_description=emotion_description,
@@ -321,27 +512,41 @@ Remember: The user already received the direct answer "{direct_answer}". Now pro
                             "analysis_type": "dual_response",
                             "user_question": user_question,
                             "has_direct_answer": True
-                        }
+                        },
+                        jpeg_bytes=prepared_image["jpeg_bytes"]
                     )
                 except Exception as e:
                     print(f"Error storing emotional image: {e}")
             
+            print(f"💾 Memory writes queued (queue depth {self.memory_writer.queue_depth})")
+            
         except Exception as e:
             print(f"Error storing dual analysis in memory: {e}")
     
+    def _is_cacheable_question(self, question: str) -> bool:
+        """Check whether a direct answer can be shared through the semantic cache"""
+        # Time-dependent answers would be served stale
+        if _question_words(question) & TIME_SENSITIVE_WORDS:
+            return False
+        
+        # Anything routed to visual analysis depends on the current camera frame,
+        # and questions about the user themselves are personal even when phrased as facts
+        return not self._needs_visual_analysis(question)
+    
     def _classify_question_type(self, question: str) -> str:
         """Classify the type of question asked"""
-        question_lower = question.lower()
+        words = _question_words(question)
         
-        if any(word in question_lower for word in ['where', 'location', 'place']):
+        # Emotional words win over the question word ("What makes someone sad?")
+        if words & EMOTIONAL_WORDS:
+            return "emotional"
+        elif words & {'where', 'location', 'place'}:
             return "location"
-        elif any(word in question_lower for word in ['what', 'define', 'explain']):
+        elif words & {'what', 'define', 'explain'}:
             return "factual"
-        elif any(word in question_lower for word in ['how', 'why', 'when']):
+        elif words & {'how', 'why', 'when'}:
             return "explanatory"
-        elif any(word in question_lower for word in ['feel', 'emotion', 'mood', 'happy', 'sad']):
-            return "emotional"
-        elif any(word in question_lower for word in ['help', 'advice', 'suggest', 'recommend']):
+        elif words & {'help', 'advice', 'suggest', 'recommend'}:
             return "advisory"
         else:
             return "general"
@@ -350,35 +555,50 @@ Remember: The user already received the direct answer "{direct_answer}". Now pro
 def initialize_dual_analyzer_with_memory(memory_bank: Optional[MemoryBank] = None):
     """Initialize the dual response analyzer with memory integration"""
     return DualResponseContextualAnalyzer(
-        ollama_base_url="http://localhost:11434",
+        ollama_base_url=OLLAMA_BASE_URL,
         memory_bank=memory_bank
     )
 
-# Global analyzer instance
-dual_analyzer = None
+# Analyzers hold no per-request state, so concurrent requests share one per
+# memory bank. It is attached to the bank and released together with it.
+_dual_analyzer_lock = threading.Lock()
+_default_dual_analyzer = None
+
+def get_dual_analyzer(memory_bank: Optional[MemoryBank] = None) -> DualResponseContextualAnalyzer:
+    """Get the shared analyzer for a memory bank, creating it on first use"""
+    global _default_dual_analyzer
+    
+    with _dual_analyzer_lock:
+        if memory_bank is None:
+            if _default_dual_analyzer is None:
+                _default_dual_analyzer = initialize_dual_analyzer_with_memory()
+            return _default_dual_analyzer
+        
+        if memory_bank.dual_analyzer is None:
+            memory_bank.dual_analyzer = initialize_dual_analyzer_with_memory(memory_bank)
+        return memory_bank.dual_analyzer
 
 # === DUAL RESPONSE TOOL ===
 
-def dual_response_analysis_tool(input_data: str) -> str:
+def dual_response_analysis_tool(input_data: str,
+                                analyzer: Optional[DualResponseContextualAnalyzer] = None,
+                                user_question: str = "General analysis",
+                                user_id: str = "default_user") -> str:
     """Perform both direct answer and contextual image analysis"""
-    global dual_analyzer
-    
     try:
         # Handle different input formats
         if isinstance(input_data, dict):
             image_path = input_data.get('image_path', '')
-            user_question = input_data.get('user_question', '')
-            user_id = input_data.get('user_id', 'default_user')
+            user_question = input_data.get('user_question', user_question)
+            user_id = input_data.get('user_id', user_id)
         else:
-            # Get from function attributes
+            # Question and user come from the request-scoped tool (see create_dual_response_tool)
             image_path = str(input_data)
-            user_question = getattr(dual_response_analysis_tool, 'user_question', 'General analysis')
-            user_id = getattr(dual_response_analysis_tool, 'user_id', 'default_user')
         
-        if dual_analyzer is None:
+        if analyzer is None:
             return "❌ Error: Dual analyzer not initialized"
         
-        result = dual_analyzer.dual_contextual_analysis(image_path, user_question, user_id)
+        result = analyzer.dual_contextual_analysis(image_path, user_question, user_id)
         
         if result.get("error"):
             return f"❌ Error: {result['error']}"
@@ -426,15 +646,24 @@ MEMORY INTEGRATION: {'✅ Previous interactions considered' if result.get('memor
 
 # === DUAL RESPONSE TOOL CREATION ===
 
-dual_response_tool = Tool(
-    name="DualResponseAnalyzer",
-    description="Provides both direct answers to user questions AND contextual image analysis with memory integration.",
-    func=dual_response_analysis_tool
-)
+def create_dual_response_tool(analyzer: DualResponseContextualAnalyzer,
+                              user_question: str,
+                              user_id: str = "default_user") -> Tool:
+    """Create a tool bound to a single request's analyzer, question and user"""
+    return Tool(
+        name="DualResponseAnalyzer",
+        description="Provides both direct answers to user questions AND contextual image analysis with memory integration.",
+        func=functools.partial(
+            dual_response_analysis_tool,
+            analyzer=analyzer,
+            user_question=user_question,
+            user_id=user_id
+        )
+    )
 
 # === DUAL RESPONSE AGENT ===
 
-def create_dual_response_agent():
+def create_dual_response_agent(tool: Tool):
     """Create an agent that handles both direct answers and visual analysis"""
     return Agent(
         role="Dual Response Visual Intelligence Specialist",
@@ -447,11 +676,11 @@ def create_dual_response_agent():
             "visual insights that enhance their understanding. You combine factual knowledge with "
             "personalized visual analysis to create comprehensive, useful responses."
         ),
-        tools=[dual_response_tool],
+        tools=[tool],
         verbose=True,
         llm=Ollama(
             model="llava:7b",  # Using multimodal model for visual analysis
-            base_url="http://localhost:11434",
+            base_url=OLLAMA_BASE_URL,
             temperature=0.4,
             top_p=0.8,
             num_predict=600
@@ -460,7 +689,7 @@ def create_dual_response_agent():
 
 # === DUAL RESPONSE TASK CREATION ===
 
-def create_dual_response_task(image_path: str, user_question: str, user_id: str = "default_user"):
+def create_dual_response_task(image_path: str, user_question: str, user_id: str = "default_user", agent: Agent = None):
     """Create a task that handles both direct answers and visual analysis"""
     return Task(
         description=f"""
@@ -480,7 +709,7 @@ def create_dual_response_task(image_path: str, user_question: str, user_id: str
         
         Both the direct answer and visual analysis will be stored in memory for future reference.
         """,
-        agent=create_dual_response_agent(),
+        agent=agent,
         expected_output=f"A comprehensive dual response providing both a direct answer to '{user_question}' and memory-enhanced contextual visual analysis"
     )
 
@@ -492,19 +721,15 @@ def analyze_with_dual_response(image_path: str,
                               memory_bank: Optional[MemoryBank] = None):
     """Main function for dual response analysis (direct answer + visual analysis)"""
     
-    global dual_analyzer
-    
     if not os.path.exists(image_path):
         print(f"❌ Error: Image file '{image_path}' not found!")
         return
     
-    # Initialize analyzer with memory if not already done
-    if dual_analyzer is None:
-        dual_analyzer = initialize_dual_analyzer_with_memory(memory_bank)
-    
-    # Set context for the tool
-    dual_response_analysis_tool.user_question = user_question
-    dual_response_analysis_tool.user_id = user_id
+    # Every request gets its own tool, agent and task, so concurrent
+    # conversations never share question or user context
+    analyzer = get_dual_analyzer(memory_bank)
+    tool = create_dual_response_tool(analyzer, user_question, user_id)
+    agent = create_dual_response_agent(tool)
     
     print(f"🎯 DUAL RESPONSE ANALYSIS")
     print(f"👤 User: {user_id}")
@@ -513,11 +738,11 @@ def analyze_with_dual_response(image_path: str,
     print("=" * 80)
     
     # Create dual response task
-    task = create_dual_response_task(image_path, user_question, user_id)
+    task = create_dual_response_task(image_path, user_question, user_id, agent=agent)
     
     # Create crew with dual response capability
     crew = Crew(
-        agents=[create_dual_response_agent()],
+        agents=[agent],
         tasks=[task],
         verbose=True,
         process="sequential"
@@ -1,9 +1,14 @@
 import os
 import time
 import json
+import threading
+import uuid
+import weakref
+import contextlib
+import functools
+from concurrent.futures import ThreadPoolExecutor, wait
 import numpy as np
 import chromadb
-from chromadb.utils import embedding_functions
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Union
 import torch
@@ -11,6 +16,23 @@ from PIL import Image
 from transformers.models.clip import CLIPProcessor
 from transformers.models.clip import CLIPModel
 import math
+from collections import OrderedDict, deque
+from tqdm import tqdm
+from MemoryRanker import MemoryRanker
+from MemoryExpiry import ExpiryIndex, get_memory_sweeper
+from UserStateStore import UserStateStore
+from HotUserCache import HotUserCache
+from HotMemoryTier import HotMemoryTier
+from RecencyIndex import RecencyIndex
+from ModelRegistry import LazyTextEmbeddingFunction, get_model_registry
+from ImageStore import ImageStore
+from ImagePreprocessor import perceptual_hash, hamming_distance
+from MemoryPartitions import PARTITIONED_KINDS, open_partitions
+from MemorySnapshot import read_restore_state, restore_snapshot, write_restore_state
+
+# Items per embedding batch and Chroma write in the bulk APIs
+DEFAULT_WRITE_CHUNK_SIZE = 256
+DEFAULT_IMAGE_CHUNK_SIZE = 32
 
 class MemoryBank:
     """
@@ -22,7 +44,20 @@ class MemoryBank:
                  persist_directory: str = "./memory_storage",
                  text_model_name: str = "all-MiniLM-L6-v2",
                  clip_model_name: str = "openai/clip-vit-base-patch32", 
-                 forgetting_enabled: bool = True):
+                 forgetting_enabled: bool = True,
+                 similarity_weight: float = 0.6,
+                 retention_weight: float = 0.4,
+                 context_lookup_timeout: float = 2.0,
+                 clip_batch_size: int = 16,
+                 clip_precision: str = "fp32",
+                 image_directory: str = "./images",
+                 near_duplicate_distance: int = 4,
+                 partitioning: str = None,
+                 partition_buckets: int = 64,
+                 text_embedding_function=None,
+                 image_embedder=None,
+                 default_memory_strength: float = 1.0,
+                 clock=None):
         """
         Initialize MemoryBank.
         
@@ -31,51 +66,96 @@ class MemoryBank:
             text_model_name: Name of the text embedding model
             clip_model_name: Name of the CLIP model for image embeddings
             forgetting_enabled: Enable Ebbinghaus forgetting curve
+            similarity_weight: Weight of query similarity when ranking retrieved memories
+            retention_weight: Weight of forgetting-curve retention when ranking retrieved memories
+            context_lookup_timeout: Seconds get_prompt_context waits for its lookups before
+                leaving a section empty
+            clip_batch_size: Images per CLIP forward pass
+            clip_precision: CLIP execution on CPU: "fp32", "bf16" (autocast) or
+                "int8" (dynamically quantized linear layers)
+            image_directory: Root of the content-addressed image store
+            near_duplicate_distance: Maximum dHash Hamming distance at which a new
+                frame counts as a near-duplicate of a recent image of the same user
+            partitioning: "shared" (one collection per kind), "user" (collections
+                per user) or "bucket" (users hashed into partition_buckets
+                collections per kind). None keeps the layout of an existing store;
+                use MemoryPartitions.py to migrate a store to another layout.
+            partition_buckets: Number of buckets per kind for a new "bucket" store
+            text_embedding_function: Chroma embedding function used instead of the
+                sentence-transformers model (e.g. OfflineEmbedder.HashingEmbeddingFunction)
+            image_embedder: Object with embed_images(images) and embed_texts(texts)
+                used instead of CLIP (e.g. OfflineEmbedder.HashingImageEmbedder)
+            default_memory_strength: Initial strength S (days) of new memories
+            clock: Callable returning the current timestamp, used for memory
+                timestamps, access times and retention (defaults to time.time;
+                ForgettingSimulator.SimulatedClock replays months in seconds)
         """
+        start_time = time.time()
+        self.clock = clock or time.time
+        
         # Initialize ChromaDB client
+        self.persist_directory = persist_directory
         self.client = chromadb.PersistentClient(path=persist_directory)
         
+        # Embedding models are shared by every bank in the process and only
+        # loaded on first use; references are dropped when this bank is collected
+        self.model_registry = get_model_registry()
+        
         # Create text embedding function
-        self.text_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=text_model_name
-        )
+        if text_embedding_function is not None:
+            self.text_ef = text_embedding_function
+        else:
+            self.text_ef = LazyTextEmbeddingFunction(model_name=text_model_name, registry=self.model_registry)
+            weakref.finalize(self, self.model_registry.release, self.text_ef.registry_key)
         
-        # Initialize CLIP model for image embeddings
-        self.clip_processor = CLIPProcessor.from_pretrained(clip_model_name)
-        self.clip_model = CLIPModel.from_pretrained(clip_model_name)
+        # Recent query embeddings, so a turn's query is encoded once for every collection
+        self._query_embeddings = OrderedDict()
+        self._query_embeddings_lock = threading.Lock()
+        self.query_embedding_cache_size = 128
+        self.query_embedding_hits = 0
+        self.query_embedding_misses = 0
         
-        # Initialize collections
-        self.conversations_collection = self.client.get_or_create_collection(
-            name="conversations", 
-            embedding_function=self.text_ef,
-            metadata={"hnsw:space": "cosine"}
+        # CLIP model for image embeddings
+        if clip_precision not in ("fp32", "bf16", "int8"):
+            raise ValueError(f"Unsupported CLIP precision '{clip_precision}'")
+        self.clip_batch_size = clip_batch_size
+        self.clip_precision = clip_precision
+        # int8 weights differ from fp32 ones, bf16 only changes execution
+        self._clip_key = f"clip:{clip_model_name}:{'int8' if clip_precision == 'int8' else 'fp32'}"
+        self.image_embedder = image_embedder
+        if image_embedder is None:
+            # The loader must not reference the bank, or the registry would keep it alive
+            self.model_registry.acquire(self._clip_key, functools.partial(MemoryBank._load_clip, clip_model_name, clip_precision))
+            weakref.finalize(self, self.model_registry.release, self._clip_key)
+        
+        # Conversations, images and summaries live in one collection per kind,
+        # or in per-user / per-bucket collections. Images are stored with
+        # precomputed CLIP embeddings.
+        self.partitions = open_partitions(
+            self.client,
+            persist_directory,
+            {"conversations": self.text_ef, "emotional_images": None, "event_summaries": self.text_ef},
+            partitioning,
+            partition_buckets
         )
         
-        # For images collection, we need to ensure consistent embedding dimensions
-        try:
-            # Try to get existing collection
-            self.images_collection = self.client.get_collection(
-                name="emotional_images"
-            )
-            
-            # Store the embedding dimension for validation
-            self.image_embedding_dim = 512  # Default for CLIP vit-base-patch32
-            
-        except ValueError:  # Collection doesn't exist yet
-            # Create new collection
-            self.images_collection = self.client.create_collection(
-                name="emotional_images",
-                metadata={"hnsw:space": "cosine"}
-            )
-            
-            # Set embedding dimension
-            self.image_embedding_dim = 512  # Default for CLIP vit-base-patch32
+        # The single collection of each kind in the shared layout (None when partitioned)
+        shared = self.partitions.mode == "shared"
+        self.conversations_collection = self.partitions.get("conversations") if shared else None
+        self.images_collection = self.partitions.get("emotional_images") if shared else None
+        self.summaries_collection = self.partitions.get("event_summaries") if shared else None
         
-        self.summaries_collection = self.client.get_or_create_collection(
-            name="event_summaries",
-            embedding_function=self.text_ef,
-            metadata={"hnsw:space": "cosine"}
-        )
+        # Store the embedding dimension for validation
+        self.image_embedding_dim = 512  # Default for CLIP vit-base-patch32
+        
+        # Image files, deduplicated by content, plus near-duplicate detection
+        # against each user's most recent frames
+        self.image_store = ImageStore(image_directory)
+        self.near_duplicate_distance = near_duplicate_distance
+        self.recent_images_per_user = 32
+        self._recent_images = {}
+        self._recent_images_lock = threading.Lock()
+        self.image_duplicates = 0
         
         self.user_portrait_collection = self.client.get_or_create_collection(
             name="user_portraits",
@@ -85,51 +165,394 @@ class MemoryBank:
         
         # Ebbinghaus forgetting curve parameters
         self.forgetting_enabled = forgetting_enabled
-        self.default_memory_strength = 1.0
+        self.default_memory_strength = default_memory_strength
+        
+        # Blends query similarity with retention when ranking retrievals
+        self.ranker = MemoryRanker(
+            similarity_weight=similarity_weight,
+            retention_weight=retention_weight,
+            forgetting_enabled=forgetting_enabled,
+            clock=self.clock
+        )
+        
+        # Projected expiry of every memory written or accessed, used by the sweeper
+        self.expiry_index = ExpiryIndex()
+        # Memories ordered by timestamp per user, for "most recent N" lookups
+        self.recency_index = RecencyIndex(os.path.join(persist_directory, "recency_index.sqlite3"))
+        # Kinds with stored memories but no index yet are backfilled on first lookup
+        if len(self.recency_index.built) < len(PARTITIONED_KINDS):
+            existing = self.partitions.collections()
+            for kind in PARTITIONED_KINDS:
+                if kind not in self.recency_index.built and not any(
+                    collection.count() for name, collection in existing.items() if self.partitions.kind_of(name) == kind
+                ):
+                    self.recency_index.mark_built(kind)
+        
+        # Per-user state is never kept on the instance so that concurrent
+        # requests can share one bank; methods return per-request values.
+        # Counters and other small per-user values live in a side store.
+        self.user_state = UserStateStore(os.path.join(persist_directory, "user_state.sqlite3"), clock=self.clock)
+        # Portraits and event summaries read on every turn
+        self.hot_cache = HotUserCache()
+        # Users with more summaries than this are ranked by Chroma instead of in process
+        self.max_cached_summaries = 200
+        # Recent conversations and images of active users, searched in process
+        self.hot_tier = HotMemoryTier()
         
-        # User metadata
-        self.current_user = None
-        self.session_count = 0
+        # Analyzer bound to this bank, set by Inference.get_dual_analyzer
+        self.dual_analyzer = None
+        # Write-behind queue bound to this bank, set by MemoryWriter.get_memory_writer
+        self.memory_writer = None
+        # Expired memory sweeper bound to this bank, set by MemoryExpiry.get_memory_sweeper
+        self.memory_sweeper = None
+        # Conversation consolidator bound to this bank, set by MemoryConsolidator.get_memory_consolidator
+        self.memory_consolidator = None
+        # Incremental portrait updater bound to this bank, set by PortraitEngine.get_portrait_engine
+        self.portrait_engine = None
         
-    def _get_clip_embedding(self, image):
+        # Prompt context lookups run concurrently on a shared pool
+        self.context_lookup_timeout = context_lookup_timeout
+        self._context_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="memory-context")
+        
+        self.startup_seconds = time.time() - start_time
+    
+    @property
+    def clip_processor(self) -> CLIPProcessor:
+        """CLIP processor, loaded on first use."""
+        return self.model_registry.get(self._clip_key)[0]
+    
+    @property
+    def clip_model(self) -> CLIPModel:
+        """CLIP model, loaded on first use."""
+        return self.model_registry.get(self._clip_key)[1]
+    
+    def get_image_storage_stats(self) -> Dict:
+        """
+        Get image store size and deduplication metrics.
+        
+        Returns:
+            Dict with the image store stats and the number of near-duplicate frames skipped
+        """
+        stats = self.image_store.get_stats()
+        stats["near_duplicates"] = self.image_duplicates
+        return stats
+    
+    def remove_unreferenced_images(self, image_paths) -> int:
+        """
+        Delete stored image files that no emotional image memory points at any more.
+        
+        Called with the image paths of deleted memories. Identical frames
+        share one file, possibly across users and partitions, so a file is
+        only deleted when no remaining memory in any partition refers to it.
+        
+        Args:
+            image_paths: image_path metadata of the deleted memories
+            
+        Returns:
+            Number of image files deleted
+        """
+        paths = {path for path in image_paths if path}
+        for collection in self.partitions.collections(("emotional_images",)).values():
+            if not paths:
+                break
+            results = collection.get(where={"image_path": {"$in": sorted(paths)}}, include=["metadatas"])
+            paths -= {metadata.get("image_path") for metadata in results["metadatas"]}
+        return self.image_store.remove(paths) if paths else 0
+    
+    def get_model_stats(self) -> Dict:
+        """
+        Get embedding model footprint and startup time.
+        
+        Returns:
+            Dict with the bank's startup seconds and the shared model registry stats
+        """
+        stats = self.model_registry.get_stats()
+        stats["startup_seconds"] = self.startup_seconds
+        return stats
+        
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Get the text embedding of a query, from a small LRU of recent queries.
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Embedding usable as query_embeddings for every text collection
+        """
+        with self._query_embeddings_lock:
+            embedding = self._query_embeddings.get(text)
+            if embedding is not None:
+                self._query_embeddings.move_to_end(text)
+                self.query_embedding_hits += 1
+                return embedding
+        
+        embedding = [float(x) for x in self.text_ef([text])[0]]
+        
+        with self._query_embeddings_lock:
+            self.query_embedding_misses += 1
+            self._query_embeddings[text] = embedding
+            self._query_embeddings.move_to_end(text)
+            while len(self._query_embeddings) > self.query_embedding_cache_size:
+                self._query_embeddings.popitem(last=False)
+        
+        return embedding
+    
+    def get_query_embedding_stats(self) -> Dict:
+        """
+        Get query embedding cache metrics.
+        
+        Returns:
+            Dict with hit/miss counts and cached queries
+        """
+        with self._query_embeddings_lock:
+            total = self.query_embedding_hits + self.query_embedding_misses
+            return {
+                "hits": self.query_embedding_hits,
+                "misses": self.query_embedding_misses,
+                "hit_rate": self.query_embedding_hits / total if total else 0.0,
+                "cached_queries": len(self._query_embeddings)
+            }
+    
+    @staticmethod
+    def _load_clip(clip_model_name: str, clip_precision: str) -> Tuple[CLIPProcessor, CLIPModel]:
+        """Load the CLIP processor and model, quantized for int8 execution."""
+        clip_processor = CLIPProcessor.from_pretrained(clip_model_name)
+        clip_model = CLIPModel.from_pretrained(clip_model_name).eval()
+        if clip_precision == "int8":
+            clip_model = torch.quantization.quantize_dynamic(clip_model, {torch.nn.Linear}, dtype=torch.qint8)
+        return clip_processor, clip_model
+    
+    def _clip_context(self):
+        """Inference context for CLIP forward passes at the configured precision."""
+        if self.clip_precision == "bf16":
+            return torch.autocast("cpu", dtype=torch.bfloat16)
+        return contextlib.nullcontext()
+    
+    def embed_images(self, images: List[Image.Image], batch_size: int = None) -> np.ndarray:
+        """
+        Get CLIP embeddings for images, batch_size images per forward pass.
+        
+        Args:
+            images: PIL images
+            batch_size: Images per forward pass (defaults to clip_batch_size)
+            
+        Returns:
+            float32 array of shape (len(images), image_embedding_dim), L2-normalized
+        """
+        batch_size = batch_size or self.clip_batch_size
+        if not images:
+            return np.zeros((0, self.image_embedding_dim), dtype=np.float32)
+        if self.image_embedder is not None:
+            return self._normalize_clip_features(self.image_embedder.embed_images(images))
+        
+        batches = []
+        with torch.inference_mode(), self._clip_context():
+            for start in range(0, len(images), batch_size):
+                inputs = self.clip_processor(images=images[start:start + batch_size], return_tensors="pt")
+                batches.append(self.clip_model.get_image_features(**inputs).float().numpy())
+        
+        return self._normalize_clip_features(np.concatenate(batches))
+    
+    def _get_clip_embedding(self, image) -> np.ndarray:
         """Get CLIP embedding for an image."""
-        with torch.no_grad():
-            inputs = self.clip_processor(images=image, return_tensors="pt")
-            image_features = self.clip_model.get_image_features(**inputs)
-            # Normalize embedding
-            image_embedding = image_features / image_features.norm(dim=1, keepdim=True)
-            
-            # Get the embedding as a list and ensure correct dimension
-            embedding = image_embedding.squeeze().numpy().tolist()
-            
-            # Ensure embedding has correct dimension (pad or truncate if needed)
-            if len(embedding) < self.image_embedding_dim:
-                # Pad with zeros
-                embedding = embedding + [0.0] * (self.image_embedding_dim - len(embedding))
-            elif len(embedding) > self.image_embedding_dim:
-                # Truncate
-                embedding = embedding[:self.image_embedding_dim]
-                
-            return embedding
+        return self.embed_images([image])[0]
     
-    def _calculate_memory_score(self, last_access_time, memory_strength):
+    def _get_clip_text_embedding(self, text: str) -> np.ndarray:
+        """
+        Get CLIP embedding for a text query.
+        
+        CLIP projects text and images into the same space, so the result can
+        be searched directly against the stored image embeddings.
+        """
+        if self.image_embedder is not None:
+            return self._normalize_clip_features(self.image_embedder.embed_texts([text]))[0]
+        
+        with torch.inference_mode(), self._clip_context():
+            inputs = self.clip_processor(text=[text], padding=True, truncation=True, return_tensors="pt")
+            text_features = self.clip_model.get_text_features(**inputs).float().numpy()
+        return self._normalize_clip_features(text_features)[0]
+    
+    def _normalize_clip_features(self, features: np.ndarray) -> np.ndarray:
+        """L2-normalize CLIP features and fit them to the image collection dimension."""
+        features = features.astype(np.float32, copy=False)
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        features = features / np.where(norms > 0, norms, 1.0)
+        
+        # Ensure embeddings have the correct dimension (pad or truncate if needed)
+        dim = features.shape[1]
+        if dim < self.image_embedding_dim:
+            features = np.pad(features, ((0, 0), (0, self.image_embedding_dim - dim)))
+        elif dim > self.image_embedding_dim:
+            features = features[:, :self.image_embedding_dim]
+        return features
+    
+    def generate_id(self, prefix: str, user_id: str, timestamp: float) -> str:
+        """
+        Generate a unique memory ID.
+        
+        The random suffix keeps IDs unique when the same user writes twice
+        within the same second, e.g. from concurrent turns.
+        """
+        return f"{prefix}_{user_id}_{int(timestamp)}_{uuid.uuid4().hex[:8]}"
+    
+    def _upsert_text_chunks(self, kind: str, ids: List[str], documents: List[str], metadatas: List[Dict], chunk_size: int):
+        """
+        Write text memories in chunks, embedding each chunk in a single batch.
+        
+        Args:
+            kind: "conversations" or "event_summaries"
+            ids: Item IDs
+            documents: Item texts
+            metadatas: Item metadata, each with its "user_id"
+            chunk_size: Number of items per embedding batch
+        """
+        for start in range(0, len(ids), chunk_size):
+            end = start + chunk_size
+            embeddings = self.text_ef(documents[start:end])
+            
+            # One write per partition the chunk touches
+            user_ids = [metadata["user_id"] for metadata in metadatas[start:end]]
+            for collection, positions in self.partitions.group(kind, user_ids):
+                chunk_ids = [ids[start + i] for i in positions]
+                chunk_metadatas = [metadatas[start + i] for i in positions]
+                collection.upsert(
+                    ids=chunk_ids,
+                    documents=[documents[start + i] for i in positions],
+                    embeddings=[embeddings[i] for i in positions],
+                    metadatas=chunk_metadatas
+                )
+                self.expiry_index.track(collection.name, chunk_ids, chunk_metadatas)
+            self.recency_index.add(kind, ids[start:end], metadatas[start:end])
+            
+            if kind == "conversations":
+                self._add_to_hot_tier(kind, ids[start:end], documents[start:end], metadatas[start:end], embeddings)
+    
+    def _add_to_hot_tier(self, kind: str, ids: List[str], documents: List[str], metadatas: List[Dict], embeddings):
+        """Append newly written memories to the hot tier entries of their users."""
+        positions = {}
+        for i, metadata in enumerate(metadatas):
+            positions.setdefault(metadata["user_id"], []).append(i)
+        for user_id, indices in positions.items():
+            self.hot_tier.add(
+                kind, user_id,
+                [ids[i] for i in indices],
+                [documents[i] for i in indices],
+                [metadatas[i] for i in indices],
+                [embeddings[i] for i in indices]
+            )
+    
+    def _ensure_recency_index(self, kind: str):
+        """Backfill the recency index of a kind from the store if it was never built."""
+        if kind not in self.recency_index.built:
+            self.recency_index.build(kind, self.partitions.collections((kind,)).values())
+    
+    def _recent_memories(self, kind: str, user_id: str, n: int, include: List[str]) -> Dict:
+        """
+        Get a user's n most recent memories of one kind.
+        
+        The IDs come from the recency index, so only the returned memories
+        are read from Chroma, whatever the length of the user's history.
+        
+        Args:
+            kind: Memory kind
+            user_id: User ID
+            n: Number of memories
+            include: Fields to read ("documents", "metadatas", "embeddings")
+            
+        Returns:
+            Dict with ids and the included fields, newest first
+        """
+        self._ensure_recency_index(kind)
+        
+        collection = self.partitions.get(kind, user_id)
+        recent = {"ids": [], **{field: [] for field in include}}
+        while len(recent["ids"]) < n:
+            wanted = self.recency_index.recent(kind, user_id, n - len(recent["ids"]), offset=len(recent["ids"]))
+            if not wanted:
+                break
+            
+            results = collection.get(ids=wanted, include=include)
+            positions = {item_id: i for i, item_id in enumerate(results["ids"])}
+            # Deleted behind the index's back (e.g. by another process)
+            missing = [item_id for item_id in wanted if item_id not in positions]
+            if missing:
+                self.recency_index.prune(kind, missing)
+            
+            for item_id in wanted:
+                if item_id in positions:
+                    recent["ids"].append(item_id)
+                    for field in include:
+                        recent[field].append(results[field][positions[item_id]])
+        return recent
+    
+    def _load_hot_memories(self, kind: str, user_id: str, limit: int) -> Tuple:
+        """
+        Load a user's most recent memories of one kind for the hot tier.
+        
+        Returns:
+            ids, documents, metadatas and embeddings (oldest first), and
+            whether they are all of the user's memories of that kind
+        """
+        recent = self._recent_memories(kind, user_id, limit, ["documents", "metadatas", "embeddings"]) if limit \
+            else {"ids": [], "documents": [], "metadatas": [], "embeddings": []}
+        if not recent["ids"]:
+            return [], [], [], [], True
+        
+        return (
+            recent["ids"][::-1],
+            recent["documents"][::-1],
+            recent["metadatas"][::-1],
+            np.asarray(recent["embeddings"][::-1], dtype=np.float32),
+            self.recency_index.count(kind, user_id) <= limit
+        )
+    
+    def _calculate_memory_score(self, last_access_time, memory_strength, now: float = None):
         """
         Calculate memory score based on Ebbinghaus forgetting curve.
         
         Score = e^(-(t/S)) where:
-        - t is time elapsed since last access in days
+        - t is time elapsed since last access in days (up to now, default the bank's clock)
         - S is memory strength
         """
-        if not self.forgetting_enabled:
-            return 1.0
-            
-        now = datetime.now()
-        last_access = datetime.fromtimestamp(last_access_time)
-        time_diff_days = (now - last_access).total_seconds() / (24 * 3600)
+        return float(self.ranker.retention([last_access_time], [memory_strength], now)[0])
+    
+    def _rank_items(self,
+                    key: str,
+                    ids: List[str],
+                    documents: List[str],
+                    metadatas: List[Dict],
+                    distances: Optional[List[float]],
+                    n_results: int,
+                    requested: int = None,
+                    text_key: str = "text") -> List[Dict]:
+        """
+        Rank retrieved candidates with the MemoryRanker and build result items.
         
-        # Apply Ebbinghaus forgetting curve
-        memory_score = math.exp(-time_diff_days / memory_strength)
-        return memory_score
+        Args:
+            key: Collection name
+            ids: Candidate IDs
+            documents: Candidate documents
+            metadatas: Candidate metadata
+            distances: Query distances, or None for non-query retrievals
+            n_results: Number of results to return
+            requested: Candidate count requested from Chroma
+            text_key: Result key holding the document
+            
+        Returns:
+            Items with memory_score, similarity and the combined score, best first
+        """
+        return [
+            {
+                "id": ids[ranked["index"]],
+                text_key: documents[ranked["index"]],
+                "metadata": metadatas[ranked["index"]],
+                "memory_score": ranked["memory_score"],
+                "similarity": ranked["similarity"],
+                "score": ranked["score"]
+            }
+            for ranked in self.ranker.rank(key, metadatas, distances, n_results, requested)
+        ]
     
     def add_conversation(self, 
                          user_id: str,
@@ -150,39 +573,56 @@ class MemoryBank:
         Returns:
             ID of the added conversation
         """
-        # Set current user
-        self.current_user = user_id
+        return self.add_conversations([{
+            "user_id": user_id,
+            "conversation_text": conversation_text,
+            "user_input": user_input,
+            "bot_response": bot_response,
+            "metadata": metadata
+        }])[0]
+    
+    def add_conversations(self, items: List[Dict], chunk_size: int = DEFAULT_WRITE_CHUNK_SIZE) -> List[str]:
+        """
+        Add several conversations to memory, embedding and writing them in chunks.
         
-        # Create metadata
-        if metadata is None:
-            metadata = {}
+        Args:
+            items: Dicts with the add_conversation arguments. An item may also
+                carry a precomputed "id" and "timestamp"; writes with an
+                existing id replace it, so replays are idempotent.
+            chunk_size: Number of items embedded and written per Chroma call
             
-        # Add required metadata
-        timestamp = time.time()
-        conversation_id = f"conv_{user_id}_{int(timestamp)}"
+        Returns:
+            IDs of the added conversations
+        """
+        ids, documents, metadatas = [], [], []
         
-        metadata.update({
-            "user_id": user_id,
-            "timestamp": timestamp,
-            "last_access_time": timestamp,
-            "memory_strength": self.default_memory_strength,
-            "type": "conversation"
-        })
+        for item in items:
+            # Add required metadata
+            timestamp = item.get("timestamp") or self.clock()
+            conversation_id = item.get("id") or self.generate_id("conv", item["user_id"], timestamp)
+            
+            metadata = dict(item.get("metadata") or {})
+            metadata.update({
+                "user_id": item["user_id"],
+                "timestamp": timestamp,
+                "last_access_time": timestamp,
+                "memory_strength": self.default_memory_strength,
+                "type": "conversation"
+            })
+            
+            # Add user input and bot response if provided
+            if item.get("user_input"):
+                metadata["user_input"] = item["user_input"]
+            if item.get("bot_response"):
+                metadata["bot_response"] = item["bot_response"]
+            
+            ids.append(conversation_id)
+            documents.append(item["conversation_text"])
+            metadatas.append(metadata)
         
-        # Add user input and bot response if provided
-        if user_input:
-            metadata["user_input"] = user_input
-        if bot_response:
-            metadata["bot_response"] = bot_response
-        
-        # Add to collection
-        self.conversations_collection.add(
-            ids=[conversation_id],
-            documents=[conversation_text],
-            metadatas=[metadata]
-        )
+        self._upsert_text_chunks("conversations", ids, documents, metadatas, chunk_size)
         
-        return conversation_id
+        return ids
     
     def add_emotional_image(self, 
                            user_id: str,
@@ -201,41 +641,188 @@ class MemoryBank:
         Returns:
             ID of the added image
         """
-        # Create metadata
-        if metadata is None:
-            metadata = {}
+        return self.add_emotional_images([{
+            "user_id": user_id,
+            "image": image,
+            "emotion_description": emotion_description,
+            "metadata": metadata
+        }])[0]
+    
+    def add_emotional_images(self, items: List[Dict], chunk_size: int = DEFAULT_IMAGE_CHUNK_SIZE) -> List[str]:
+        """
+        Add several emotional images to memory, embedding each chunk in one CLIP batch.
+        
+        Args:
+            items: Dicts with the add_emotional_image arguments. Instead of
+                "image", an item may give "image_file", the path of a JPEG
+                that is copied into the image store and then removed. Items
+                may also carry a precomputed "id" and "timestamp" like
+                add_conversations.
+            chunk_size: Number of images embedded and written per batch
             
-        # Get image embedding
-        image_embedding = self._get_clip_embedding(image)
+        Returns:
+            IDs of the added images; a near-duplicate returns the ID of the
+            existing memory it was merged into
+        """
+        ids = []
+        for start in range(0, len(items), chunk_size):
+            ids.extend(self._add_emotional_image_chunk(items[start:start + chunk_size]))
+        return ids
+    
+    def _recent_image_hashes(self, user_id: str) -> deque:
+        """
+        Perceptual hashes of a user's most recent images, loaded from the
+        store on first use. Caller must hold the recent images lock.
+        """
+        recent = self._recent_images.get(user_id)
+        if recent is None:
+            results = self.partitions.get("emotional_images", user_id).get(
+                where=self.partitions.user_filter(user_id), include=["metadatas"]
+            )
+            hashed = sorted(
+                (
+                    (metadata["timestamp"], int(metadata["perceptual_hash"], 16), item_id)
+                    for item_id, metadata in zip(results["ids"], results["metadatas"])
+                    if "perceptual_hash" in metadata
+                ),
+                reverse=True
+            )[:self.recent_images_per_user]
+            recent = deque(((phash, item_id) for _, phash, item_id in reversed(hashed)),
+                           maxlen=self.recent_images_per_user)
+            self._recent_images[user_id] = recent
+        return recent
+    
+    def _add_emotional_image_chunk(self, items: List[Dict]) -> List[str]:
+        """
+        Embed and store one chunk of emotional images.
         
-        # Add required metadata
-        timestamp = time.time()
-        image_id = f"img_{user_id}_{int(timestamp)}"
+        A frame within near_duplicate_distance (dHash Hamming distance) of one
+        of the user's recent images is not stored again: its memory reuses the
+        existing embedding and file, and that memory's strength is bumped.
+        """
+        images = [
+            item["image"] if item.get("image") is not None else Image.open(item["image_file"]).convert("RGB")
+            for item in items
+        ]
+        hashes = [perceptual_hash(image) for image in images]
         
-        metadata.update({
-            "user_id": user_id,
-            "timestamp": timestamp,
-            "last_access_time": timestamp,
-            "memory_strength": self.default_memory_strength,
-            "emotion_description": emotion_description,
-            "type": "emotional_image"
-        })
+        ids = []
+        duplicate_of = []
+        created = set()
+        with self._recent_images_lock:
+            for item, phash in zip(items, hashes):
+                recent = self._recent_image_hashes(item["user_id"])
+                match = next(
+                    (item_id for recent_hash, item_id in reversed(recent)
+                     if hamming_distance(recent_hash, phash) <= self.near_duplicate_distance),
+                    None
+                )
+                if match is None:
+                    timestamp = item.get("timestamp") or self.clock()
+                    item_id = item.get("id") or self.generate_id("img", item["user_id"], timestamp)
+                    recent.append((phash, item_id))
+                    created.add(item_id)
+                    ids.append(item_id)
+                else:
+                    ids.append(match)
+                duplicate_of.append(match)
         
-        # Save image path if needed
-        img_path = f"./images/{image_id}.jpg"
-        os.makedirs(os.path.dirname(img_path), exist_ok=True)
-        image.save(img_path)
-        metadata["image_path"] = img_path
-        
-        # Add to collection
-        self.images_collection.add(
-            ids=[image_id],
-            embeddings=[image_embedding],
-            metadatas=[metadata],
-            documents=[emotion_description]
-        )
+        # Bump the stored memories the duplicates point at; ones that were
+        # forgotten in the meantime are stored as new images after all
+        matched_users = {
+            match: item["user_id"]
+            for item, match in zip(items, duplicate_of)
+            if match is not None and match not in created
+        }
+        if matched_users:
+            matched = list(matched_users)
+            existing_metadata = {}
+            for collection, positions in self.partitions.group(
+                "emotional_images", [matched_users[match] for match in matched]
+            ):
+                existing = collection.get(ids=[matched[i] for i in positions], include=["metadatas"])
+                existing_metadata.update(zip(existing["ids"], existing["metadatas"]))
+            forgotten = set(matched) - set(existing_metadata)
+            
+            if forgotten:
+                reassigned = [i for i, match in enumerate(duplicate_of) if match in forgotten]
+                with self._recent_images_lock:
+                    for user_id in {item["user_id"] for item in items}:
+                        recent = self._recent_images[user_id]
+                        kept = [entry for entry in recent if entry[1] not in forgotten]
+                        recent.clear()
+                        recent.extend(kept)
+                    for i in reassigned:
+                        duplicate_of[i] = None
+                        ids[i] = items[i].get("id") or self.generate_id("img", items[i]["user_id"], self.clock())
+                        self._recent_images[items[i]["user_id"]].append((hashes[i], ids[i]))
+            
+            existing_items = [{"id": item_id, "metadata": metadata} for item_id, metadata in existing_metadata.items()]
+            for collection, positions in self.partitions.group(
+                "emotional_images", [item["metadata"]["user_id"] for item in existing_items]
+            ):
+                self._update_memory_strength(collection, [existing_items[i] for i in positions])
+        self.image_duplicates += sum(1 for match in duplicate_of if match is not None)
+        
+        new_positions = [i for i, match in enumerate(duplicate_of) if match is None]
+        
+        if new_positions:
+            # Get image embeddings
+            image_embeddings = self.embed_images([images[i] for i in new_positions])
+            
+            new_ids, documents, metadatas = [], [], []
+            
+            for i in new_positions:
+                item = items[i]
+                
+                # Content-addressed, so rewriting a replayed image is a no-op
+                if item.get("image_file"):
+                    with open(item["image_file"], "rb") as f:
+                        stored = self.image_store.put(jpeg_bytes=f.read())
+                else:
+                    stored = self.image_store.put(image=images[i])
+                
+                # Add required metadata
+                timestamp = item.get("timestamp") or self.clock()
+                metadata = dict(item.get("metadata") or {})
+                metadata.update({
+                    "user_id": item["user_id"],
+                    "timestamp": timestamp,
+                    "last_access_time": timestamp,
+                    "memory_strength": self.default_memory_strength,
+                    "emotion_description": item["emotion_description"],
+                    "type": "emotional_image",
+                    "image_path": stored["path"],
+                    "thumbnail_path": stored["thumbnail_path"],
+                    "perceptual_hash": f"{hashes[i]:016x}"
+                })
+                
+                new_ids.append(ids[i])
+                documents.append(item["emotion_description"])
+                metadatas.append(metadata)
+            
+            # Add to the collections of the users' partitions
+            for collection, positions in self.partitions.group(
+                "emotional_images", [metadata["user_id"] for metadata in metadatas]
+            ):
+                chunk_ids = [new_ids[i] for i in positions]
+                chunk_metadatas = [metadatas[i] for i in positions]
+                collection.upsert(
+                    ids=chunk_ids,
+                    embeddings=image_embeddings[positions],
+                    metadatas=chunk_metadatas,
+                    documents=[documents[i] for i in positions]
+                )
+                self.expiry_index.track(collection.name, chunk_ids, chunk_metadatas)
+            self.recency_index.add("emotional_images", new_ids, metadatas)
+            self._add_to_hot_tier("emotional_images", new_ids, documents, metadatas, image_embeddings)
+        
+        # Spool files are only dropped once their image is stored or deduplicated
+        for item in items:
+            if item.get("image_file"):
+                os.remove(item["image_file"])
         
-        return image_id
+        return ids
     
     def add_event_summary(self,
                          user_id: str,
@@ -252,30 +839,126 @@ class MemoryBank:
         Returns:
             ID of the added summary
         """
-        # Create metadata
-        if metadata is None:
-            metadata = {}
+        return self.add_event_summaries([{
+            "user_id": user_id,
+            "summary_text": summary_text,
+            "metadata": metadata
+        }])[0]
+    
+    def add_event_summaries(self, items: List[Dict], chunk_size: int = DEFAULT_WRITE_CHUNK_SIZE) -> List[str]:
+        """
+        Add several event summaries to memory, embedding and writing them in chunks.
+        
+        Args:
+            items: Dicts with the add_event_summary arguments, optionally with
+                a precomputed "id" and "timestamp" like add_conversations, and a
+                "last_access_time" when the summary is fresher than its timestamp
+            chunk_size: Number of items embedded and written per Chroma call
             
-        # Add required metadata
-        timestamp = time.time()
-        summary_id = f"sum_{user_id}_{int(timestamp)}"
+        Returns:
+            IDs of the added summaries
+        """
+        ids, documents, metadatas = [], [], []
         
-        metadata.update({
-            "user_id": user_id,
-            "timestamp": timestamp,
-            "last_access_time": timestamp,
-            "memory_strength": self.default_memory_strength,
-            "type": "event_summary"
-        })
+        for item in items:
+            # Add required metadata
+            timestamp = item.get("timestamp") or self.clock()
+            summary_id = item.get("id") or self.generate_id("sum", item["user_id"], timestamp)
+            
+            metadata = dict(item.get("metadata") or {})
+            metadata.update({
+                "user_id": item["user_id"],
+                "timestamp": timestamp,
+                "last_access_time": item.get("last_access_time") or timestamp,
+                "memory_strength": self.default_memory_strength,
+                "type": "event_summary"
+            })
+            
+            ids.append(summary_id)
+            documents.append(item["summary_text"])
+            metadatas.append(metadata)
         
-        # Add to collection
-        self.summaries_collection.add(
-            ids=[summary_id],
-            documents=[summary_text],
-            metadatas=[metadata]
-        )
+        self._upsert_text_chunks("event_summaries", ids, documents, metadatas, chunk_size)
         
-        return summary_id
+        for user_id in {item["user_id"] for item in items}:
+            self.hot_cache.invalidate(user_id, "summaries")
+        
+        return ids
+    
+    def ingest_jsonl(self,
+                     jsonl_path: str,
+                     batch_size: int = DEFAULT_WRITE_CHUNK_SIZE,
+                     show_progress: bool = True) -> Dict:
+        """
+        Bulk load historical memories from a JSONL file.
+        
+        Each line is one memory with a "type" of "conversation",
+        "event_summary" or "emotional_image" and the fields of the matching
+        add_* method ("image_path" is read for images). An optional
+        "timestamp" keeps the original time. The file is streamed and written
+        in batches, so it never has to fit in memory.
+        
+        Args:
+            jsonl_path: Path of the JSONL file
+            batch_size: Number of items of one type buffered before a write
+            show_progress: Show a tqdm progress bar
+            
+        Returns:
+            Dict with per-type counts, skipped lines, elapsed seconds and items per second
+        """
+        writers = {
+            "conversation": self.add_conversations,
+            "event_summary": self.add_event_summaries,
+            "emotional_image": self.add_emotional_images
+        }
+        buffers = {kind: [] for kind in writers}
+        counts = {kind: 0 for kind in writers}
+        skipped = 0
+        
+        def flush(kind):
+            if buffers[kind]:
+                writers[kind](buffers[kind])
+                counts[kind] += len(buffers[kind])
+                progress.update(len(buffers[kind]))
+                buffers[kind] = []
+        
+        start_time = time.time()
+        with open(jsonl_path, "r", encoding="utf-8") as f, \
+                tqdm(desc="Ingesting memories", unit="items", disable=not show_progress) as progress:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                    kind = item.pop("type")
+                    if kind not in writers:
+                        raise ValueError(f"unknown type '{kind}'")
+                    if kind == "emotional_image":
+                        item["image"] = Image.open(item.pop("image_path")).convert("RGB")
+                except Exception as e:
+                    print(f"Skipping line {line_number} of {jsonl_path}: {e}")
+                    skipped += 1
+                    continue
+                
+                buffers[kind].append(item)
+                limit = min(batch_size, DEFAULT_IMAGE_CHUNK_SIZE) if kind == "emotional_image" else batch_size
+                if len(buffers[kind]) >= limit:
+                    flush(kind)
+            
+            for kind in writers:
+                flush(kind)
+        
+        elapsed = time.time() - start_time
+        total = sum(counts.values())
+        return {
+            "conversations": counts["conversation"],
+            "event_summaries": counts["event_summary"],
+            "emotional_images": counts["emotional_image"],
+            "skipped": skipped,
+            "items": total,
+            "seconds": elapsed,
+            "items_per_second": total / elapsed if elapsed else 0.0
+        }
     
     def update_user_portrait(self,
                            user_id: str,
@@ -297,7 +980,7 @@ class MemoryBank:
             metadata = {}
             
         # Add required metadata
-        timestamp = time.time()
+        timestamp = self.clock()
         portrait_id = f"portrait_{user_id}"
         
         metadata.update({
@@ -328,39 +1011,62 @@ class MemoryBank:
                 metadatas=[metadata]
             )
         
+        # Write through to the hot cache
+        self.hot_cache.invalidate(user_id, "portrait")
+        self.hot_cache.put(user_id, "portrait", {
+            "id": portrait_id,
+            "text": portrait_text,
+            "metadata": metadata
+        })
+        
         return portrait_id
     
-    def _update_memory_strength(self, collection, item_id):
+    def _update_memory_strength(self, collection, items: List[Dict]) -> List[Dict]:
         """
-        Update memory strength when an item is accessed.
+        Update memory strength of accessed items with a single batched write.
+        
+        Uses the metadata already returned by the retrieval, so no extra read
+        is needed.
         
         Args:
             collection: ChromaDB collection
-            item_id: ID of the memory item
+            items: Retrieved items, each with an "id" and its "metadata"
+            
+        Returns:
+            The new metadata of each item (empty if nothing was updated)
         """
-        if not self.forgetting_enabled:
-            return
+        if not self.forgetting_enabled or not items:
+            return []
             
         try:
-            item = collection.get(ids=[item_id])
-            if not item["ids"]:
-                return
-                
-            metadata = item["metadatas"][0]
+            now = self.clock()
+            ids = []
+            new_metadatas = []
             
-            # Increase memory strength and reset last access time
-            new_strength = metadata["memory_strength"] + 1.0
-            new_metadata = metadata.copy()
-            new_metadata["memory_strength"] = new_strength
-            new_metadata["last_access_time"] = time.time()
+            for item in items:
+                # Increase memory strength and reset last access time
+                new_metadata = item["metadata"].copy()
+                new_metadata["memory_strength"] = new_metadata["memory_strength"] + 1.0
+                new_metadata["last_access_time"] = now
+                
+                ids.append(item["id"])
+                new_metadatas.append(new_metadata)
             
             # Update in collection
             collection.update(
-                ids=[item_id],
-                metadatas=[new_metadata]
+                ids=ids,
+                metadatas=new_metadatas
             )
+            self.expiry_index.track(collection.name, ids, new_metadatas)
+            
+            # Keep the hot tier's copies in step
+            kind = self.partitions.kind_of(collection.name)
+            for item_id, new_metadata in zip(ids, new_metadatas):
+                self.hot_tier.update_metadata(kind, new_metadata["user_id"], [item_id], [new_metadata])
+            return new_metadatas
         except Exception as e:
             print(f"Error updating memory strength: {e}")
+            return []
     
     def retrieve_conversations(self, 
                               user_id: str,
@@ -375,44 +1081,38 @@ class MemoryBank:
             n_results: Number of results to return
             
         Returns:
-            List of relevant conversations with memory scores
+            List of relevant conversations ranked by similarity and memory score
         """
-        # Query the collection
-        results = self.conversations_collection.query(
-            query_texts=[query_text],
-            n_results=n_results * 2,  # Get more results than needed for filtering
-            where={"user_id": user_id}
+        # Query the collection, over-fetching so retention can re-rank
+        requested = self.ranker.fetch_size("conversations", n_results)
+        collection = self.partitions.get("conversations", user_id)
+        query_embedding = self.embed_query(query_text)
+        
+        # The user's recent conversations answer most queries in process
+        results = self.hot_tier.search(
+            "conversations", user_id, query_embedding, requested, n_results,
+            lambda limit: self._load_hot_memories("conversations", user_id, limit)
         )
+        if results is None:
+            results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=requested,
+                where=self.partitions.user_filter(user_id)
+            )
+            results = {key: results[key][0] for key in ("ids", "documents", "metadatas", "distances")}
         
-        retrieved_items = []
+        if not results["ids"]:
+            return []
         
-        if not results["ids"][0]:
-            return retrieved_items
-            
-        # Process results with memory scores
-        for i, (item_id, document, metadata) in enumerate(zip(
-            results["ids"][0], results["documents"][0], results["metadatas"][0]
-        )):
-            # Calculate memory score based on Ebbinghaus curve
-            memory_score = self._calculate_memory_score(
-                metadata["last_access_time"], 
-                metadata["memory_strength"]
-            )
-            
-            # Add item with memory score
-            retrieved_items.append({
-                "id": item_id,
-                "text": document,
-                "metadata": metadata,
-                "memory_score": memory_score
-            })
-            
-            # Update memory strength for retrieved items
-            self._update_memory_strength(self.conversations_collection, item_id)
+        retrieved_items = self._rank_items(
+            "conversations",
+            results["ids"], results["documents"], results["metadatas"],
+            results["distances"], n_results, requested
+        )
         
-        # Sort by memory score and limit results
-        retrieved_items.sort(key=lambda x: x["memory_score"], reverse=True)
-        return retrieved_items[:n_results]
+        # Update memory strength only for the items actually returned
+        self._update_memory_strength(collection, retrieved_items)
+        return retrieved_items
     
     def retrieve_emotional_images(self,
                                 user_id: str,
@@ -429,117 +1129,103 @@ class MemoryBank:
             n_results: Number of results to return
             
         Returns:
-            List of relevant images with memory scores
+            List of relevant images ranked by similarity and memory score
         """
+        requested = None
+        distances = None
+        collection = self.partitions.get("emotional_images", user_id)
+        
         try:
-            if query_image:
-                # Use image embedding for query
-                query_embedding = self._get_clip_embedding(query_image)
-                results = self.images_collection.query(
-                    query_embeddings=[query_embedding],
-                    n_results=n_results * 2,
-                    where={"user_id": user_id}
-                )
-                
-                # For query results, we need to handle nested lists
-                if results["ids"] and len(results["ids"]) > 0:
-                    ids = results["ids"][0]
-                    documents = results["documents"][0]
-                    metadatas = results["metadatas"][0]
+            if query_image or query_text:
+                # Image and text queries share the CLIP space, so both are an
+                # ANN search over the user's images
+                if query_image:
+                    query_embedding = self._get_clip_embedding(query_image)
                 else:
-                    return []
-                    
-            elif query_text:
-                # For text-based queries, we need a different approach since the image collection
-                # does not have a text embedding function
+                    query_embedding = self._get_clip_text_embedding(query_text)
                 
-                # Option 1: Use direct document match (basic filtering)
-                results = self.images_collection.get(
-                    where={"user_id": user_id}
+                requested = self.ranker.fetch_size("emotional_images", n_results)
+                results = self.hot_tier.search(
+                    "emotional_images", user_id, query_embedding, requested, n_results,
+                    lambda limit: self._load_hot_memories("emotional_images", user_id, limit)
                 )
+                if results is None:
+                    results = collection.query(
+                        query_embeddings=[query_embedding],
+                        n_results=requested,
+                        where=self.partitions.user_filter(user_id)
+                    )
+                    # For query results, we need to handle nested lists
+                    results = {key: results[key][0] for key in ("ids", "documents", "metadatas", "distances")}
                 
                 if not results["ids"]:
                     return []
-                
-                # Filter based on text similarity to emotion_description
-                filtered_items = []
-                for i, doc in enumerate(results["documents"]):
-                    # Simple text matching - can be improved with better text matching
-                    if query_text.lower() in doc.lower():
-                        filtered_items.append((
-                            results["ids"][i],
-                            results["documents"][i],
-                            results["metadatas"][i]
-                        ))
-                
-                # Sort by timestamp (recent first) if we have matches
-                if filtered_items:
-                    filtered_items.sort(key=lambda x: x[2]["timestamp"], reverse=True)
-                    ids = [item[0] for item in filtered_items[:n_results * 2]]
-                    documents = [item[1] for item in filtered_items[:n_results * 2]]
-                    metadatas = [item[2] for item in filtered_items[:n_results * 2]]
-                else:
-                    # Fall back to most recent if no matches
-                    items = list(zip(results["ids"], results["documents"], results["metadatas"]))
-                    items.sort(key=lambda x: x[2]["timestamp"], reverse=True)
-                    ids = [item[0] for item in items[:n_results * 2]]
-                    documents = [item[1] for item in items[:n_results * 2]]
-                    metadatas = [item[2] for item in items[:n_results * 2]]
+                ids = results["ids"]
+                documents = results["documents"]
+                metadatas = results["metadatas"]
+                distances = results["distances"]
+                    
             else:
-                # Get recent images
-                results = self.images_collection.get(
-                    where={"user_id": user_id},
-                    limit=n_results * 2
-                )
+                # Most recent n_results * 2 images
+                results = self._recent_memories("emotional_images", user_id, n_results * 2, ["documents", "metadatas"])
                 
                 if not results["ids"]:
                     return []
-                    
-                # For get results, the lists are not nested
+                
                 ids = results["ids"]
                 documents = results["documents"]
                 metadatas = results["metadatas"]
-                
-                # Sort by timestamp
-                items = list(zip(ids, documents, metadatas))
-                items.sort(key=lambda x: x[2]["timestamp"], reverse=True)
-                
-                # Unpack sorted items
-                ids = [item[0] for item in items[:n_results * 2]]
-                documents = [item[1] for item in items[:n_results * 2]]
-                metadatas = [item[2] for item in items[:n_results * 2]]
         
         except Exception as e:
             print(f"Error retrieving emotional images: {e}")
             return []
         
-        retrieved_items = []
+        retrieved_items = self._rank_items(
+            "emotional_images", ids, documents, metadatas, distances,
+            n_results, requested, text_key="description"
+        )
+        for item in retrieved_items:
+            item["image_path"] = item["metadata"].get("image_path")
         
-        # Process results with memory scores
-        for i, (item_id, document, metadata) in enumerate(zip(
-            ids, documents, metadatas
-        )):
-            # Calculate memory score
-            memory_score = self._calculate_memory_score(
-                metadata["last_access_time"], 
-                metadata["memory_strength"]
-            )
-            
-            # Add item with memory score
-            retrieved_items.append({
-                "id": item_id,
-                "description": document,
-                "metadata": metadata,
-                "memory_score": memory_score,
-                "image_path": metadata.get("image_path")
-            })
-            
-            # Update memory strength for retrieved items
-            self._update_memory_strength(self.images_collection, item_id)
+        # Update memory strength only for the items actually returned
+        self._update_memory_strength(collection, retrieved_items)
+        return retrieved_items
+    
+    def _get_cached_summaries(self, user_id: str) -> Optional[Dict]:
+        """
+        Get all event summaries of a user from the hot cache, loading them on a miss.
+        
+        Returns:
+            Dict with ids, documents, metadatas and a normalized embedding
+            matrix, or None if the user has too many summaries to cache
+        """
+        found, summaries = self.hot_cache.get(user_id, "summaries")
+        if found:
+            return summaries
+        
+        generation = self.hot_cache.generation(user_id)
+        results = self.partitions.get("event_summaries", user_id).get(
+            where=self.partitions.user_filter(user_id),
+            include=["documents", "metadatas", "embeddings"],
+            limit=self.max_cached_summaries + 1
+        )
+        
+        if len(results["ids"]) > self.max_cached_summaries:
+            summaries = None
+        else:
+            embeddings = np.asarray(results["embeddings"], dtype=np.float32)
+            # A user without summaries comes back as an empty 1-D array
+            embeddings = embeddings.reshape(len(results["ids"]), embeddings.size // max(len(results["ids"]), 1))
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            summaries = {
+                "ids": list(results["ids"]),
+                "documents": list(results["documents"]),
+                "metadatas": list(results["metadatas"]),
+                "embeddings": embeddings / np.where(norms > 0, norms, 1.0)
+            }
         
-        # Sort by memory score and limit results
-        retrieved_items.sort(key=lambda x: x["memory_score"], reverse=True)
-        return retrieved_items[:n_results]
+        self.hot_cache.put(user_id, "summaries", summaries, generation)
+        return summaries
     
     def retrieve_event_summaries(self,
                                user_id: str,
@@ -548,20 +1234,49 @@ class MemoryBank:
         """
         Retrieve event summaries.
         
+        Summaries change rarely, so a user's summaries are kept in the hot
+        cache and ranked in process; users with more than max_cached_summaries
+        are queried in Chroma.
+        
         Args:
             user_id: User ID
             query_text: Query text (optional)
             n_results: Number of results to return
             
         Returns:
-            List of relevant summaries with memory scores
+            List of relevant summaries ranked by similarity and memory score
         """
-        if query_text:
+        requested = None
+        distances = None
+        collection = self.partitions.get("event_summaries", user_id)
+        summaries = self._get_cached_summaries(user_id)
+        
+        if summaries is not None:
+            if not summaries["ids"]:
+                return []
+            
+            ids = summaries["ids"]
+            documents = summaries["documents"]
+            metadatas = summaries["metadatas"]
+            
+            if query_text:
+                query = np.asarray(self.embed_query(query_text), dtype=np.float32)
+                query = query / (np.linalg.norm(query) or 1.0)
+                # Cosine distance, as the collection's hnsw:space
+                distances = (1.0 - summaries["embeddings"] @ query).tolist()
+            else:
+                # Most recent n_results * 2
+                order = sorted(range(len(ids)), key=lambda i: metadatas[i]["timestamp"], reverse=True)[:n_results * 2]
+                ids = [ids[i] for i in order]
+                documents = [documents[i] for i in order]
+                metadatas = [metadatas[i] for i in order]
+        elif query_text:
             # Query with text
-            results = self.summaries_collection.query(
-                query_texts=[query_text],
-                n_results=n_results * 2,
-                where={"user_id": user_id}
+            requested = self.ranker.fetch_size("event_summaries", n_results)
+            results = collection.query(
+                query_embeddings=[self.embed_query(query_text)],
+                n_results=requested,
+                where=self.partitions.user_filter(user_id)
             )
             
             if not results["ids"][0]:
@@ -570,241 +1285,248 @@ class MemoryBank:
             ids = results["ids"][0]
             documents = results["documents"][0]
             metadatas = results["metadatas"][0]
+            distances = results["distances"][0]
         else:
-            # Get recent summaries
-            results = self.summaries_collection.get(
-                where={"user_id": user_id}
-            )
+            # Most recent n_results * 2 summaries
+            results = self._recent_memories("event_summaries", user_id, n_results * 2, ["documents", "metadatas"])
             
             if not results["ids"]:
                 return []
-                
-            # Sort by timestamp (recent first)
-            items = []
-            for i, (item_id, document, metadata) in enumerate(zip(
-                results["ids"], results["documents"], results["metadatas"]
-            )):
-                items.append((item_id, document, metadata))
-            
-            items.sort(key=lambda x: x[2]["timestamp"], reverse=True)
-            
-            # Take most recent n_results * 2
-            ids = [item[0] for item in items[:n_results * 2]]
-            documents = [item[1] for item in items[:n_results * 2]]
-            metadatas = [item[2] for item in items[:n_results * 2]]
-        
-        retrieved_items = []
-        
-        # Process results with memory scores
-        for i, (item_id, document, metadata) in enumerate(zip(ids, documents, metadatas)):
-            # Calculate memory score
-            memory_score = self._calculate_memory_score(
-                metadata["last_access_time"], 
-                metadata["memory_strength"]
-            )
-            
-            # Add item with memory score
-            retrieved_items.append({
-                "id": item_id,
-                "text": document,
-                "metadata": metadata,
-                "memory_score": memory_score
-            })
             
-            # Update memory strength for retrieved items
-            self._update_memory_strength(self.summaries_collection, item_id)
+            ids = results["ids"]
+            documents = results["documents"]
+            metadatas = results["metadatas"]
         
-        # Sort by memory score and limit results
-        retrieved_items.sort(key=lambda x: x["memory_score"], reverse=True)
-        return retrieved_items[:n_results]
+        retrieved_items = self._rank_items(
+            "event_summaries", ids, documents, metadatas, distances, n_results, requested
+        )
+        
+        # Update memory strength only for the items actually returned
+        new_metadatas = self._update_memory_strength(collection, retrieved_items)
+        
+        # Keep the cached copies in step with the stored strengths
+        if summaries is not None and new_metadatas:
+            positions = {item_id: i for i, item_id in enumerate(summaries["ids"])}
+            for item, new_metadata in zip(retrieved_items, new_metadatas):
+                summaries["metadatas"][positions[item["id"]]] = new_metadata
+        
+        return retrieved_items
     
     def get_user_portrait(self, user_id: str) -> Optional[Dict]:
         """
         Get user portrait.
         
+        Portraits are served from the hot cache once loaded. They never
+        expire, so cached reads skip the memory-strength update too.
+        
         Args:
             user_id: User ID
             
         Returns:
             User portrait or None if not found
         """
+        found, portrait = self.hot_cache.get(user_id, "portrait")
+        if found:
+            return portrait
+        
         portrait_id = f"portrait_{user_id}"
+        generation = self.hot_cache.generation(user_id)
         
         try:
             result = self.user_portrait_collection.get(ids=[portrait_id])
             
             if not result["ids"]:
+                self.hot_cache.put(user_id, "portrait", None, generation)
                 return None
                 
-            # Update memory strength
-            self._update_memory_strength(self.user_portrait_collection, portrait_id)
-            
-            return {
+            portrait = {
                 "id": portrait_id,
                 "text": result["documents"][0],
                 "metadata": result["metadatas"][0]
             }
+            
+            # Update memory strength
+            self._update_memory_strength(self.user_portrait_collection, [portrait])
+            
+            self.hot_cache.put(user_id, "portrait", portrait, generation)
+            return portrait
         except Exception:
             return None
     
-    def increment_session_count(self, user_id: str):
+    def increment_session_count(self, user_id: str) -> int:
         """
         Increment session count for user.
         
         Args:
             user_id: User ID
+            
+        Returns:
+            The new session count
         """
-        self.current_user = user_id
-        key = f"session_count_{user_id}"
-        
+        return self.user_state.increment(
+            user_id, "session_count", initial=lambda: self._legacy_session_count(user_id)
+        )
+    
+    def _legacy_session_count(self, user_id: str) -> int:
+        """Session count stored by older versions in the session_metadata collection."""
         try:
-            # Try to get existing session metadata
-            result = self.client.get_or_create_collection("session_metadata").get(
-                ids=[key]
-            )
-            
-            if result["ids"]:
-                count = int(result["documents"][0]) + 1
-                self.client.get_or_create_collection("session_metadata").update(
-                    ids=[key],
-                    documents=[str(count)],
-                    metadatas=[{"user_id": user_id}]
-                )
-                self.session_count = count
-            else:
-                # First session
-                self.client.get_or_create_collection("session_metadata").add(
-                    ids=[key],
-                    documents=["1"],
-                    metadatas=[{"user_id": user_id}]
-                )
-                self.session_count = 1
+            session_collection = self.client.get_collection("session_metadata")
+            result = session_collection.get(ids=[f"session_count_{user_id}"])
+            return int(result["documents"][0]) if result["ids"] else 0
         except Exception:
-            # First session or error
-            self.client.get_or_create_collection("session_metadata").add(
-                ids=[key],
-                documents=["1"],
-                metadatas=[{"user_id": user_id}]
-            )
-            self.session_count = 1
+            # No legacy collection: the user starts from zero
+            return 0
     
-    def clean_expired_memories(self, threshold: float = 0.1):
+    def clean_expired_memories(self, threshold: float = 0.1) -> Dict:
         """
         Clean up memories with scores below threshold.
         
+        Only memories the expiry index reports as due are read and deleted,
+        so the cost follows the number of expiring memories rather than the
+        total stored. For periodic cleanup, start the background sweeper with
+        MemoryExpiry.start_memory_sweeper instead.
+        
         Args:
             threshold: Memory score threshold for deletion
-        """
-        if not self.forgetting_enabled:
-            return
-            
-        for collection in [
-            self.conversations_collection, 
-            self.images_collection,
-            self.summaries_collection
-        ]:
-            # Get all items
-            results = collection.get()
-            
-            if not results["ids"]:
-                continue
-                
-            # Check each item's memory score
-            ids_to_delete = []
-            
-            for item_id, metadata in zip(results["ids"], results["metadatas"]):
-                # Skip user portraits (they don't expire)
-                if metadata.get("type") == "user_portrait":
-                    continue
-                    
-                memory_score = self._calculate_memory_score(
-                    metadata["last_access_time"],
-                    metadata["memory_strength"]
-                )
-                
-                if memory_score < threshold:
-                    ids_to_delete.append(item_id)
             
-            # Delete expired memories
-            if ids_to_delete:
-                collection.delete(ids=ids_to_delete)
-                print(f"Deleted {len(ids_to_delete)} expired memories from {collection.name}")
+        Returns:
+            Dict with checked, deleted and kept counts
+        """
+        self.expiry_index.set_threshold(threshold)
+        return get_memory_sweeper(self).sweep_once()
 
+    def _timed_lookup(self, lookup, *args) -> Tuple[object, float]:
+        """Run a context lookup and measure how long it took."""
+        start_time = time.time()
+        result = lookup(*args)
+        return result, time.time() - start_time
+    
     def get_prompt_context(self, user_id: str, user_input: str) -> Dict:
         """
         Get all context for the prompt template.
         
+        The lookups are independent and run concurrently. A lookup that fails
+        or does not finish within context_lookup_timeout leaves its section
+        empty instead of stalling the turn.
+        
         Args:
             user_id: User ID
             user_input: Current user input
             
         Returns:
-            Dict with all context for the prompt
+            Dict with all context for the prompt, plus per-lookup timings in
+            "lookup_timings" (None for lookups that timed out or failed)
         """
-        # Get relevant conversations
-        relevant_convs = self.retrieve_conversations(user_id, user_input)
+        lookups = {
+            "conversations": (self.retrieve_conversations, user_id, user_input),
+            "emotional_images": (self.retrieve_emotional_images, user_id, user_input),
+            "event_summaries": (self.retrieve_event_summaries, user_id, user_input),
+            "user_portrait": (self.get_user_portrait, user_id),
+            "session_count": (self.increment_session_count, user_id)
+        }
+        futures = {
+            name: self._context_executor.submit(self._timed_lookup, *lookup)
+            for name, lookup in lookups.items()
+        }
+        wait(futures.values(), timeout=self.context_lookup_timeout)
+        
+        results = {}
+        lookup_timings = {}
+        for name, future in futures.items():
+            results[name] = None
+            lookup_timings[name] = None
+            if not future.done():
+                print(f"Context lookup '{name}' timed out after {self.context_lookup_timeout}s, leaving it empty")
+                continue
+            try:
+                results[name], lookup_timings[name] = future.result()
+            except Exception as e:
+                print(f"Error in context lookup '{name}': {e}")
+        
         conv_text = "\n\n".join([
             f"[Conversation from {datetime.fromtimestamp(c['metadata']['timestamp']).strftime('%Y-%m-%d %H:%M')}]\n{c['text']}"
-            for c in relevant_convs
+            for c in results["conversations"] or []
         ])
         
-        # Get emotional images context
-        try:
-            emotional_imgs = self.retrieve_emotional_images(user_id, user_input)
-            img_text = "\n".join([
-                f"[Emotional state from {datetime.fromtimestamp(img['metadata']['timestamp']).strftime('%Y-%m-%d %H:%M')}]\n{img['description']}"
-                for img in emotional_imgs
-            ])
-        except Exception as e:
-            print(f"Error retrieving emotional images for prompt context: {e}")
-            img_text = ""
+        img_text = "\n".join([
+            f"[Emotional state from {datetime.fromtimestamp(img['metadata']['timestamp']).strftime('%Y-%m-%d %H:%M')}]\n{img['description']}"
+            for img in results["emotional_images"] or []
+        ])
         
-        # Get event summaries
-        summaries = self.retrieve_event_summaries(user_id, user_input)
         summary_text = "\n\n".join([
             f"[Event from {datetime.fromtimestamp(s['metadata']['timestamp']).strftime('%Y-%m-%d %H:%M')}]\n{s['text']}"
-            for s in summaries
+            for s in results["event_summaries"] or []
         ])
         
-        # Get user portrait
-        portrait = self.get_user_portrait(user_id)
+        portrait = results["user_portrait"]
         portrait_text = portrait["text"] if portrait else "No user portrait available yet."
         
-        # Get session count
-        self.increment_session_count(user_id)
+        # The increment still lands if it was only slow; the prompt just doesn't show it
+        session_count = results["session_count"] if results["session_count"] is not None else "unknown"
         
         return {
-            "current_datetime": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "current_datetime": datetime.fromtimestamp(self.clock()).strftime("%Y-%m-%d %H:%M"),
             "user_name": user_id,
-            "session_count": self.session_count,
+            "session_count": session_count,
             "memory_records": conv_text if conv_text else "No relevant past conversations.",
             "emotional_image_context": img_text if img_text else "No emotional image analysis available.",
             "user_portrait": portrait_text,
             "event_summaries": summary_text if summary_text else "No event summaries available.",
-            "user_input": user_input
+            "user_input": user_input,
+            "lookup_timings": lookup_timings
         }
 
 def load_existing_memory(
     persist_directory: str,
     text_model_name: str = "all-MiniLM-L6-v2",
     clip_model_name: str = "openai/clip-vit-base-patch32",
-    forgetting_enabled: bool = True
+    forgetting_enabled: bool = True,
+    snapshot_directory: str = None,
+    partitioning: str = None
 ) -> MemoryBank:
     """
     Load an existing memory storage from disk.
     
+    When a snapshot is given and the storage directory holds no ChromaDB
+    data yet, the storage is first rebuilt from the snapshot (see
+    MemorySnapshot.export_snapshot), e.g. to start a replica on a new node.
+    The restore is recorded as pending before any data is written and as
+    complete once it finished, so an interrupted restore is resumed on the
+    next start instead of being mistaken for a loaded storage.
+    
     Args:
         persist_directory: Path to the existing memory storage directory
         text_model_name: Name of the text embedding model to use
         clip_model_name: Name of the CLIP model for image embeddings
         forgetting_enabled: Whether to enable the Ebbinghaus forgetting curve
+        snapshot_directory: Snapshot to restore into an empty storage directory (optional)
+        partitioning: Partition layout of a storage restored from a snapshot
         
     Returns:
         A MemoryBank instance with the loaded memory
         
     Raises:
-        ValueError: If the directory doesn't exist or doesn't contain valid memory data
+        ValueError: If the directory doesn't exist, doesn't contain valid memory
+            data or holds an interrupted restore and no snapshot is given
     """
+    restore_state = read_restore_state(persist_directory)
+    interrupted = restore_state is not None and not restore_state["complete"]
+    if snapshot_directory and (interrupted or not os.path.exists(os.path.join(persist_directory, "chroma.sqlite3"))):
+        # Before the bank creates chroma.sqlite3, which alone would look like a finished restore
+        write_restore_state(persist_directory, snapshot_directory, complete=False)
+        memory_bank = MemoryBank(
+            persist_directory=persist_directory,
+            text_model_name=text_model_name,
+            clip_model_name=clip_model_name,
+            forgetting_enabled=forgetting_enabled,
+            partitioning=partitioning
+        )
+        restored = restore_snapshot(memory_bank, snapshot_directory)
+        write_restore_state(persist_directory, snapshot_directory, complete=True)
+        print(f"Restored {sum(restored['records'].values())} memories from snapshot '{snapshot_directory}' "
+              f"in {restored['seconds']:.2f}s ({restored['seconds_per_million']:.1f}s per million)")
+        return memory_bank
+    
     # Check if directory exists
     if not os.path.exists(persist_directory):
         raise ValueError(f"Memory storage directory '{persist_directory}' not found")
@@ -813,6 +1535,12 @@ def load_existing_memory(
     if not os.path.exists(os.path.join(persist_directory, "chroma.sqlite3")):
         raise ValueError(f"Directory '{persist_directory}' doesn't contain valid ChromaDB data")
     
+    if interrupted:
+        raise ValueError(
+            f"Restoring '{persist_directory}' from snapshot '{restore_state['snapshot']}' was interrupted; "
+            f"pass snapshot_directory to resume it"
+        )
+    
     # Initialize a new memory bank with the existing directory
     memory_bank = MemoryBank(
         persist_directory=persist_directory,
@@ -0,0 +1,409 @@
+import os
+import hashlib
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List
+import numpy as np
+import requests
+
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+SECONDS_PER_DAY = 24 * 3600
+ARCHIVE_COLLECTION = "conversation_archive"
+
+
+class MemoryConsolidator:
+    """
+    Rolls aging conversations of a MemoryBank into event summaries.
+
+    Conversations older than the minimum age are grouped per user, first into
+    time windows and then by topic (embedding similarity), and each group is
+    summarized by the local LLM into one event summary. The summarized
+    conversations are moved to an archive collection that retrieval never
+    searches, so the active collections only hold recent conversations plus
+    one summary per consolidated group. LLM calls are rate limited so the
+    job does not compete with live turns for the model.
+
+    By default the minimum age is a fraction of the time an untouched new
+    memory takes to expire, so conversations are summarized before the
+    sweeper would forget them. While a consolidator is attached to the bank
+    the sweeper leaves expired conversations to it instead of deleting them.
+    """
+
+    def __init__(self,
+                 memory_bank,
+                 ollama_base_url: str = OLLAMA_BASE_URL,
+                 model: str = "llama3.2:3b",
+                 min_age_days: float = None,
+                 expiry_lead: float = 0.5,
+                 window_hours: float = 24.0,
+                 topic_similarity: float = 0.5,
+                 min_group_size: int = 2,
+                 max_group_size: int = 20,
+                 max_summaries_per_minute: float = 6.0,
+                 interval: float = 3600.0,
+                 page_size: int = 1000):
+        """
+        Initialize MemoryConsolidator.
+
+        Args:
+            memory_bank: MemoryBank to consolidate
+            ollama_base_url: Base URL of the local Ollama server
+            model: Ollama model used for the summaries
+            min_age_days: Conversations older than this are consolidated; None
+                derives it from the expiry horizon (see expiry_lead)
+            expiry_lead: With min_age_days None, conversations are consolidated
+                once they reach this fraction of the lifetime of an untouched
+                memory of default strength
+            window_hours: Conversations further apart than this are never summarized together
+            topic_similarity: Cosine similarity to a group's centroid needed to join it
+            min_group_size: Topic groups smaller than this are merged into one
+                mixed group per time window
+            max_group_size: Maximum conversations per summary
+            max_summaries_per_minute: Upper bound on the LLM call rate
+            interval: Seconds between background runs
+            page_size: Items read per page when looking for aging conversations
+        """
+        self.memory_bank = memory_bank
+        self.ollama_base_url = ollama_base_url
+        self.model = model
+        self.min_age_days = min_age_days
+        self.expiry_lead = expiry_lead
+        self.window_seconds = window_hours * 3600
+        self.topic_similarity = topic_similarity
+        self.min_group_size = min_group_size
+        self.max_group_size = max_group_size
+        self.max_summaries_per_minute = max_summaries_per_minute
+        self.interval = interval
+        self.page_size = page_size
+
+        # Archived conversations keep their embeddings but are never searched or swept
+        self.archive_collection = memory_bank.client.get_or_create_collection(
+            name=ARCHIVE_COLLECTION,
+            metadata={"hnsw:space": "cosine"}
+        )
+
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+        self._last_call = 0.0
+
+        # Metrics
+        self.runs = 0
+        self.summaries = 0
+        self.archived = 0
+        self.failed_groups = 0
+        self.last_run_seconds = 0.0
+
+    def min_age_seconds(self) -> float:
+        """Age after which conversations are consolidated."""
+        if self.min_age_days is not None:
+            return self.min_age_days * SECONDS_PER_DAY
+        # Untouched lifetime: last access (= write) until retention hits the sweeper threshold
+        memory_bank = self.memory_bank
+        return self.expiry_lead * memory_bank.expiry_index.projected_expiry(0.0, memory_bank.default_memory_strength)
+
+    def _aging_filter(self, user_id: str, cutoff: float) -> Dict:
+        """Chroma filter selecting a user's conversations older than cutoff."""
+        aging = {"timestamp": {"$lt": cutoff}}
+        user_filter = self.memory_bank.partitions.user_filter(user_id)
+        return {"$and": [user_filter, aging]} if user_filter else aging
+
+    def _aging_users(self, collection, cutoff: float) -> List[str]:
+        """Users with conversations older than cutoff in one collection (metadata-only scan)."""
+        users = set()
+        offset = 0
+        while True:
+            page = collection.get(
+                where={"timestamp": {"$lt": cutoff}},
+                include=["metadatas"],
+                limit=self.page_size,
+                offset=offset
+            )
+            if not page["ids"]:
+                break
+            users.update(metadata["user_id"] for metadata in page["metadatas"])
+            offset += len(page["ids"])
+        return sorted(users)
+
+    def group_conversations(self, timestamps: List[float], embeddings: np.ndarray) -> List[List[int]]:
+        """
+        Group one user's conversations by time window and topic.
+
+        Args:
+            timestamps: Conversation timestamps
+            embeddings: Conversation embeddings, one row per conversation
+
+        Returns:
+            Groups of conversation positions, oldest group first
+        """
+        if not timestamps:
+            return []
+
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(timestamps), -1)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.where(norms > 0, norms, 1.0)
+
+        # Split into time windows at gaps longer than the window, and at its length
+        order = sorted(range(len(timestamps)), key=lambda i: timestamps[i])
+        windows = [[order[0]]]
+        for i in order[1:]:
+            window = windows[-1]
+            if timestamps[i] - timestamps[window[0]] > self.window_seconds:
+                windows.append([i])
+            else:
+                window.append(i)
+
+        groups = []
+        for window in windows:
+            # Greedy clustering against running centroids
+            topics = []
+            centroids = []
+            for i in window:
+                if centroids:
+                    similarities = np.stack(centroids) @ embeddings[i]
+                    best = int(np.argmax(similarities))
+                    if similarities[best] >= self.topic_similarity:
+                        topics[best].append(i)
+                        centroid = embeddings[topics[best]].mean(axis=0)
+                        centroids[best] = centroid / (np.linalg.norm(centroid) or 1.0)
+                        continue
+                topics.append([i])
+                centroids.append(embeddings[i])
+
+            # Stray conversations of the window are summarized together
+            mixed = [i for topic in topics if len(topic) < self.min_group_size for i in topic]
+            window_groups = [topic for topic in topics if len(topic) >= self.min_group_size]
+            if mixed:
+                window_groups.append(sorted(mixed, key=lambda i: timestamps[i]))
+
+            for group in window_groups:
+                for start in range(0, len(group), self.max_group_size):
+                    groups.append(group[start:start + self.max_group_size])
+
+        return groups
+
+    def _create_summary_prompt(self, user_id: str, documents: List[str], timestamps: List[float]) -> str:
+        """Create the prompt summarizing one group of conversations"""
+        conversations = "\n\n".join(
+            f"[{datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M')}]\n{document}"
+            for document, timestamp in zip(documents, timestamps)
+        )
+        return f"""
+CONVERSATIONS WITH {user_id}:
+{conversations}
+
+TASK: Summarize these conversations as one event in the user's life, in 2-4 sentences. Keep names, dates, feelings and anything the user may bring up again. Write in the third person and do not add anything that was not said.
+
+EVENT SUMMARY:"""
+
+    def _summarize(self, prompt: str) -> str:
+        """Ask the local LLM for a summary, respecting the rate limit."""
+        if self.max_summaries_per_minute:
+            wait = self._last_call + 60.0 / self.max_summaries_per_minute - time.time()
+            if wait > 0:
+                self._stop.wait(wait)
+        self._last_call = time.time()
+
+        response = requests.post(
+            f"{self.ollama_base_url}/api/generate",
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                "stream": False,
+                "options": {
+                    "temperature": 0.2,
+                    "num_predict": 200
+                }
+            },
+            timeout=120
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Ollama returned status {response.status_code}")
+        return response.json().get("response", "").strip()
+
+    def consolidate_user(self, user_id: str, now: float = None, max_summaries: int = None) -> Dict:
+        """
+        Consolidate the aging conversations of one user.
+
+        A group's conversations are only archived once its summary is
+        stored, so a failed LLM call or a crash leaves them searchable and
+        the group is retried on the next run.
+
+        Args:
+            user_id: User ID
+            now: Current timestamp (defaults to the bank's clock)
+            max_summaries: Maximum number of summaries written (None for no limit)
+
+        Returns:
+            Dict with summaries written, conversations archived and failed groups
+        """
+        now = self.memory_bank.clock() if now is None else now
+        cutoff = now - self.min_age_seconds()
+        collection = self.memory_bank.partitions.get("conversations", user_id)
+
+        results = collection.get(
+            where=self._aging_filter(user_id, cutoff),
+            include=["documents", "metadatas", "embeddings"]
+        )
+        ids = results["ids"]
+        if not ids:
+            return {"summaries": 0, "archived": 0, "failed_groups": 0}
+
+        timestamps = [metadata["timestamp"] for metadata in results["metadatas"]]
+        embeddings = np.asarray(results["embeddings"], dtype=np.float32).reshape(len(ids), -1)
+
+        summaries = archived = failed = 0
+        for group in self.group_conversations(timestamps, embeddings):
+            if self._stop.is_set() or (max_summaries is not None and summaries >= max_summaries):
+                break
+
+            group_ids = [ids[i] for i in group]
+            group_timestamps = [timestamps[i] for i in group]
+            try:
+                summary_text = self._summarize(self._create_summary_prompt(
+                    user_id, [results["documents"][i] for i in group], group_timestamps
+                ))
+                if not summary_text:
+                    raise RuntimeError("empty summary")
+            except Exception as e:
+                print(f"Error summarizing {len(group)} conversations of {user_id}: {e}")
+                failed += 1
+                continue
+
+            # Deterministic ID, so a group retried after a crash replaces its summary
+            digest = hashlib.sha1("|".join(sorted(group_ids)).encode("utf-8")).hexdigest()[:12]
+            summary_id = f"sum_{user_id}_{int(max(group_timestamps))}_{digest}"
+            self.memory_bank.add_event_summaries([{
+                "id": summary_id,
+                "user_id": user_id,
+                "summary_text": summary_text,
+                "timestamp": max(group_timestamps),
+                # Dated like its sources, but its forgetting curve starts now
+                "last_access_time": now,
+                "metadata": {
+                    "source": "consolidation",
+                    "source_count": len(group),
+                    "period_start": min(group_timestamps),
+                    "period_end": max(group_timestamps)
+                }
+            }])
+
+            # Archive the sources, then drop them from the active collection
+            self.archive_collection.upsert(
+                ids=group_ids,
+                embeddings=embeddings[group],
+                documents=[results["documents"][i] for i in group],
+                metadatas=[dict(results["metadatas"][i], summary_id=summary_id) for i in group]
+            )
+            collection.delete(ids=group_ids)
+            self.memory_bank.expiry_index.discard(collection.name, group_ids)
+            self.memory_bank.recency_index.discard("conversations", group_ids)
+            self.memory_bank.hot_tier.invalidate(user_id, "conversations")
+
+            summaries += 1
+            archived += len(group)
+
+        return {"summaries": summaries, "archived": archived, "failed_groups": failed}
+
+    def run_once(self, now: float = None, max_summaries: int = None) -> Dict:
+        """
+        Consolidate the aging conversations of every user.
+
+        Args:
+            now: Current timestamp (defaults to the bank's clock)
+            max_summaries: Maximum number of summaries written in this run (None for no limit)
+
+        Returns:
+            Dict with users visited, summaries written, conversations archived,
+            failed groups and the elapsed seconds
+        """
+        with self._run_lock:
+            start_time = time.time()
+            now = self.memory_bank.clock() if now is None else now
+            cutoff = now - self.min_age_seconds()
+            totals = {"users": 0, "summaries": 0, "archived": 0, "failed_groups": 0}
+
+            for collection in self.memory_bank.partitions.collections(("conversations",)).values():
+                for user_id in self._aging_users(collection, cutoff):
+                    if self._stop.is_set():
+                        break
+                    remaining = None if max_summaries is None else max_summaries - totals["summaries"]
+                    if remaining is not None and remaining <= 0:
+                        break
+
+                    try:
+                        result = self.consolidate_user(user_id, now, remaining)
+                    except Exception as e:
+                        print(f"Error consolidating memories of {user_id}: {e}")
+                        continue
+                    totals["users"] += 1
+                    for key in ("summaries", "archived", "failed_groups"):
+                        totals[key] += result[key]
+
+            elapsed = time.time() - start_time
+            self.runs += 1
+            self.summaries += totals["summaries"]
+            self.archived += totals["archived"]
+            self.failed_groups += totals["failed_groups"]
+            self.last_run_seconds = elapsed
+            if totals["summaries"]:
+                print(f"Consolidated {totals['archived']} conversations into {totals['summaries']} event summaries")
+
+            totals["seconds"] = elapsed
+            return totals
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error consolidating memories: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start the background consolidation thread (no-op if already running)."""
+        if self._worker is None or not self._worker.is_alive():
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name="memory-consolidator", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the background consolidation thread."""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def get_stats(self) -> Dict:
+        """
+        Get consolidation metrics.
+
+        Returns:
+            Dict with run counters, summaries written, conversations archived
+            and the archive size
+        """
+        return {
+            "runs": self.runs,
+            "summaries": self.summaries,
+            "archived": self.archived,
+            "failed_groups": self.failed_groups,
+            "last_run_seconds": self.last_run_seconds,
+            "archive_size": self.archive_collection.count()
+        }
+
+
+_memory_consolidator_lock = threading.Lock()
+
+def get_memory_consolidator(memory_bank) -> MemoryConsolidator:
+    """Get the consolidator of a memory bank, creating it (not started) on first use"""
+    with _memory_consolidator_lock:
+        if memory_bank.memory_consolidator is None:
+            memory_bank.memory_consolidator = MemoryConsolidator(memory_bank)
+        return memory_bank.memory_consolidator
+
+
+def start_memory_consolidator(memory_bank) -> MemoryConsolidator:
+    """Start the background consolidator of a memory bank"""
+    consolidator = get_memory_consolidator(memory_bank)
+    consolidator.start()
+    return consolidator
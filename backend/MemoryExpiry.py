@@ -0,0 +1,375 @@
+import heapq
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+SECONDS_PER_DAY = 24 * 3600
+
+
+class ExpiryIndex:
+    """
+    Min-heap of memories ordered by the time their retention e^(-t/S) drops
+    below the forgetting threshold, i.e. last_access + S * ln(1/threshold) days.
+
+    Every write and memory-strength update re-projects the item, so finding
+    what is due never scans the collections. Superseded heap entries are
+    skipped lazily and the heap is compacted when they pile up.
+    """
+
+    def __init__(self, threshold: float = 0.1):
+        """
+        Initialize ExpiryIndex.
+
+        Args:
+            threshold: Retention below which a memory is forgotten
+        """
+        self._lock = threading.Lock()
+        self._heap = []
+        # (collection, id) -> (expires_at, last_access_time, memory_strength)
+        self._entries = {}
+        self.threshold = threshold
+        self._horizon_seconds = math.log(1.0 / threshold) * SECONDS_PER_DAY
+
+        # Set once existing memories have been loaded by MemorySweeper.build_index
+        self.built = False
+
+    def projected_expiry(self, last_access_time: float, memory_strength: float) -> float:
+        """Timestamp at which a memory's retention reaches the threshold."""
+        return last_access_time + memory_strength * self._horizon_seconds
+
+    def track(self, collection_name: str, ids: List[str], metadatas: List[Dict]):
+        """
+        Add or re-project memories after a write or an access.
+
+        Args:
+            collection_name: Name of the collection holding the memories
+            ids: Memory IDs
+            metadatas: Their current metadata (last_access_time, memory_strength)
+        """
+        with self._lock:
+            for item_id, metadata in zip(ids, metadatas):
+                # User portraits never expire
+                if metadata.get("type") == "user_portrait":
+                    continue
+
+                key = (collection_name, item_id)
+                last_access_time = metadata["last_access_time"]
+                previous = self._entries.get(key)
+                if previous and previous[1] > last_access_time:
+                    # Already tracked from a newer access
+                    continue
+
+                expires_at = self.projected_expiry(last_access_time, metadata["memory_strength"])
+                self._entries[key] = (expires_at, last_access_time, metadata["memory_strength"])
+                heapq.heappush(self._heap, (expires_at, collection_name, item_id))
+
+            if len(self._heap) > 2 * len(self._entries) + 1024:
+                self._rebuild_heap()
+
+    def discard(self, collection_name: str, ids: List[str]):
+        """Stop tracking deleted memories."""
+        with self._lock:
+            for item_id in ids:
+                self._entries.pop((collection_name, item_id), None)
+
+    def pop_due(self, now: float, limit: int) -> List[Tuple[str, str]]:
+        """
+        Remove and return memories whose projected expiry has passed.
+
+        Args:
+            now: Current timestamp
+            limit: Maximum number of memories returned
+
+        Returns:
+            (collection name, id) pairs, soonest expiry first
+        """
+        due = []
+        with self._lock:
+            while self._heap and len(due) < limit and self._heap[0][0] <= now:
+                expires_at, collection_name, item_id = heapq.heappop(self._heap)
+                key = (collection_name, item_id)
+                entry = self._entries.get(key)
+                if entry is None or entry[0] != expires_at:
+                    # Superseded by a later access, or already deleted
+                    continue
+                del self._entries[key]
+                due.append(key)
+        return due
+
+    def next_expiry(self) -> Optional[float]:
+        """Timestamp of the next projected expiry, or None when nothing is tracked."""
+        with self._lock:
+            while self._heap:
+                expires_at, collection_name, item_id = self._heap[0]
+                entry = self._entries.get((collection_name, item_id))
+                if entry is not None and entry[0] == expires_at:
+                    return expires_at
+                heapq.heappop(self._heap)
+            return None
+
+    def set_threshold(self, threshold: float):
+        """Change the forgetting threshold and re-project every tracked memory."""
+        with self._lock:
+            if threshold == self.threshold:
+                return
+            self.threshold = threshold
+            self._horizon_seconds = math.log(1.0 / threshold) * SECONDS_PER_DAY
+            self._entries = {
+                key: (self.projected_expiry(last_access_time, memory_strength), last_access_time, memory_strength)
+                for key, (_, last_access_time, memory_strength) in self._entries.items()
+            }
+            self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        """Drop superseded heap entries. Caller must hold the lock."""
+        self._heap = [
+            (expires_at, collection_name, item_id)
+            for (collection_name, item_id), (expires_at, _, _) in self._entries.items()
+        ]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict:
+        """
+        Get index metrics.
+
+        Returns:
+            Dict with tracked memories, heap size and the next projected expiry
+        """
+        next_expiry = self.next_expiry()
+        with self._lock:
+            return {
+                "threshold": self.threshold,
+                "built": self.built,
+                "tracked": len(self._entries),
+                "heap_size": len(self._heap),
+                "next_expiry": next_expiry
+            }
+
+
+class MemorySweeper:
+    """
+    Deletes forgotten memories using the ExpiryIndex of a MemoryBank.
+
+    Each sweep only touches memories the index reports as due: it re-reads
+    their metadata in batches, deletes the ones still below the threshold and
+    re-tracks the rest. While a MemoryConsolidator is attached to the bank,
+    expired conversations are left for it to summarize and archive instead. Deletes are rate limited so a large backlog of
+    expired memories does not stall concurrent requests.
+    """
+
+    def __init__(self,
+                 memory_bank,
+                 interval: float = 60.0,
+                 batch_size: int = 100,
+                 max_deletes_per_second: float = 200.0,
+                 page_size: int = 1000):
+        """
+        Initialize MemorySweeper.
+
+        Args:
+            memory_bank: MemoryBank to clean
+            interval: Maximum seconds between sweeps
+            batch_size: Memories checked and deleted per batch
+            max_deletes_per_second: Upper bound on the delete rate
+            page_size: Items read per page when building the index at startup
+        """
+        self.memory_bank = memory_bank
+        self.index = memory_bank.expiry_index
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_deletes_per_second = max_deletes_per_second
+        self.page_size = page_size
+
+        self._build_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+
+        # Metrics
+        self.sweeps = 0
+        self.checked = 0
+        self.deleted = 0
+        self.deferred = 0
+        self.last_sweep_seconds = 0.0
+
+    def build_index(self):
+        """Load existing memories into the index (paged metadata-only scan, once)."""
+        with self._build_lock:
+            if self.index.built:
+                return
+
+            start_time = time.time()
+            # Every collection whose memories can expire, across all partitions
+            for name, collection in self.memory_bank.partitions.collections().items():
+                offset = 0
+                while True:
+                    page = collection.get(include=["metadatas"], limit=self.page_size, offset=offset)
+                    if not page["ids"]:
+                        break
+                    self.index.track(name, page["ids"], page["metadatas"])
+                    offset += len(page["ids"])
+
+            self.index.built = True
+            print(f"Expiry index built with {len(self.index)} memories in {time.time() - start_time:.2f}s")
+
+    def sweep_once(self, now: float = None) -> Dict:
+        """
+        Delete every memory that is due.
+
+        Args:
+            now: Current timestamp (defaults to the bank's clock)
+
+        Returns:
+            Dict with checked, deleted, kept and deferred (left for the
+            consolidator) counts and the elapsed seconds
+        """
+        if not self.memory_bank.forgetting_enabled:
+            return {"checked": 0, "deleted": 0, "kept": 0, "deferred": 0, "seconds": 0.0}
+
+        self.build_index()
+
+        start_time = time.time()
+        now = self.memory_bank.clock() if now is None else now
+        partitions = self.memory_bank.partitions
+        checked = deleted = kept = deferred = 0
+
+        while not self._stop.is_set():
+            due = self.index.pop_due(now, self.batch_size)
+            if not due:
+                break
+
+            by_collection = {}
+            for collection_name, item_id in due:
+                by_collection.setdefault(collection_name, []).append(item_id)
+
+            batch_deleted = 0
+            for collection_name, ids in by_collection.items():
+                collection = partitions.by_name(collection_name)
+
+                # Re-check against the stored metadata, it may have been
+                # accessed by another process since it was indexed
+                current = collection.get(ids=ids, include=["metadatas"])
+                if not current["ids"]:
+                    continue
+                checked += len(current["ids"])
+
+                retention = self.memory_bank.ranker.retention(
+                    [m["last_access_time"] for m in current["metadatas"]],
+                    [m["memory_strength"] for m in current["metadatas"]],
+                    now
+                )
+                expired = [i for i, score in zip(current["ids"], retention) if score < self.index.threshold]
+                kind = partitions.kind_of(collection_name)
+                if expired and kind == "conversations" and self.memory_bank.memory_consolidator is not None:
+                    # Older than the consolidation age, so the next consolidation run archives them
+                    deferred += len(expired)
+                    expired = []
+                alive = [
+                    (i, m) for i, m, score in zip(current["ids"], current["metadatas"], retention)
+                    if score >= self.index.threshold
+                ]
+
+                if expired:
+                    collection.delete(ids=expired)
+                    batch_deleted += len(expired)
+                    print(f"Deleted {len(expired)} expired memories from {collection_name}")
+                    
+                    self.memory_bank.recency_index.discard(kind, expired)
+                    expired_ids = set(expired)
+                    
+                    if kind == "emotional_images":
+                        # Image files are shared by identical frames, so only unreferenced ones go
+                        self.memory_bank.remove_unreferenced_images(
+                            m.get("image_path") for i, m in zip(current["ids"], current["metadatas"]) if i in expired_ids
+                        )
+                    
+                    # Cached summaries and hot tier entries of these users are now stale
+                    for user_id in {m["user_id"] for i, m in zip(current["ids"], current["metadatas"]) if i in expired_ids}:
+                        if kind == "event_summaries":
+                            self.memory_bank.hot_cache.invalidate(user_id, "summaries")
+                        else:
+                            self.memory_bank.hot_tier.invalidate(user_id, kind)
+                if alive:
+                    self.index.track(collection_name, [i for i, _ in alive], [m for _, m in alive])
+                    kept += len(alive)
+
+            deleted += batch_deleted
+
+            # Rate limit
+            if batch_deleted and self.max_deletes_per_second:
+                self._stop.wait(batch_deleted / self.max_deletes_per_second)
+
+        elapsed = time.time() - start_time
+        self.sweeps += 1
+        self.checked += checked
+        self.deleted += deleted
+        self.deferred += deferred
+        self.last_sweep_seconds = elapsed
+        return {"checked": checked, "deleted": deleted, "kept": kept, "deferred": deferred, "seconds": elapsed}
+
+    def _run(self):
+        try:
+            self.build_index()
+        except Exception as e:
+            print(f"Error building expiry index: {e}")
+
+        while not self._stop.is_set():
+            try:
+                self.sweep_once()
+            except Exception as e:
+                print(f"Error sweeping expired memories: {e}")
+
+            # Sleep until the next projected expiry, but re-check at least every interval
+            next_expiry = self.index.next_expiry()
+            wait = self.interval if next_expiry is None else min(self.interval, max(next_expiry - self.memory_bank.clock(), 1.0))
+            self._stop.wait(wait)
+
+    def start(self):
+        """Start the background sweeper thread (no-op if already running)."""
+        if self._worker is None or not self._worker.is_alive():
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name="memory-sweeper", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the background sweeper thread."""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def get_stats(self) -> Dict:
+        """
+        Get sweeper metrics.
+
+        Returns:
+            Dict with sweep counters and the index stats
+        """
+        return {
+            "sweeps": self.sweeps,
+            "checked": self.checked,
+            "deleted": self.deleted,
+            "deferred": self.deferred,
+            "last_sweep_seconds": self.last_sweep_seconds,
+            "index": self.index.get_stats()
+        }
+
+
+_memory_sweeper_lock = threading.Lock()
+
+def get_memory_sweeper(memory_bank) -> MemorySweeper:
+    """Get the sweeper of a memory bank, creating it (not started) on first use"""
+    with _memory_sweeper_lock:
+        if memory_bank.memory_sweeper is None:
+            memory_bank.memory_sweeper = MemorySweeper(memory_bank)
+        return memory_bank.memory_sweeper
+
+
+def start_memory_sweeper(memory_bank) -> MemorySweeper:
+    """Start the background sweeper of a memory bank"""
+    sweeper = get_memory_sweeper(memory_bank)
+    sweeper.start()
+    return sweeper
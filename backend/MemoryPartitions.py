@@ -0,0 +1,368 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import chromadb
+from ModelRegistry import LazyTextEmbeddingFunction
+
+# Collections that can be partitioned; user portraits are looked up by ID and stay shared
+PARTITIONED_KINDS = ("conversations", "emotional_images", "event_summaries")
+PARTITION_MODES = ("shared", "user", "bucket")
+LAYOUT_FILE = "partitioning.json"
+
+
+def read_partition_layout(persist_directory: str) -> Dict:
+    """
+    Read the partition layout of a memory store.
+
+    Args:
+        persist_directory: Directory of the ChromaDB store
+
+    Returns:
+        Dict with "mode" and "buckets"; stores without a layout file are shared
+    """
+    try:
+        with open(os.path.join(persist_directory, LAYOUT_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"mode": "shared", "buckets": 0}
+
+
+def write_partition_layout(persist_directory: str, mode: str, buckets: int):
+    """Record the partition layout of a memory store (atomically)."""
+    path = os.path.join(persist_directory, LAYOUT_FILE)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"mode": mode, "buckets": buckets}, f)
+    os.replace(temp_path, path)
+
+
+class MemoryPartitions:
+    """
+    Maps users to the collections holding their memories.
+
+    In "shared" mode every user lives in one collection per kind, as before.
+    In "user" mode each user gets their own collections, and in "bucket" mode
+    users are spread over a fixed number of collections by a stable hash of
+    their ID. Each collection has its own HNSW index, so a user's search no
+    longer has to filter through every other tenant's vectors.
+
+    Every collection Chroma opens has a fixed cost, so "bucket" suits many
+    light users, while "user" suits fewer users with large histories.
+    """
+
+    def __init__(self,
+                 client,
+                 embedding_functions: Dict[str, Any],
+                 mode: str = "shared",
+                 buckets: int = 64,
+                 max_open: int = 4096):
+        """
+        Initialize MemoryPartitions.
+
+        Args:
+            client: ChromaDB client
+            embedding_functions: Embedding function per kind (None for precomputed embeddings)
+            mode: "shared", "user" or "bucket"
+            buckets: Number of buckets per kind in "bucket" mode
+            max_open: Maximum number of collection handles kept open
+        """
+        if mode not in PARTITION_MODES:
+            raise ValueError(f"Unsupported partitioning mode '{mode}'")
+        self.client = client
+        self.embedding_functions = embedding_functions
+        self.mode = mode
+        self.buckets = buckets if mode == "bucket" else 0
+        self.max_open = max_open
+
+        self._open = OrderedDict()
+        self._lock = threading.Lock()
+
+    def name(self, kind: str, user_id: str = None) -> str:
+        """
+        Name of the collection holding a user's memories of one kind.
+
+        Args:
+            kind: One of PARTITIONED_KINDS
+            user_id: User ID (ignored in "shared" mode)
+
+        Returns:
+            Collection name
+        """
+        if self.mode == "shared":
+            return kind
+
+        digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+        if self.mode == "bucket":
+            return f"{kind}__b{int(digest[:8], 16) % self.buckets:04d}"
+
+        # Readable but unique: sanitized user ID plus a digest
+        slug = re.sub(r"[^a-zA-Z0-9_-]", "_", user_id)[:48]
+        return f"{kind}__u_{slug}_{digest[:10]}"
+
+    @staticmethod
+    def kind_of(name: str) -> Optional[str]:
+        """Kind of a partition collection, or None for other collections."""
+        kind = name.split("__", 1)[0]
+        return kind if kind in PARTITIONED_KINDS else None
+
+    def owns(self, name: str) -> bool:
+        """Whether a collection name belongs to this layout."""
+        kind = self.kind_of(name)
+        if kind is None:
+            return False
+        if self.mode == "shared":
+            return name == kind
+        marker = "__b" if self.mode == "bucket" else "__u_"
+        return name.startswith(kind + marker)
+
+    def by_name(self, name: str):
+        """
+        Get (or create) a partition collection by name.
+
+        Args:
+            name: Collection name from name()
+
+        Returns:
+            ChromaDB collection
+        """
+        with self._lock:
+            collection = self._open.get(name)
+            if collection is not None:
+                self._open.move_to_end(name)
+                return collection
+
+        # Kinds without an embedding function are written with precomputed embeddings
+        embedding_function = self.embedding_functions.get(self.kind_of(name))
+        kwargs = {"embedding_function": embedding_function} if embedding_function is not None else {}
+        collection = self.client.get_or_create_collection(
+            name=name,
+            metadata={"hnsw:space": "cosine"},
+            **kwargs
+        )
+
+        with self._lock:
+            self._open[name] = collection
+            while len(self._open) > self.max_open:
+                self._open.popitem(last=False)
+        return collection
+
+    def get(self, kind: str, user_id: str = None):
+        """
+        Get the collection holding a user's memories of one kind.
+
+        Args:
+            kind: One of PARTITIONED_KINDS
+            user_id: User ID (ignored in "shared" mode)
+
+        Returns:
+            ChromaDB collection
+        """
+        return self.by_name(self.name(kind, user_id))
+
+    def user_filter(self, user_id: str) -> Optional[Dict]:
+        """
+        Metadata filter selecting a user's memories within their collection.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            The "where" filter, or None in "user" mode where the collection
+            holds nothing else and filtering would only slow the search down
+        """
+        return None if self.mode == "user" else {"user_id": user_id}
+
+    def group(self, kind: str, user_ids: List[str]) -> List[Tuple[Any, List[int]]]:
+        """
+        Group items by the collection they belong to.
+
+        Args:
+            kind: One of PARTITIONED_KINDS
+            user_ids: User ID of every item
+
+        Returns:
+            (collection, positions of its items) pairs
+        """
+        positions = {}
+        for i, user_id in enumerate(user_ids):
+            positions.setdefault(self.name(kind, user_id), []).append(i)
+        return [(self.by_name(name), indices) for name, indices in positions.items()]
+
+    def collections(self, kinds=PARTITIONED_KINDS) -> Dict[str, Any]:
+        """
+        All existing collections of this layout.
+
+        Args:
+            kinds: Kinds to include
+
+        Returns:
+            Dict of collection name to collection
+        """
+        names = [
+            collection.name if hasattr(collection, "name") else collection
+            for collection in self.client.list_collections()
+        ]
+        return {
+            name: self.by_name(name)
+            for name in sorted(names)
+            if self.owns(name) and self.kind_of(name) in kinds
+        }
+
+    def get_stats(self) -> Dict:
+        """
+        Get partitioning metrics.
+
+        Returns:
+            Dict with the mode, bucket count and open collection handles
+        """
+        with self._lock:
+            return {"mode": self.mode, "buckets": self.buckets, "open_collections": len(self._open)}
+
+
+def open_partitions(client,
+                    persist_directory: str,
+                    embedding_functions: Dict[str, Any],
+                    mode: str = None,
+                    buckets: int = 64) -> MemoryPartitions:
+    """
+    Open the partitions of a memory store, keeping its recorded layout.
+
+    Args:
+        client: ChromaDB client of the store
+        persist_directory: Directory of the ChromaDB store
+        embedding_functions: Embedding function per kind
+        mode: Requested mode; None uses the store's layout
+        buckets: Bucket count for a new "bucket" store
+
+    Returns:
+        MemoryPartitions of the store
+
+    Raises:
+        ValueError: If the store holds memories in a different layout
+    """
+    layout = read_partition_layout(persist_directory)
+    if mode is None or mode == layout["mode"]:
+        return MemoryPartitions(client, embedding_functions, layout["mode"], layout["buckets"] or buckets)
+
+    # A new layout is only adopted by an empty store
+    existing = MemoryPartitions(client, embedding_functions, layout["mode"], layout["buckets"])
+    if any(collection.count() for collection in existing.collections().values()):
+        raise ValueError(
+            f"Memory storage '{persist_directory}' is partitioned as '{layout['mode']}'; "
+            f"run 'python MemoryPartitions.py {persist_directory} --mode {mode}' to migrate it"
+        )
+    partitions = MemoryPartitions(client, embedding_functions, mode, buckets)
+    write_partition_layout(persist_directory, partitions.mode, partitions.buckets)
+    return partitions
+
+
+def migrate_partitions(persist_directory: str,
+                       mode: str,
+                       buckets: int = 64,
+                       page_size: int = 1000,
+                       text_model_name: str = "all-MiniLM-L6-v2") -> Dict:
+    """
+    Move a memory store to another partition layout in place.
+
+    Stored embeddings are copied, so nothing is re-embedded. Each source
+    collection is paged over a snapshot of its IDs, taken before anything is
+    written to it, and every page is upserted into its target collections
+    before the items that changed collection are deleted from the source.
+    Source and target names may overlap (e.g. 64 to 32 buckets); items that
+    already sit in their target collection are left in place. An interrupted
+    migration can simply be run again. The app must not be writing to the
+    store meanwhile.
+
+    Args:
+        persist_directory: Directory of the ChromaDB store
+        mode: Target mode, "shared", "user" or "bucket"
+        buckets: Number of buckets per kind in "bucket" mode
+        page_size: Items read and written per batch
+        text_model_name: Text embedding model recorded on new text collections
+
+    Returns:
+        Dict with items moved to another collection per kind, source and target collection counts
+        and elapsed seconds
+    """
+    start_time = time.time()
+    client = chromadb.PersistentClient(path=persist_directory)
+    # Embeddings are copied, so the text model is attached but never loaded
+    text_ef = LazyTextEmbeddingFunction(model_name=text_model_name)
+    embedding_functions = {"conversations": text_ef, "emotional_images": None, "event_summaries": text_ef}
+
+    layout = read_partition_layout(persist_directory)
+    source = MemoryPartitions(client, embedding_functions, layout["mode"], layout["buckets"])
+    target = MemoryPartitions(client, embedding_functions, mode, buckets)
+    if source.mode == target.mode and source.buckets == target.buckets:
+        return {"moved": {kind: 0 for kind in PARTITIONED_KINDS}, "source_collections": 0,
+                "target_collections": 0, "seconds": 0.0}
+
+    moved = {kind: 0 for kind in PARTITIONED_KINDS}
+    source_collections = source.collections()
+    for name, collection in source_collections.items():
+        kind = source.kind_of(name)
+        # Offsets shift while items are moved in and out, the ID snapshot does not
+        snapshot = collection.get(include=[])["ids"]
+        count = 0
+        for start in range(0, len(snapshot), page_size):
+            page = collection.get(
+                ids=snapshot[start:start + page_size],
+                include=["embeddings", "documents", "metadatas"]
+            )
+            if not page["ids"]:
+                continue
+
+            relocated = []
+            for target_collection, positions in target.group(kind, [m["user_id"] for m in page["metadatas"]]):
+                if target_collection.name == name:
+                    continue
+                target_collection.upsert(
+                    ids=[page["ids"][i] for i in positions],
+                    embeddings=[page["embeddings"][i] for i in positions],
+                    documents=[page["documents"][i] for i in positions],
+                    metadatas=[page["metadatas"][i] for i in positions]
+                )
+                relocated.extend(page["ids"][i] for i in positions)
+            # Only after the copies are stored, so a crash never loses an item
+            if relocated:
+                collection.delete(ids=relocated)
+            moved[kind] += len(relocated)
+            count += len(relocated)
+        print(f"Migrated {count} memories from {name}")
+
+    write_partition_layout(persist_directory, target.mode, target.buckets)
+
+    # Emptied sources go, including ones whose names the target layout also uses
+    for name, collection in source_collections.items():
+        if collection.count() == 0:
+            client.delete_collection(name)
+    target_collections = target.collections()
+
+    return {
+        "moved": moved,
+        "source_collections": len(source_collections),
+        "target_collections": len(target_collections),
+        "seconds": time.time() - start_time
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate a memory store to another partition layout")
+    parser.add_argument("persist_directory", help="Memory storage directory, e.g. ./memory_storage")
+    parser.add_argument("--mode", choices=PARTITION_MODES, required=True)
+    parser.add_argument("--buckets", type=int, default=64, help="Buckets per kind in bucket mode")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--text-model", default="all-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    print(json.dumps(
+        migrate_partitions(args.persist_directory, args.mode, args.buckets, args.page_size, args.text_model),
+        indent=2
+    ))
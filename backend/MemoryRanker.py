@@ -0,0 +1,167 @@
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+import numpy as np
+
+SECONDS_PER_DAY = 24 * 3600
+
+
+class MemoryRanker:
+    """
+    Ranks retrieved memories by blending vector similarity with Ebbinghaus
+    retention (e^(-t/S)), computed for the whole result set at once.
+
+    The number of candidates fetched per query adapts per collection: when
+    retention keeps pulling results from deep in the similarity order the
+    over-fetch grows, and when the top results come straight from the head
+    it shrinks back.
+    """
+
+    def __init__(self,
+                 similarity_weight: float = 0.6,
+                 retention_weight: float = 0.4,
+                 min_overfetch: float = 1.5,
+                 max_overfetch: float = 8.0,
+                 forgetting_enabled: bool = True,
+                 clock=None):
+        """
+        Initialize MemoryRanker.
+
+        Args:
+            similarity_weight: Weight of the query similarity in the final score
+            retention_weight: Weight of the forgetting-curve retention in the final score
+            min_overfetch: Smallest candidates-per-result ratio fetched from Chroma
+            max_overfetch: Largest candidates-per-result ratio fetched from Chroma
+            forgetting_enabled: When False every memory has retention 1.0
+            clock: Callable returning the current timestamp (defaults to time.time)
+        """
+        self.similarity_weight = similarity_weight
+        self.retention_weight = retention_weight
+        self.min_overfetch = min_overfetch
+        self.max_overfetch = max_overfetch
+        self.forgetting_enabled = forgetting_enabled
+        self.clock = clock or time.time
+
+        self._overfetch = {}
+        self._lock = threading.Lock()
+
+    def retention(self, last_access_times, memory_strengths, now: float = None) -> np.ndarray:
+        """
+        Compute Ebbinghaus retention for many memories at once.
+
+        Args:
+            last_access_times: Last access timestamps (seconds)
+            memory_strengths: Memory strengths S (days)
+            now: Current timestamp (defaults to the clock)
+
+        Returns:
+            Array of retention scores in [0, 1]
+        """
+        last_access_times = np.asarray(last_access_times, dtype=np.float64)
+        if not self.forgetting_enabled:
+            return np.ones_like(last_access_times)
+
+        now = self.clock() if now is None else now
+        elapsed_days = np.maximum(now - last_access_times, 0.0) / SECONDS_PER_DAY
+        return np.exp(-elapsed_days / np.asarray(memory_strengths, dtype=np.float64))
+
+    def fetch_size(self, key: str, n_results: int) -> int:
+        """
+        Number of candidates to request from a collection.
+
+        Args:
+            key: Collection name
+            n_results: Number of results the caller wants
+
+        Returns:
+            Candidate count to pass as n_results to the Chroma query
+        """
+        with self._lock:
+            factor = self._overfetch.get(key, self.min_overfetch)
+        return max(n_results, int(math.ceil(n_results * factor)))
+
+    def rank(self,
+             key: str,
+             metadatas: List[Dict],
+             distances: Optional[List[float]],
+             n_results: int,
+             requested: int = None,
+             now: float = None) -> List[Dict]:
+        """
+        Rank a candidate set.
+
+        Args:
+            key: Collection name, used to adapt the over-fetch
+            metadatas: Candidate metadata with last_access_time and memory_strength
+            distances: Cosine distances from the query, in Chroma's order, or
+                None for candidates without a query (ranked by retention only)
+            n_results: Number of results to keep
+            requested: Candidate count that was asked for (enables adaptation)
+            now: Current timestamp (defaults to the clock)
+
+        Returns:
+            Top n_results as dicts with the candidate "index", "memory_score"
+            (retention), "similarity" and combined "score", best first
+        """
+        if not metadatas:
+            return []
+
+        retention = self.retention(
+            [m["last_access_time"] for m in metadatas],
+            [m["memory_strength"] for m in metadatas],
+            now
+        )
+
+        if distances is None:
+            similarity = np.ones_like(retention)
+            score = retention
+        else:
+            similarity = np.clip(1.0 - np.asarray(distances, dtype=np.float64), 0.0, 1.0)
+            score = self.similarity_weight * similarity + self.retention_weight * retention
+
+        # Stable sort keeps Chroma's order for ties
+        order = np.argsort(-score, kind="stable")[:n_results]
+
+        if distances is not None and requested:
+            self._adapt(key, n_results, requested, len(metadatas), int(order.max()) + 1)
+
+        return [
+            {
+                "index": int(i),
+                "memory_score": float(retention[i]),
+                "similarity": float(similarity[i]),
+                "score": float(score[i])
+            }
+            for i in order
+        ]
+
+    def _adapt(self, key: str, n_results: int, requested: int, fetched: int, deepest: int):
+        """Move the over-fetch of a collection towards the depth the ranking used."""
+        if fetched < requested:
+            # The user has fewer memories than requested, nothing to learn
+            return
+
+        with self._lock:
+            factor = self._overfetch.get(key, self.min_overfetch)
+            if deepest >= fetched:
+                # The last candidate made the cut, more may be hiding below it
+                target = factor * 2
+            else:
+                target = deepest / n_results * 1.5
+            factor = 0.8 * factor + 0.2 * target
+            self._overfetch[key] = min(self.max_overfetch, max(self.min_overfetch, factor))
+
+    def get_stats(self) -> Dict:
+        """
+        Get ranking configuration and the current over-fetch per collection.
+
+        Returns:
+            Dict with weights and over-fetch factors
+        """
+        with self._lock:
+            return {
+                "similarity_weight": self.similarity_weight,
+                "retention_weight": self.retention_weight,
+                "overfetch": dict(self._overfetch)
+            }
@@ -0,0 +1,403 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+import numpy as np
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_KINDS = ("conversations", "emotional_images", "event_summaries", "user_portraits")
+MANIFEST_FILE = "manifest.json"
+# Written into a storage directory that is being restored from a snapshot
+RESTORE_FILE = "snapshot_restore.json"
+
+
+class StringColumn:
+    """
+    Column of strings stored as one UTF-8 blob plus int64 offsets, so a
+    million documents load with two memory-mapped arrays instead of a
+    million Python objects.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray, present: np.ndarray = None):
+        self.data = data
+        self.offsets = offsets
+        self.present = present
+
+    @staticmethod
+    def write(path: str, values: List[Optional[str]]):
+        """Write a column; None values are recorded as missing."""
+        encoded = [(value or "").encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        np.save(f"{path}.offsets.npy", offsets)
+        np.save(f"{path}.data.npy", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+        if any(value is None for value in values):
+            np.save(f"{path}.present.npy", np.array([value is not None for value in values]))
+
+    @classmethod
+    def load(cls, path: str) -> "StringColumn":
+        """Memory-map a column written by write()."""
+        present = f"{path}.present.npy"
+        return cls(
+            np.load(f"{path}.data.npy", mmap_mode="r"),
+            np.load(f"{path}.offsets.npy", mmap_mode="r"),
+            np.load(present, mmap_mode="r") if os.path.exists(present) else None
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        if self.present is not None and not self.present[i]:
+            return None
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+
+def _write_columns(directory: str, ids: List[str], documents: List[str], metadatas: List[Dict]) -> Dict:
+    """Write ids, documents and one file per metadata key; returns the column types."""
+    StringColumn.write(os.path.join(directory, "ids"), ids)
+    StringColumn.write(os.path.join(directory, "documents"), documents)
+
+    keys = sorted({key for metadata in metadatas for key in metadata})
+    types = {}
+    for key in keys:
+        values = [metadata.get(key) for metadata in metadatas]
+        present = [value for value in values if value is not None]
+        path = os.path.join(directory, f"meta.{key}")
+
+        if present and all(isinstance(value, bool) for value in present):
+            types[key] = "bool"
+            np.save(f"{path}.npy", np.array([-1 if value is None else int(value) for value in values], dtype=np.int8))
+        elif present and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+            types[key] = "int" if all(isinstance(value, int) for value in present) else "float"
+            np.save(f"{path}.npy", np.array([np.nan if value is None else value for value in values], dtype=np.float64))
+        else:
+            types[key] = "str"
+            StringColumn.write(path, [None if value is None else str(value) for value in values])
+    return types
+
+
+class SnapshotTable:
+    """
+    One kind of memory in a snapshot: a memory-mapped float32 embedding
+    matrix and columnar ids, documents and metadata.
+
+    Nothing is copied into memory on load. Rows of a user can be searched
+    exactly, which is used to check a snapshot against the Chroma index it
+    was exported from (see benchmarks/bench_snapshot.py); the app itself
+    serves reads from Chroma only.
+    """
+
+    def __init__(self, directory: str, info: Dict):
+        """
+        Initialize SnapshotTable.
+
+        Args:
+            directory: Directory of this kind in the snapshot
+            info: Its entry in the snapshot manifest
+        """
+        self.count = info["count"]
+        self.dim = info["dim"]
+        self.types = info["columns"]
+
+        if self.count:
+            self.embeddings = np.memmap(
+                os.path.join(directory, "embeddings.f32"), dtype=np.float32, mode="r", shape=(self.count, self.dim)
+            )
+        else:
+            self.embeddings = np.zeros((0, self.dim), dtype=np.float32)
+        self.ids = StringColumn.load(os.path.join(directory, "ids"))
+        self.documents = StringColumn.load(os.path.join(directory, "documents"))
+        self.columns = {
+            key: (StringColumn.load(os.path.join(directory, f"meta.{key}")) if kind == "str"
+                  else np.load(os.path.join(directory, f"meta.{key}.npy"), mmap_mode="r"))
+            for key, kind in self.types.items()
+        }
+        self._user_rows = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def metadata(self, i: int) -> Dict:
+        """Metadata dict of one row."""
+        metadata = {}
+        for key, kind in self.types.items():
+            value = self.columns[key][i]
+            if kind == "str":
+                if value is not None:
+                    metadata[key] = value
+            elif kind == "bool":
+                if value >= 0:
+                    metadata[key] = bool(value)
+            elif not np.isnan(value):
+                metadata[key] = int(value) if kind == "int" else float(value)
+        return metadata
+
+    def user_rows(self, user_id: str) -> np.ndarray:
+        """Row numbers of a user's memories (the index is built on first use)."""
+        if self._user_rows is None:
+            rows = {}
+            user_column = self.columns.get("user_id")
+            for i in range(self.count if user_column is not None else 0):
+                rows.setdefault(user_column[i], []).append(i)
+            self._user_rows = {user: np.array(indices, dtype=np.int64) for user, indices in rows.items()}
+        return self._user_rows.get(user_id, np.zeros(0, dtype=np.int64))
+
+    def search(self, user_id: str, query_embedding, n_results: int = 5) -> List[Dict]:
+        """
+        Exact cosine search over one user's rows.
+
+        Args:
+            user_id: User ID
+            query_embedding: Query embedding
+            n_results: Number of results to return
+
+        Returns:
+            Items with id, text, metadata and cosine distance, closest first
+        """
+        rows = self.user_rows(user_id)
+        if not len(rows):
+            return []
+
+        embeddings = np.asarray(self.embeddings[rows])
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1) * (np.linalg.norm(query) or 1.0)
+        distances = 1.0 - (embeddings @ query) / np.where(norms > 0, norms, 1.0)
+
+        best = np.argsort(distances)[:n_results]
+        return [
+            {
+                "id": self.ids[rows[i]],
+                "text": self.documents[rows[i]],
+                "metadata": self.metadata(rows[i]),
+                "distance": float(distances[i])
+            }
+            for i in best
+        ]
+
+
+def _sources(memory_bank, kind: str, user_ids: Optional[List[str]]) -> List:
+    """(collection, where) pairs holding the memories of one kind to export."""
+    if kind == "user_portraits":
+        collections = [memory_bank.user_portrait_collection]
+    elif user_ids is not None and memory_bank.partitions.mode == "user":
+        # Only the requested users' own collections
+        collections = [memory_bank.partitions.get(kind, user_id) for user_id in user_ids]
+        return [(collection, None) for collection in collections]
+    else:
+        collections = list(memory_bank.partitions.collections((kind,)).values())
+
+    where = {"user_id": {"$in": list(user_ids)}} if user_ids is not None else None
+    return [(collection, where) for collection in collections]
+
+
+def export_snapshot(memory_bank,
+                    snapshot_directory: str,
+                    user_ids: List[str] = None,
+                    page_size: int = 5000) -> Dict:
+    """
+    Export a memory bank (or some of its users) to a compact snapshot.
+
+    Each kind of memory is written as a contiguous float32 embedding matrix
+    and columnar ids, documents and metadata; per-user state goes to
+    user_state.json. Image files are referenced by path and are not copied.
+
+    Args:
+        memory_bank: MemoryBank to export
+        snapshot_directory: New directory for the snapshot
+        user_ids: Users to export (None for everyone)
+        page_size: Items read per page
+
+    Returns:
+        Dict with records per kind, snapshot bytes, elapsed seconds and
+        seconds per million records
+    """
+    start_time = time.time()
+    os.makedirs(snapshot_directory)
+    manifest = {"version": SNAPSHOT_VERSION, "created": time.time(), "kinds": {}}
+
+    for kind in SNAPSHOT_KINDS:
+        directory = os.path.join(snapshot_directory, kind)
+        os.makedirs(directory)
+        ids, documents, metadatas = [], [], []
+        dim = 0
+
+        with open(os.path.join(directory, "embeddings.f32"), "wb") as f:
+            for collection, where in _sources(memory_bank, kind, user_ids):
+                offset = 0
+                while True:
+                    page = collection.get(
+                        where=where,
+                        include=["embeddings", "documents", "metadatas"],
+                        limit=page_size,
+                        offset=offset
+                    )
+                    if not page["ids"]:
+                        break
+                    embeddings = np.asarray(page["embeddings"], dtype=np.float32).reshape(len(page["ids"]), -1)
+                    dim = embeddings.shape[1]
+                    embeddings.tofile(f)
+
+                    ids.extend(page["ids"])
+                    documents.extend(page["documents"])
+                    metadatas.extend(page["metadatas"])
+                    offset += len(page["ids"])
+
+        manifest["kinds"][kind] = {
+            "count": len(ids),
+            "dim": dim,
+            "columns": _write_columns(directory, ids, documents, metadatas)
+        }
+
+    # Session counters and other per-user state
+    memory_bank.user_state.flush()
+    with sqlite3.connect(memory_bank.user_state.db_path) as connection:
+        rows = connection.execute("SELECT user_id, key, value FROM user_state").fetchall()
+    wanted = set(user_ids) if user_ids is not None else None
+    with open(os.path.join(snapshot_directory, "user_state.json"), "w", encoding="utf-8") as f:
+        json.dump([row for row in rows if wanted is None or row[0] in wanted], f)
+
+    with open(os.path.join(snapshot_directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    elapsed = time.time() - start_time
+    records = sum(info["count"] for info in manifest["kinds"].values())
+    return {
+        "records": {kind: info["count"] for kind, info in manifest["kinds"].items()},
+        "bytes": sum(
+            os.path.getsize(os.path.join(directory, name))
+            for directory, _, names in os.walk(snapshot_directory) for name in names
+        ),
+        "seconds": elapsed,
+        "seconds_per_million": elapsed * 1e6 / records if records else 0.0
+    }
+
+
+def load_snapshot(snapshot_directory: str) -> Dict[str, SnapshotTable]:
+    """
+    Memory-map a snapshot.
+
+    Args:
+        snapshot_directory: Directory written by export_snapshot
+
+    Returns:
+        SnapshotTable per kind of memory
+
+    Raises:
+        ValueError: If the directory is not a snapshot of a supported version
+    """
+    try:
+        with open(os.path.join(snapshot_directory, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise ValueError(f"Directory '{snapshot_directory}' doesn't contain a memory snapshot")
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {manifest.get('version')}")
+
+    return {
+        kind: SnapshotTable(os.path.join(snapshot_directory, kind), info)
+        for kind, info in manifest["kinds"].items()
+    }
+
+
+def read_restore_state(persist_directory: str) -> Optional[Dict]:
+    """
+    Read the snapshot restore state of a storage directory.
+
+    Args:
+        persist_directory: Memory storage directory
+
+    Returns:
+        Dict with "snapshot" and "complete", or None if it was never restored
+    """
+    try:
+        with open(os.path.join(persist_directory, RESTORE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_restore_state(persist_directory: str, snapshot_directory: str, complete: bool):
+    """Record the snapshot restore state of a storage directory (atomically)."""
+    os.makedirs(persist_directory, exist_ok=True)
+    path = os.path.join(persist_directory, RESTORE_FILE)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"snapshot": snapshot_directory, "complete": complete}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def restore_snapshot(memory_bank, snapshot_directory: str, page_size: int = 5000) -> Dict:
+    """
+    Load a snapshot into a memory bank, reusing the stored embeddings.
+
+    Rows are written in pages straight from the memory-mapped matrix into
+    the bank's own partition layout, so nothing is re-embedded and the
+    snapshot never has to fit in memory. Existing memories with the same
+    IDs are replaced.
+
+    Args:
+        memory_bank: MemoryBank to restore into
+        snapshot_directory: Directory written by export_snapshot
+        page_size: Items written per Chroma call
+
+    Returns:
+        Dict with records per kind, load (memory-map) seconds, elapsed
+        seconds and seconds per million records
+    """
+    start_time = time.time()
+    tables = load_snapshot(snapshot_directory)
+    load_seconds = time.time() - start_time
+
+    for kind, table in tables.items():
+        for start in range(0, len(table), page_size):
+            rows = range(start, min(start + page_size, len(table)))
+            ids = [table.ids[i] for i in rows]
+            documents = [table.documents[i] for i in rows]
+            metadatas = [table.metadata(i) for i in rows]
+            embeddings = np.asarray(table.embeddings[start:start + len(rows)])
+
+            if kind == "user_portraits":
+                groups = [(memory_bank.user_portrait_collection, list(range(len(ids))))]
+            else:
+                groups = memory_bank.partitions.group(kind, [metadata["user_id"] for metadata in metadatas])
+
+            for collection, positions in groups:
+                page_ids = [ids[i] for i in positions]
+                page_metadatas = [metadatas[i] for i in positions]
+                collection.upsert(
+                    ids=page_ids,
+                    embeddings=embeddings[positions],
+                    documents=[documents[i] for i in positions],
+                    metadatas=page_metadatas
+                )
+                memory_bank.expiry_index.track(collection.name, page_ids, page_metadatas)
+                if kind != "user_portraits":
+                    memory_bank.recency_index.add(kind, page_ids, page_metadatas)
+
+        # Cached state of restored users is stale
+        if "user_id" in table.columns:
+            for user_id in {table.columns["user_id"][i] for i in range(len(table))}:
+                if kind == "event_summaries":
+                    memory_bank.hot_cache.invalidate(user_id, "summaries")
+                elif kind == "user_portraits":
+                    memory_bank.hot_cache.invalidate(user_id, "portrait")
+                else:
+                    memory_bank.hot_tier.invalidate(user_id, kind)
+
+    with open(os.path.join(snapshot_directory, "user_state.json"), "r", encoding="utf-8") as f:
+        for user_id, key, value in json.load(f):
+            memory_bank.user_state.set(user_id, key, json.loads(value))
+    memory_bank.user_state.flush()
+
+    elapsed = time.time() - start_time
+    records = sum(len(table) for table in tables.values())
+    return {
+        "records": {kind: len(table) for kind, table in tables.items()},
+        "load_seconds": load_seconds,
+        "seconds": elapsed,
+        "seconds_per_million": elapsed * 1e6 / records if records else 0.0
+    }
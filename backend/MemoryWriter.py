@@ -0,0 +1,415 @@
+import atexit
+import io
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from PIL import Image
+
+
+class MemoryWriter:
+    """
+    Write-behind queue for MemoryBank writes.
+
+    Conversations and emotional images are acknowledged as soon as they are
+    appended to an fsync'ed journal, then written to ChromaDB in batches by a
+    background thread (one Chroma upsert and one CLIP forward pass per batch).
+    Journal entries are only dropped once their batch is stored, and pending
+    entries are replayed on startup, so an acknowledged write survives a crash.
+
+    A failing batch is retried with exponential backoff. If it still fails,
+    it is split in halves until the records that cannot be stored are
+    isolated; those are moved to a dead-letter file and the journal moves
+    past them, so one bad record never blocks the writes behind it.
+    """
+
+    def __init__(self,
+                 memory_bank,
+                 journal_path: str = None,
+                 spool_directory: str = None,
+                 batch_size: int = 16,
+                 flush_interval: float = 0.5,
+                 retry_delay: float = 2.0,
+                 max_retry_delay: float = 60.0,
+                 max_retries: int = 5,
+                 dead_letter_path: str = None):
+        """
+        Initialize MemoryWriter.
+
+        Args:
+            memory_bank: MemoryBank the writes are applied to
+            journal_path: Path of the write-ahead journal
+            spool_directory: Directory holding image bytes until they are stored
+            batch_size: Maximum number of writes applied per batch
+            flush_interval: Seconds to wait for more writes before applying a partial batch
+            retry_delay: Seconds to wait before the first retry of a failed batch
+            max_retry_delay: Upper bound of the doubling retry delay
+            max_retries: Retries of a failed batch before its bad records are isolated
+            dead_letter_path: File receiving records that could not be stored
+        """
+        self.memory_bank = memory_bank
+        self.journal_path = journal_path or os.path.join(memory_bank.persist_directory, "write_journal.jsonl")
+        self.spool_directory = spool_directory or os.path.join(memory_bank.persist_directory, "write_spool")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_retries = max_retries
+        self.dead_letter_path = dead_letter_path or os.path.join(
+            memory_bank.persist_directory, "write_dead_letters.jsonl"
+        )
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.journal_path)), exist_ok=True)
+        os.makedirs(self.spool_directory, exist_ok=True)
+
+        self._queue = deque()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._journal_lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._drained = threading.Condition(self._lock)
+        self._closed = False
+        self._flush_requested = False
+        # Set when a batch is given up on; its journal entries must survive until restart
+        self._keep_journal = False
+
+        # Metrics
+        self.submitted = 0
+        self.written = 0
+        self.failed_batches = 0
+        self.dead_letters = 0
+        self.batches = 0
+        self.replayed = 0
+        self.last_batch_seconds = 0.0
+
+        self._replay_journal()
+
+        self._worker = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    # === Submission ===
+
+    def submit_conversation(self,
+                            user_id: str,
+                            conversation_text: str,
+                            user_input: str = None,
+                            bot_response: str = None,
+                            metadata: Dict = None) -> str:
+        """
+        Queue a conversation write. Same arguments as MemoryBank.add_conversation.
+
+        Returns:
+            ID the conversation will be stored under
+        """
+        timestamp = self.memory_bank.clock()
+        record = {
+            "kind": "conversation",
+            "id": self.memory_bank.generate_id("conv", user_id, timestamp),
+            "timestamp": timestamp,
+            "user_id": user_id,
+            "conversation_text": conversation_text,
+            "user_input": user_input,
+            "bot_response": bot_response,
+            "metadata": metadata or {}
+        }
+        self._submit(record)
+        return record["id"]
+
+    def submit_emotional_image(self,
+                               user_id: str,
+                               image: Image.Image,
+                               emotion_description: str,
+                               metadata: Dict = None,
+                               jpeg_bytes: bytes = None) -> str:
+        """
+        Queue an emotional image write. Same arguments as MemoryBank.add_emotional_image.
+
+        Args:
+            jpeg_bytes: Already encoded JPEG of the image (optional), saves re-encoding
+
+        Returns:
+            ID the image will be stored under
+        """
+        timestamp = self.memory_bank.clock()
+        image_id = self.memory_bank.generate_id("img", user_id, timestamp)
+
+        if jpeg_bytes is None:
+            buffer = io.BytesIO()
+            image.convert("RGB").save(buffer, format="JPEG", quality=90)
+            jpeg_bytes = buffer.getvalue()
+
+        # The image bytes must be durable before the journal entry points at them
+        image_file = os.path.join(self.spool_directory, f"{image_id}.jpg")
+        with open(image_file, "wb") as f:
+            f.write(jpeg_bytes)
+            f.flush()
+            os.fsync(f.fileno())
+
+        record = {
+            "kind": "emotional_image",
+            "id": image_id,
+            "timestamp": timestamp,
+            "user_id": user_id,
+            "image_file": image_file,
+            "emotion_description": emotion_description,
+            "metadata": metadata or {}
+        }
+        self._submit(record)
+        return image_id
+
+    def _submit(self, record: Dict):
+        """Journal a record, then hand it to the background thread."""
+        if self._closed:
+            raise RuntimeError("MemoryWriter is closed")
+
+        # Journal and count under the journal lock, so the journal is never
+        # truncated between acknowledging a write and queueing it
+        with self._journal_lock:
+            self._write_journal_line({"op": "put", "record": record})
+            with self._lock:
+                self._queue.append(record)
+                self._pending += 1
+                self.submitted += 1
+                self._not_empty.notify()
+
+    # === Journal ===
+
+    def _write_journal_line(self, entry: Dict):
+        """Append an entry to the journal. Caller must hold the journal lock."""
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _append_journal(self, entry: Dict):
+        with self._journal_lock:
+            self._write_journal_line(entry)
+
+    def _replay_journal(self):
+        """Re-queue writes that were acknowledged but never stored."""
+        if not os.path.exists(self.journal_path):
+            return
+
+        records = {}
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line from a crash mid-append; it was never acknowledged
+                    continue
+                if entry["op"] == "put":
+                    records[entry["record"]["id"]] = entry["record"]
+                elif entry["op"] == "done":
+                    for record_id in entry["ids"]:
+                        records.pop(record_id, None)
+
+        # Compact the journal down to the pending records
+        temp_path = self.journal_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for record in records.values():
+                f.write(json.dumps({"op": "put", "record": record}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.journal_path)
+
+        for record in records.values():
+            self._queue.append(record)
+        self._pending = len(records)
+        self.replayed = len(records)
+
+        if records:
+            print(f"Replaying {len(records)} pending memory writes from {self.journal_path}")
+
+    def _truncate_journal_if_idle(self):
+        """Start a fresh journal once every acknowledged write is stored."""
+        with self._journal_lock:
+            with self._lock:
+                if self._pending or self._keep_journal:
+                    return
+            open(self.journal_path, "w").close()
+
+    # === Background thread ===
+
+    def _next_batch(self) -> Optional[List[Dict]]:
+        with self._lock:
+            while not self._queue and not self._closed:
+                self._not_empty.wait()
+            if not self._queue:
+                return None
+
+            # Give concurrent turns a moment to fill the batch
+            deadline = time.time() + self.flush_interval
+            while len(self._queue) < self.batch_size and not (self._closed or self._flush_requested):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._not_empty.wait(remaining)
+
+            batch = []
+            while self._queue and len(batch) < self.batch_size:
+                batch.append(self._queue.popleft())
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            if not self._store(batch):
+                # Left in the journal, replayed on next start
+                print(f"Giving up on {len(batch)} memory writes until restart")
+                self._keep_journal = True
+
+            with self._lock:
+                self._pending -= len(batch)
+                if not self._pending:
+                    self._flush_requested = False
+                    self._drained.notify_all()
+
+            self._truncate_journal_if_idle()
+
+    def _store(self, batch: List[Dict]) -> bool:
+        """
+        Apply a batch, retrying with backoff and then isolating bad records.
+
+        Returns:
+            False if the writer closed before the batch was dealt with
+        """
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            error = self._apply_batch(batch)
+            if error is None:
+                return True
+            if self._closed:
+                return False
+            if attempt < self.max_retries:
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+        return self._isolate(batch, error)
+
+    def _isolate(self, batch: List[Dict], error: Exception) -> bool:
+        """Split a persistently failing batch until its bad records are dead-lettered."""
+        if len(batch) == 1:
+            self._dead_letter(batch[0], error)
+            return True
+
+        middle = len(batch) // 2
+        for half in (batch[:middle], batch[middle:]):
+            half_error = self._apply_batch(half)
+            if half_error is None:
+                continue
+            if self._closed or not self._isolate(half, half_error):
+                return False
+        return True
+
+    def _dead_letter(self, record: Dict, error: Exception):
+        """Move a record that cannot be stored out of the journal."""
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"record": record, "error": str(error), "failed_at": time.time()}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        # Spooled image bytes stay in place, the dead letter points at them
+        self._append_journal({"op": "done", "ids": [record["id"]]})
+        self.dead_letters += 1
+        print(f"Moved memory write {record['id']} to {self.dead_letter_path}: {error}")
+
+    def _apply_batch(self, batch: List[Dict]) -> Optional[Exception]:
+        """
+        Write a batch to the memory bank.
+
+        Returns:
+            None on success, otherwise the error
+        """
+        conversations = [r for r in batch if r["kind"] == "conversation"]
+        images = [r for r in batch if r["kind"] == "emotional_image"]
+
+        start_time = time.time()
+        try:
+            if conversations:
+                self.memory_bank.add_conversations(conversations)
+
+            # A replayed image whose spool file is gone was already moved into
+            # the image store, i.e. stored before the crash
+            images = [r for r in images if os.path.exists(r["image_file"])]
+            if images:
+                self.memory_bank.add_emotional_images(images)
+        except Exception as e:
+            self.failed_batches += 1
+            print(f"Error writing memory batch: {e}")
+            return e
+
+        self._append_journal({"op": "done", "ids": [r["id"] for r in batch]})
+
+        self.batches += 1
+        self.written += len(batch)
+        self.last_batch_seconds = time.time() - start_time
+        return None
+
+    # === Control ===
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of acknowledged writes not yet stored."""
+        with self._lock:
+            return self._pending
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Block until every acknowledged write is stored.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            True if the queue drained, False on timeout
+        """
+        with self._lock:
+            self._flush_requested = True
+            self._not_empty.notify()
+            return self._drained.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout: float = 30.0):
+        """Flush pending writes and stop the background thread."""
+        if self._closed:
+            return
+        self.flush(timeout)
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+        self._worker.join(timeout)
+
+    def get_stats(self) -> Dict:
+        """
+        Get queue metrics.
+
+        Returns:
+            Dict with queue depth, throughput counters, dead-lettered records
+            and last batch latency
+        """
+        with self._lock:
+            return {
+                "queue_depth": self._pending,
+                "submitted": self.submitted,
+                "written": self.written,
+                "replayed": self.replayed,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                "dead_letters": self.dead_letters,
+                "avg_batch_size": self.written / self.batches if self.batches else 0.0,
+                "last_batch_seconds": self.last_batch_seconds
+            }
+
+
+_memory_writer_lock = threading.Lock()
+
+def get_memory_writer(memory_bank) -> MemoryWriter:
+    """Get the write-behind queue of a memory bank, creating it on first use"""
+    with _memory_writer_lock:
+        if memory_bank.memory_writer is None:
+            memory_bank.memory_writer = MemoryWriter(memory_bank)
+        return memory_bank.memory_writer
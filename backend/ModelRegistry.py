@@ -0,0 +1,165 @@
+import gc
+import resource
+import threading
+import time
+from typing import Any, Callable, Dict, List
+import numpy as np
+from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+
+
+def _model_bytes(model) -> int:
+    """Parameter and buffer memory of a torch module (0 for anything else)."""
+    if not hasattr(model, "parameters"):
+        return 0
+    tensors = list(model.parameters()) + list(getattr(model, "buffers", lambda: [])())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of embedding models shared by MemoryBank instances.
+
+    A bank acquires the models it needs when it is created, but a model is
+    only loaded the first time it is used. Models are reference counted and
+    dropped once the last bank holding them is gone, so several banks in one
+    process share a single copy of the weights.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, loader: Callable[[], Any]):
+        """
+        Register interest in a model without loading it.
+
+        Args:
+            key: Unique model key, e.g. "clip:openai/clip-vit-base-patch32"
+            loader: Called once, on first use, to load the model
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {
+                    "loader": loader,
+                    "model": None,
+                    "refs": 0,
+                    "load_lock": threading.Lock(),
+                    "load_seconds": 0.0,
+                    "bytes": 0
+                }
+                self._entries[key] = entry
+            entry["refs"] += 1
+
+    def get(self, key: str) -> Any:
+        """
+        Get a model, loading it on first use.
+
+        Args:
+            key: Model key passed to acquire
+
+        Returns:
+            The loaded model
+        """
+        with self._lock:
+            entry = self._entries[key]
+        if entry["model"] is not None:
+            return entry["model"]
+
+        # Load outside the registry lock so other models stay available
+        with entry["load_lock"]:
+            if entry["model"] is None:
+                start_time = time.time()
+                model = entry["loader"]()
+                entry["load_seconds"] = time.time() - start_time
+                models = model if isinstance(model, tuple) else (model,)
+                entry["bytes"] = sum(_model_bytes(m) for m in models)
+                entry["model"] = model
+                print(f"Loaded {key} in {entry['load_seconds']:.2f}s ({entry['bytes'] / 2**20:.1f} MiB)")
+            return entry["model"]
+
+    def release(self, key: str):
+        """
+        Drop a reference; the model is unloaded when no bank holds it.
+
+        Args:
+            key: Model key passed to acquire
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry["refs"] -= 1
+            if entry["refs"] > 0:
+                return
+            del self._entries[key]
+        entry["model"] = None
+        gc.collect()
+
+    def get_stats(self) -> Dict:
+        """
+        Get loaded models, their memory footprint and load times.
+
+        Returns:
+            Dict with per-model refs, loaded flag, bytes and load seconds, the
+            total model bytes and the process peak RSS
+        """
+        with self._lock:
+            models = {
+                key: {
+                    "refs": entry["refs"],
+                    "loaded": entry["model"] is not None,
+                    "bytes": entry["bytes"],
+                    "load_seconds": entry["load_seconds"]
+                }
+                for key, entry in self._entries.items()
+            }
+        return {
+            "models": models,
+            "total_model_bytes": sum(m["bytes"] for m in models.values()),
+            # ru_maxrss is in KiB on Linux
+            "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        }
+
+
+_model_registry = ModelRegistry()
+
+def get_model_registry() -> ModelRegistry:
+    """Get the process-wide model registry"""
+    return _model_registry
+
+
+class LazyTextEmbeddingFunction(SentenceTransformerEmbeddingFunction):
+    """
+    SentenceTransformerEmbeddingFunction whose model comes from the model
+    registry on the first call instead of being loaded in __init__.
+
+    It keeps the name and config of the Chroma class, so collections created
+    with either one open with the other.
+    """
+
+    def __init__(self,
+                 model_name: str = "all-MiniLM-L6-v2",
+                 device: str = "cpu",
+                 normalize_embeddings: bool = False,
+                 registry: ModelRegistry = None):
+        self.model_name = model_name
+        self.device = device
+        self.normalize_embeddings = normalize_embeddings
+        self.kwargs = {}
+
+        self.registry = registry or get_model_registry()
+        self.registry_key = f"sentence_transformer:{model_name}:{device}"
+        self.registry.acquire(self.registry_key, self._load)
+
+    def _load(self):
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name_or_path=self.model_name, device=self.device)
+
+    def __call__(self, input: List[str]) -> List[np.ndarray]:
+        embeddings = self.registry.get(self.registry_key).encode(
+            list(input),
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize_embeddings
+        )
+        return [np.array(embedding, dtype=np.float32) for embedding in embeddings]
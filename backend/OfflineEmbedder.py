@@ -0,0 +1,113 @@
+import hashlib
+import re
+from typing import Any, Dict, List
+import numpy as np
+from PIL import Image
+from chromadb.api.types import Documents, EmbeddingFunction
+from chromadb.utils.embedding_functions import register_embedding_function
+
+
+def _hash_tokens(text: str, dim: int, seed: int) -> np.ndarray:
+    """Signed feature hashing of the words and word bigrams of a text, L2-normalized."""
+    words = re.findall(r"\w+", text.lower())
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8, salt=seed.to_bytes(8, "little")).digest()
+        value = int.from_bytes(digest, "little")
+        vector[value % dim] += 1.0 if value >> 63 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+@register_embedding_function
+class HashingEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Deterministic, model-free text embedding for benchmarks and offline runs.
+
+    Texts sharing words get similar vectors, which is enough for retrieval
+    to behave realistically without downloading a model. Drop-in for the
+    sentence-transformers embedding function (same 384 dimensions).
+    """
+
+    def __init__(self, dim: int = 384, seed: int = 0):
+        """
+        Initialize HashingEmbeddingFunction.
+
+        Args:
+            dim: Embedding dimension
+            seed: Hash seed; different seeds give unrelated spaces
+        """
+        self.dim = dim
+        self.seed = seed
+
+    def __call__(self, input: Documents) -> List[np.ndarray]:
+        return [_hash_tokens(text, self.dim, self.seed) for text in input]
+
+    @staticmethod
+    def name() -> str:
+        return "memorybank_hashing"
+
+    def get_config(self) -> Dict[str, Any]:
+        return {"dim": self.dim, "seed": self.seed}
+
+    @staticmethod
+    def build_from_config(config: Dict[str, Any]) -> "HashingEmbeddingFunction":
+        return HashingEmbeddingFunction(dim=config["dim"], seed=config["seed"])
+
+
+class HashingImageEmbedder:
+    """
+    Deterministic, model-free stand-in for CLIP.
+
+    Images are embedded by a fixed random projection of a small grayscale
+    thumbnail, texts by feature hashing into the same dimension. Unlike
+    CLIP the two are not aligned, so text-to-image scores are arbitrary,
+    but the cost profile of storing and searching image memories is kept.
+    """
+
+    def __init__(self, dim: int = 512, thumbnail_size: int = 16, seed: int = 0):
+        """
+        Initialize HashingImageEmbedder.
+
+        Args:
+            dim: Embedding dimension (the image collection dimension)
+            thumbnail_size: Side of the grayscale thumbnail that is projected
+            seed: Seed of the projection and the text hashing
+        """
+        self.dim = dim
+        self.thumbnail_size = thumbnail_size
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._projection = rng.standard_normal((thumbnail_size * thumbnail_size, dim)).astype(np.float32)
+
+    def embed_images(self, images: List[Image.Image]) -> np.ndarray:
+        """
+        Embed images.
+
+        Args:
+            images: PIL images
+
+        Returns:
+            float32 array of shape (len(images), dim)
+        """
+        if not images:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        size = (self.thumbnail_size, self.thumbnail_size)
+        pixels = np.stack([
+            np.asarray(image.convert("L").resize(size), dtype=np.float32).ravel() / 255.0 - 0.5
+            for image in images
+        ])
+        return pixels @ self._projection
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed text queries into the image embedding dimension.
+
+        Args:
+            texts: Query texts
+
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        return np.stack([_hash_tokens(text, self.dim, self.seed) for text in texts]) if texts \
+            else np.zeros((0, self.dim), dtype=np.float32)
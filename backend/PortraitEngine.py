@@ -0,0 +1,337 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+import requests
+
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+HISTORY_COLLECTION = "portrait_history"
+# Memory kinds folded into portraits, with the label they get in the prompt
+DELTA_KINDS = {
+    "conversations": "Conversation",
+    "event_summaries": "Event",
+    "emotional_images": "Observed emotion"
+}
+
+
+class PortraitEngine:
+    """
+    Keeps user portraits up to date from new memories only.
+
+    Every portrait version records the recency index insertion sequence of
+    the last memory it covers. A run looks up users with memories indexed
+    after that (from the recency index, without scanning), reads just those
+    memories, and asks the local LLM to revise the current portrait with
+    them. The cursor is the insertion order rather than the memory
+    timestamp, so memories that arrive with an older timestamp (imports,
+    late write-behind flushes, consolidation summaries) are not missed. Each result is stored as a new version, and every version is kept
+    in a history collection. The cost of a run follows new activity, not
+    the size of a user's history; LLM calls are rate limited.
+    """
+
+    def __init__(self,
+                 memory_bank,
+                 ollama_base_url: str = OLLAMA_BASE_URL,
+                 model: str = "llama3.2:3b",
+                 min_new_memories: int = 5,
+                 max_pending_seconds: float = 24 * 3600.0,
+                 max_delta: int = 40,
+                 max_updates_per_minute: float = 2.0,
+                 interval: float = 1800.0):
+        """
+        Initialize PortraitEngine.
+
+        Args:
+            memory_bank: MemoryBank whose portraits are maintained
+            ollama_base_url: Base URL of the local Ollama server
+            model: Ollama model used for the portraits
+            min_new_memories: New memories needed before a portrait is revised
+            max_pending_seconds: A portrait with fewer new memories is still
+                revised once the oldest of them is this old
+            max_delta: Maximum new memories folded into one version; a larger
+                backlog is worked off over several runs
+            max_updates_per_minute: Upper bound on the LLM call rate
+            interval: Seconds between background runs
+        """
+        self.memory_bank = memory_bank
+        self.ollama_base_url = ollama_base_url
+        self.model = model
+        self.min_new_memories = min_new_memories
+        self.max_pending_seconds = max_pending_seconds
+        self.max_delta = max_delta
+        self.max_updates_per_minute = max_updates_per_minute
+        self.interval = interval
+
+        # Every portrait version, current one included
+        self.history_collection = memory_bank.client.get_or_create_collection(
+            name=HISTORY_COLLECTION,
+            embedding_function=memory_bank.text_ef,
+            metadata={"hnsw:space": "cosine"}
+        )
+
+        self._run_lock = threading.Lock()
+        # One revision per engine at a time, so versions are never reused
+        self._update_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+        self._last_call = 0.0
+
+        # Metrics
+        self.runs = 0
+        self.updates = 0
+        self.folded_memories = 0
+        self.failed_updates = 0
+        self.last_run_seconds = 0.0
+
+    def _delta(self, user_id: str, source_sequence: int) -> Tuple[List[Dict], int]:
+        """
+        Memories of a user indexed after source_sequence, oldest first.
+
+        For a user without a portrait version (source_sequence 0) the most
+        recent memories are used instead, and everything indexed so far
+        counts as covered.
+
+        Returns:
+            The memories and the sequence a version built from them covers
+        """
+        recency_index = self.memory_bank.recency_index
+        for kind in DELTA_KINDS:
+            self.memory_bank._ensure_recency_index(kind)
+
+        if source_sequence:
+            # At most max_delta memories in indexing order; a larger backlog waits for the next run
+            entries = sorted(
+                (sequence, kind, memory_id)
+                for kind in DELTA_KINDS
+                for memory_id, sequence in recency_index.since(kind, user_id, source_sequence, self.max_delta)
+            )[:self.max_delta]
+            cursor = entries[-1][0] if entries else source_sequence
+            wanted = {kind: [memory_id for _, entry_kind, memory_id in entries if entry_kind == kind] for kind in DELTA_KINDS}
+        else:
+            # Read before the memories, so anything indexed meanwhile is picked up next time
+            cursor = recency_index.last_sequence(user_id)
+            wanted = {kind: recency_index.recent(kind, user_id, self.max_delta) for kind in DELTA_KINDS}
+
+        delta = []
+        for kind, label in DELTA_KINDS.items():
+            if not wanted[kind]:
+                continue
+            results = self.memory_bank.partitions.get(kind, user_id).get(ids=wanted[kind], include=["documents", "metadatas"])
+            delta.extend(
+                {"label": label, "text": document, "timestamp": metadata["timestamp"]}
+                for document, metadata in zip(results["documents"], results["metadatas"])
+            )
+
+        delta.sort(key=lambda item: item["timestamp"])
+        return (delta[-self.max_delta:] if not source_sequence else delta), cursor
+
+    def _create_portrait_prompt(self, user_id: str, portrait_text: str, delta: List[Dict]) -> str:
+        """Create the prompt revising a portrait with new memories"""
+        memories = "\n".join(
+            f"[{datetime.fromtimestamp(item['timestamp']).strftime('%Y-%m-%d %H:%M')}] {item['label']}: {item['text']}"
+            for item in delta
+        )
+        return f"""
+CURRENT PORTRAIT OF {user_id}:
+{portrait_text or "(none yet)"}
+
+NEW MEMORIES:
+{memories}
+
+TASK: Rewrite the portrait of the user so it also reflects the new memories. Keep everything in the current portrait that is still true, and cover personality, interests, relationships, routines, health and emotional patterns. Write at most 200 words in the third person and do not invent anything.
+
+UPDATED PORTRAIT:"""
+
+    def _generate(self, prompt: str) -> str:
+        """Ask the local LLM for a portrait, respecting the rate limit."""
+        if self.max_updates_per_minute:
+            wait = self._last_call + 60.0 / self.max_updates_per_minute - time.time()
+            if wait > 0:
+                self._stop.wait(wait)
+        self._last_call = time.time()
+
+        response = requests.post(
+            f"{self.ollama_base_url}/api/generate",
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                "stream": False,
+                "options": {
+                    "temperature": 0.2,
+                    "num_predict": 400
+                }
+            },
+            timeout=120
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Ollama returned status {response.status_code}")
+        return response.json().get("response", "").strip()
+
+    def update_user(self, user_id: str, now: float = None, force: bool = False) -> Dict:
+        """
+        Revise the portrait of one user from the memories added since its last version.
+
+        Args:
+            user_id: User ID
+            now: Current timestamp (defaults to the bank's clock)
+            force: Revise even if fewer than min_new_memories are pending
+
+        Returns:
+            Dict with whether the portrait was updated, its version and the
+            number of memories folded in
+        """
+        now = self.memory_bank.clock() if now is None else now
+        with self._update_lock:
+            portrait = self.memory_bank.get_user_portrait(user_id)
+            metadata = portrait["metadata"] if portrait else {}
+            version = int(metadata.get("version", 0))
+            source_sequence = int(metadata.get("source_sequence", 0))
+
+            delta, cursor = self._delta(user_id, source_sequence)
+            pending = bool(delta) and (
+                force
+                or len(delta) >= self.min_new_memories
+                or now - delta[0]["timestamp"] >= self.max_pending_seconds
+            )
+            if not pending:
+                return {"updated": False, "version": version, "memories": len(delta)}
+
+            portrait_text = self._generate(self._create_portrait_prompt(
+                user_id, portrait["text"] if portrait else "", delta
+            ))
+            if not portrait_text:
+                raise RuntimeError("empty portrait")
+
+            version += 1
+            version_metadata = {
+                "version": version,
+                "source_sequence": cursor,
+                "delta_count": len(delta)
+            }
+            # History first, so the current version is always in the history
+            self.history_collection.upsert(
+                ids=[f"portrait_{user_id}_v{version}"],
+                documents=[portrait_text],
+                metadatas=[dict(version_metadata, user_id=user_id, timestamp=now)]
+            )
+            self.memory_bank.update_user_portrait(user_id, portrait_text, dict(version_metadata))
+            return {"updated": True, "version": version, "memories": len(delta)}
+
+    def get_history(self, user_id: str) -> List[Dict]:
+        """
+        Get every stored portrait version of a user.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            List of versions with text and metadata, oldest first
+        """
+        results = self.history_collection.get(where={"user_id": user_id})
+        versions = [
+            {"id": item_id, "text": document, "metadata": metadata}
+            for item_id, document, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+        ]
+        versions.sort(key=lambda version: version["metadata"]["version"])
+        return versions
+
+    def run_once(self, now: float = None) -> Dict:
+        """
+        Revise the portraits of every user with new memories.
+
+        Args:
+            now: Current timestamp (defaults to the bank's clock)
+
+        Returns:
+            Dict with users checked, portraits updated, memories folded in,
+            failed updates and the elapsed seconds
+        """
+        with self._run_lock:
+            start_time = time.time()
+            totals = {"users": 0, "updated": 0, "memories": 0, "failed_updates": 0}
+
+            for user_id, last_sequence in self.memory_bank.recency_index.user_activity().items():
+                if self._stop.is_set():
+                    break
+                portrait = self.memory_bank.get_user_portrait(user_id)
+                if portrait and last_sequence <= int(portrait["metadata"].get("source_sequence", 0)):
+                    continue
+
+                totals["users"] += 1
+                try:
+                    result = self.update_user(user_id, now)
+                except Exception as e:
+                    print(f"Error updating portrait of {user_id}: {e}")
+                    totals["failed_updates"] += 1
+                    continue
+                if result["updated"]:
+                    totals["updated"] += 1
+                    totals["memories"] += result["memories"]
+
+            elapsed = time.time() - start_time
+            self.runs += 1
+            self.updates += totals["updated"]
+            self.folded_memories += totals["memories"]
+            self.failed_updates += totals["failed_updates"]
+            self.last_run_seconds = elapsed
+            if totals["updated"]:
+                print(f"Updated {totals['updated']} user portraits from {totals['memories']} new memories")
+
+            totals["seconds"] = elapsed
+            return totals
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error updating user portraits: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start the background portrait thread (no-op if already running)."""
+        if self._worker is None or not self._worker.is_alive():
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name="portrait-engine", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the background portrait thread."""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def get_stats(self) -> Dict:
+        """
+        Get portrait metrics.
+
+        Returns:
+            Dict with run counters, portraits updated, memories folded in
+            and the number of stored versions
+        """
+        return {
+            "runs": self.runs,
+            "updates": self.updates,
+            "folded_memories": self.folded_memories,
+            "failed_updates": self.failed_updates,
+            "last_run_seconds": self.last_run_seconds,
+            "stored_versions": self.history_collection.count()
+        }
+
+
+_portrait_engine_lock = threading.Lock()
+
+def get_portrait_engine(memory_bank) -> PortraitEngine:
+    """Get the portrait engine of a memory bank, creating it (not started) on first use"""
+    with _portrait_engine_lock:
+        if memory_bank.portrait_engine is None:
+            memory_bank.portrait_engine = PortraitEngine(memory_bank)
+        return memory_bank.portrait_engine
+
+
+def start_portrait_engine(memory_bank) -> PortraitEngine:
+    """Start the background portrait engine of a memory bank"""
+    engine = get_portrait_engine(memory_bank)
+    engine.start()
+    return engine
@@ -0,0 +1,255 @@
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+
+class RecencyIndex:
+    """
+    Timestamp-ordered side table of every memory, keyed on (kind, user_id, timestamp).
+
+    Chroma cannot return a user's newest memories without reading all of
+    them, so "most recent N" lookups read N ids from this SQLite index and
+    then fetch exactly those memories by id. The bank adds entries as it
+    writes and removes them as memories are deleted; memories written before
+    the index existed are loaded by a one-time paged scan per kind. Entries
+    whose memory has disappeared anyway are pruned by the reader.
+
+    Every entry also gets an increasing insertion sequence, so background
+    jobs can pick up memories indexed since their last run even when the
+    memories carry older timestamps (imports, late write-behind flushes,
+    consolidation summaries).
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize RecencyIndex.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS recency ("
+            "kind TEXT NOT NULL, memory_id TEXT NOT NULL, user_id TEXT NOT NULL, timestamp REAL NOT NULL, "
+            "sequence INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (kind, memory_id)) WITHOUT ROWID"
+        )
+        self._connection.execute("CREATE TABLE IF NOT EXISTS recency_built (kind TEXT PRIMARY KEY)")
+        # Newest memory per user, so background jobs find active users without a scan
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS user_activity (user_id TEXT PRIMARY KEY, last_timestamp REAL NOT NULL, "
+            "last_sequence INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._add_sequences()
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS recency_by_user ON recency (kind, user_id, timestamp)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS recency_by_sequence ON recency (kind, user_id, sequence)"
+        )
+        self._connection.commit()
+
+        self.built = {row[0] for row in self._connection.execute("SELECT kind FROM recency_built")}
+        self._sequence = self._connection.execute(
+            "SELECT COALESCE(MAX(last_sequence), 0) FROM user_activity"
+        ).fetchone()[0]
+        # The connection is shared by request threads and background workers
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+        # Metrics
+        self.lookups = 0
+        self.pruned = 0
+
+    def _add_sequences(self):
+        """Give the entries of an index created before insertion sequences one, in timestamp order."""
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(recency)")}
+        if "sequence" in columns:
+            return
+        self._connection.execute("ALTER TABLE recency ADD COLUMN sequence INTEGER NOT NULL DEFAULT 0")
+        self._connection.execute("ALTER TABLE user_activity ADD COLUMN last_sequence INTEGER NOT NULL DEFAULT 0")
+        rows = self._connection.execute("SELECT kind, memory_id FROM recency ORDER BY timestamp").fetchall()
+        self._connection.executemany(
+            "UPDATE recency SET sequence = ? WHERE kind = ? AND memory_id = ?",
+            [(sequence, kind, memory_id) for sequence, (kind, memory_id) in enumerate(rows, 1)]
+        )
+        self._connection.execute(
+            "UPDATE user_activity SET last_sequence = "
+            "(SELECT COALESCE(MAX(sequence), 0) FROM recency WHERE recency.user_id = user_activity.user_id)"
+        )
+
+    def add(self, kind: str, ids: List[str], metadatas: List[Dict]):
+        """
+        Index written memories (replayed writes overwrite their entry and count as new).
+
+        Args:
+            kind: Memory kind
+            ids: Memory IDs
+            metadatas: Their metadata, with user_id and timestamp
+        """
+        if not ids:
+            return
+        with self._lock:
+            rows = []
+            latest = {}
+            for item_id, m in zip(ids, metadatas):
+                self._sequence += 1
+                rows.append((kind, item_id, m["user_id"], float(m["timestamp"]), self._sequence))
+                timestamp = max(float(m["timestamp"]), latest.get(m["user_id"], (0.0, 0))[0])
+                latest[m["user_id"]] = (timestamp, self._sequence)
+            self._connection.executemany("INSERT OR REPLACE INTO recency VALUES (?, ?, ?, ?, ?)", rows)
+            self._connection.executemany(
+                "INSERT INTO user_activity VALUES (?, ?, ?) ON CONFLICT (user_id) "
+                "DO UPDATE SET last_timestamp = MAX(last_timestamp, excluded.last_timestamp), "
+                "last_sequence = excluded.last_sequence",
+                [(user_id, timestamp, sequence) for user_id, (timestamp, sequence) in latest.items()]
+            )
+            self._connection.commit()
+
+    def discard(self, kind: str, ids: Iterable[str]):
+        """
+        Remove deleted memories.
+
+        Args:
+            kind: Memory kind
+            ids: Memory IDs
+        """
+        rows = [(kind, item_id) for item_id in ids]
+        if not rows:
+            return
+        with self._lock:
+            self._connection.executemany("DELETE FROM recency WHERE kind = ? AND memory_id = ?", rows)
+            self._connection.commit()
+
+    def prune(self, kind: str, ids: Iterable[str]):
+        """Remove entries whose memory was found missing by a reader."""
+        ids = list(ids)
+        self.discard(kind, ids)
+        self.pruned += len(ids)
+
+    def recent(self, kind: str, user_id: str, limit: int, offset: int = 0) -> List[str]:
+        """
+        IDs of a user's most recent memories of one kind.
+
+        Args:
+            kind: Memory kind
+            user_id: User ID
+            limit: Number of IDs to return
+            offset: Number of newer IDs to skip
+
+        Returns:
+            Memory IDs, newest first
+        """
+        with self._lock:
+            self.lookups += 1
+            rows = self._connection.execute(
+                "SELECT memory_id FROM recency WHERE kind = ? AND user_id = ? "
+                "ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+                (kind, user_id, limit, offset)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def since(self, kind: str, user_id: str, sequence: int, limit: int) -> List[Tuple[str, int]]:
+        """
+        A user's memories of one kind indexed after an insertion sequence.
+
+        Args:
+            kind: Memory kind
+            user_id: User ID
+            sequence: Only memories indexed later are returned
+            limit: Maximum number of memories
+
+        Returns:
+            (memory ID, sequence) pairs in indexing order
+        """
+        with self._lock:
+            self.lookups += 1
+            rows = self._connection.execute(
+                "SELECT memory_id, sequence FROM recency WHERE kind = ? AND user_id = ? AND sequence > ? "
+                "ORDER BY sequence LIMIT ?",
+                (kind, user_id, sequence, limit)
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def last_sequence(self, user_id: str) -> int:
+        """Insertion sequence of the last memory indexed for a user (0 if none)."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT last_sequence FROM user_activity WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def user_activity(self) -> Dict[str, int]:
+        """Insertion sequence of the last memory indexed for each user."""
+        with self._lock:
+            return dict(self._connection.execute("SELECT user_id, last_sequence FROM user_activity").fetchall())
+
+    def count(self, kind: str, user_id: str) -> int:
+        """Number of indexed memories of a user and kind."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM recency WHERE kind = ? AND user_id = ?", (kind, user_id)
+            ).fetchone()[0]
+
+    def build(self, kind: str, collections, page_size: int = 1000):
+        """
+        Index the existing memories of a kind (paged metadata-only scan, once per store).
+
+        Args:
+            kind: Memory kind
+            collections: Every collection holding memories of that kind
+            page_size: Items read per page
+        """
+        if kind in self.built:
+            return
+        with self._build_lock:
+            if kind in self.built:
+                return
+
+            start_time = time.time()
+            indexed = 0
+            for collection in collections:
+                offset = 0
+                while True:
+                    page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+                    if not page["ids"]:
+                        break
+                    self.add(kind, page["ids"], page["metadatas"])
+                    indexed += len(page["ids"])
+                    offset += len(page["ids"])
+
+            self.mark_built(kind)
+            print(f"Recency index built for {kind} with {indexed} memories in {time.time() - start_time:.2f}s")
+
+    def mark_built(self, kind: str):
+        """Record that every memory of a kind is indexed (e.g. for a new, empty store)."""
+        with self._lock:
+            self._connection.execute("INSERT OR IGNORE INTO recency_built VALUES (?)", (kind,))
+            self._connection.commit()
+        self.built.add(kind)
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def get_stats(self) -> Dict:
+        """
+        Get index metrics.
+
+        Returns:
+            Dict with indexed memories per kind, built kinds, lookups and
+            pruned stale entries
+        """
+        with self._lock:
+            counts = dict(self._connection.execute("SELECT kind, COUNT(*) FROM recency GROUP BY kind").fetchall())
+        return {
+            "memories": counts,
+            "built": sorted(self.built),
+            "lookups": self.lookups,
+            "pruned": self.pruned
+        }
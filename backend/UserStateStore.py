@@ -0,0 +1,186 @@
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class UserStateStore:
+    """
+    Small key/value store for per-user state such as session counters.
+
+    Values live in an in-memory cache and are written to SQLite in a single
+    transaction every flush_interval seconds (and on close), so an increment
+    is a dict update under a lock instead of a database round trip. Only
+    changes made since the last flush can be lost on a crash.
+    """
+
+    def __init__(self, db_path: str, flush_interval: float = 1.0, clock=None):
+        """
+        Initialize UserStateStore.
+
+        Args:
+            db_path: Path of the SQLite database file
+            flush_interval: Seconds between durable flushes of changed values
+            clock: Callable returning the updated_at timestamp (defaults to time.time)
+        """
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.clock = clock or time.time
+
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS user_state ("
+            "user_id TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (user_id, key))"
+        )
+        self._connection.commit()
+
+        self._cache = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        # Serializes flushes, which run outside the cache lock
+        self._flush_lock = threading.Lock()
+        # The connection is shared by request threads and the flush thread
+        self._db_lock = threading.Lock()
+        self._stop = threading.Event()
+
+        # Metrics
+        self.flushes = 0
+        self.flushed_values = 0
+
+        self._worker = threading.Thread(target=self._run, name="user-state-flush", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def _load(self, user_id: str, key: str):
+        """Read a value into the cache. Caller must hold the lock."""
+        with self._db_lock:
+            row = self._connection.execute(
+                "SELECT value FROM user_state WHERE user_id = ? AND key = ?", (user_id, key)
+            ).fetchone()
+        value = json.loads(row[0]) if row else None
+        self._cache[(user_id, key)] = value
+        return value
+
+    def get(self, user_id: str, key: str, default=None):
+        """
+        Get a user state value.
+
+        Args:
+            user_id: User ID
+            key: State key
+            default: Value returned when the key was never set
+
+        Returns:
+            The stored value or default
+        """
+        with self._lock:
+            if (user_id, key) in self._cache:
+                value = self._cache[(user_id, key)]
+            else:
+                value = self._load(user_id, key)
+        return default if value is None else value
+
+    def set(self, user_id: str, key: str, value):
+        """
+        Set a user state value (any JSON-serializable value).
+
+        Args:
+            user_id: User ID
+            key: State key
+            value: New value
+        """
+        with self._lock:
+            self._cache[(user_id, key)] = value
+            self._dirty.add((user_id, key))
+
+    def increment(self,
+                  user_id: str,
+                  key: str,
+                  amount: int = 1,
+                  initial: Optional[Callable[[], int]] = None) -> int:
+        """
+        Atomically increment a counter.
+
+        Args:
+            user_id: User ID
+            key: Counter key
+            amount: Increment
+            initial: Called once, under the lock, for the starting value of a
+                counter that was never stored (defaults to 0)
+
+        Returns:
+            The new counter value
+        """
+        with self._lock:
+            if (user_id, key) in self._cache:
+                value = self._cache[(user_id, key)]
+            else:
+                value = self._load(user_id, key)
+            if value is None:
+                value = initial() if initial else 0
+
+            value += amount
+            self._cache[(user_id, key)] = value
+            self._dirty.add((user_id, key))
+            return value
+
+    def flush(self):
+        """Write every changed value to SQLite in one transaction."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                now = self.clock()
+                rows = [
+                    (user_id, key, json.dumps(self._cache[(user_id, key)]), now)
+                    for user_id, key in self._dirty
+                ]
+                self._dirty.clear()
+
+            try:
+                with self._db_lock, self._connection:
+                    self._connection.executemany(
+                        "INSERT INTO user_state (user_id, key, value, updated_at) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(user_id, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                        rows
+                    )
+            except sqlite3.Error as e:
+                print(f"Error flushing user state: {e}")
+                # Retry on the next flush
+                with self._lock:
+                    self._dirty.update((user_id, key) for user_id, key, _, _ in rows)
+                return
+
+            self.flushes += 1
+            self.flushed_values += len(rows)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """Flush pending changes and stop the flush thread."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._worker.join(self.flush_interval + 1)
+        self.flush()
+
+    def get_stats(self) -> Dict:
+        """
+        Get store metrics.
+
+        Returns:
+            Dict with cached and pending values and flush counters
+        """
+        with self._lock:
+            return {
+                "cached_values": len(self._cache),
+                "pending_values": len(self._dirty),
+                "flushes": self.flushes,
+                "flushed_values": self.flushed_values
+            }
@@ -20,6 +20,9 @@ import ssl
 import socket
 import shutil
 from MemoryBank import MemoryBank
+from MemoryExpiry import start_memory_sweeper
+from MemoryConsolidator import start_memory_consolidator
+from PortraitEngine import get_portrait_engine, start_portrait_engine
 #from sentimentanalysis import analyze_sentiment
 
 accelerator = Accelerator()
@@ -36,6 +39,12 @@ memory_bank = MemoryBank(
         persist_directory="./dual_response_memory_storage",
         forgetting_enabled=True
 )
+# Delete forgotten memories in the background
+start_memory_sweeper(memory_bank)
+# Roll aging conversations into event summaries in the background
+start_memory_consolidator(memory_bank)
+# Revise user portraits from new memories in the background
+start_portrait_engine(memory_bank)
 
 @app.route('/model_output/<filename>', methods=['GET'])
 def get_audio(filename):
@@ -151,9 +160,16 @@ def set_listening_state():
         return jsonify({'message': str(e)}), 400
 
 ##Function to get the current user portrait
+@app.route('/portrait', methods=['GET'])
 def get_user_portrait():
-    """Endpoint to get the current user portrait"""
-    portrait = memory_bank.generate_user_portrait()
+    """Endpoint to get the current user portrait (refresh=true folds in new memories first)"""
+    user_id = request.args.get('user_id', 'User 1')
+    if request.args.get('refresh', '').lower() == 'true':
+        try:
+            get_portrait_engine(memory_bank).update_user(user_id, force=True)
+        except Exception as e:
+            print(f"Error refreshing portrait of {user_id}: {e}")
+    portrait = memory_bank.get_user_portrait(user_id)
     return jsonify({"portrait": portrait})
 
 ##Function to get the current user memory
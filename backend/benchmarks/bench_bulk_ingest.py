@@ -0,0 +1,85 @@
+"""
+Benchmark for bulk memory ingestion.
+
+Writes a synthetic JSONL log of conversations and event summaries (many of
+them sharing the same second per user, as migrated logs do), then compares
+items per second of the one-item add_* calls against MemoryBank.ingest_jsonl
+and checks that every item was stored under its own id.
+
+Usage:
+    python benchmarks/bench_bulk_ingest.py --users 10 --items 5000 --single-items 200
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MemoryBank import MemoryBank
+
+
+def write_history(path: str, n_users: int, n_items: int):
+    """Synthetic history: one in ten items is a summary, ten items per second."""
+    base_time = time.time() - 30 * 24 * 3600
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n_items):
+            user_id = f"user_{i % n_users}"
+            timestamp = base_time + i // 10
+            if i % 10 == 0:
+                record = {"type": "event_summary", "user_id": user_id, "timestamp": timestamp,
+                          "summary_text": f"Summary {i}: the user talked about topic {i % 53}"}
+            else:
+                record = {"type": "conversation", "user_id": user_id, "timestamp": timestamp,
+                          "conversation_text": f"User: tell me about topic {i % 53}\nBot: answer {i}"}
+            f.write(json.dumps(record) + "\n")
+
+
+def run_benchmark(n_users: int, n_items: int, n_single: int, batch_size: int) -> dict:
+    work_dir = tempfile.mkdtemp()
+    history_path = os.path.join(work_dir, "history.jsonl")
+    write_history(history_path, n_users, n_items)
+
+    # One-item API, on a separate store
+    single_bank = MemoryBank(persist_directory=os.path.join(work_dir, "single"))
+    start_time = time.time()
+    with open(history_path, "r", encoding="utf-8") as f:
+        for _, line in zip(range(n_single), f):
+            record = json.loads(line)
+            if record["type"] == "conversation":
+                single_bank.add_conversation(record["user_id"], record["conversation_text"])
+            else:
+                single_bank.add_event_summary(record["user_id"], record["summary_text"])
+    single_seconds = time.time() - start_time
+
+    bulk_bank = MemoryBank(persist_directory=os.path.join(work_dir, "bulk"))
+    stats = bulk_bank.ingest_jsonl(history_path, batch_size=batch_size, show_progress=False)
+
+    stored = bulk_bank.conversations_collection.count() + bulk_bank.summaries_collection.count()
+
+    return {
+        "items": n_items,
+        "users": n_users,
+        "batch_size": batch_size,
+        "single_items_per_second": n_single / single_seconds if single_seconds else 0.0,
+        "bulk_items_per_second": stats["items_per_second"],
+        "speedup": (
+            stats["items_per_second"] / (n_single / single_seconds) if single_seconds else 0.0
+        ),
+        "stored_items": stored,
+        "lost_items": n_items - stored,
+        "ingest_stats": stats
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--single-items", type=int, default=200, help="Items written with the one-item API")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.users, args.items, args.single_items, args.batch_size), indent=2))
@@ -0,0 +1,77 @@
+"""
+Throughput benchmark for CLIP image embedding.
+
+Embeds synthetic frames one at a time (the old per-image path) and with
+MemoryBank.embed_images at several batch sizes and precisions, and reports
+images per second. For bf16 and int8 it also reports the cosine similarity
+to the fp32 embeddings, to show what the speedup costs in accuracy.
+
+Usage:
+    python benchmarks/bench_clip_embedding.py --images 64 --batch-sizes 1 8 32 --precisions fp32 bf16 int8
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MemoryBank import MemoryBank
+
+
+def make_images(n_images: int):
+    rng = np.random.default_rng(0)
+    return [
+        Image.fromarray(rng.integers(0, 255, size=(336, 336, 3), dtype=np.uint8))
+        for _ in range(n_images)
+    ]
+
+
+def run_benchmark(n_images: int, batch_sizes, precisions) -> dict:
+    work_dir = tempfile.mkdtemp()
+    images = make_images(n_images)
+    report = {"images": n_images, "results": {}}
+
+    reference = None
+    for precision in precisions:
+        memory_bank = MemoryBank(
+            persist_directory=os.path.join(work_dir, precision),
+            clip_precision=precision
+        )
+        # Load the model outside the timings
+        memory_bank.embed_images(images[:1])
+
+        results = {}
+
+        start_time = time.time()
+        for image in images:
+            memory_bank._get_clip_embedding(image)
+        results["one_at_a_time_images_per_second"] = n_images / (time.time() - start_time)
+
+        for batch_size in batch_sizes:
+            start_time = time.time()
+            embeddings = memory_bank.embed_images(images, batch_size=batch_size)
+            results[f"batch_{batch_size}_images_per_second"] = n_images / (time.time() - start_time)
+
+        if reference is None:
+            reference = embeddings
+        else:
+            results["mean_cosine_to_first_precision"] = float(np.mean(np.sum(embeddings * reference, axis=1)))
+
+        report["results"][precision] = results
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--precisions", nargs="+", default=["fp32", "bf16", "int8"])
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.images, args.batch_sizes, args.precisions), indent=2))
@@ -0,0 +1,122 @@
+"""
+Benchmark for conversation consolidation.
+
+Fills a MemoryBank with several weeks of conversations per user over a few
+topics, then runs MemoryConsolidator once against a local fake Ollama
+server and reports the active collection sizes before and after, the
+summaries written, the LLM calls made and the retrieval latency.
+
+Usage:
+    python benchmarks/bench_consolidation.py --users 20 --days 30 --turns-per-day 6
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MemoryBank import MemoryBank
+from MemoryConsolidator import MemoryConsolidator
+
+TOPICS = {
+    "garden": "I planted tomatoes in the garden and watered the roses.",
+    "grandson": "My grandson called and told me about his football match.",
+    "health": "The doctor said my blood pressure is better this week.",
+    "cooking": "I cooked a pumpkin soup from my mother's recipe."
+}
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Answers every prompt with a fixed-size summary."""
+    calls = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        FakeOllamaHandler.calls += 1
+        payload = json.dumps({"response": "The user talked about their week and how they felt about it."}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def retrieval_ms(memory_bank: MemoryBank, n_users: int) -> float:
+    start_time = time.time()
+    for u in range(n_users):
+        memory_bank.retrieve_conversations(f"user_{u}", "How is the garden?", n_results=5)
+        memory_bank.retrieve_event_summaries(f"user_{u}", "How is the garden?", n_results=3)
+    return (time.time() - start_time) * 1000 / n_users
+
+
+def run_benchmark(n_users: int, n_days: int, turns_per_day: int, min_age_days: float) -> dict:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    work_dir = tempfile.mkdtemp()
+    memory_bank = MemoryBank(persist_directory=os.path.join(work_dir, "memory"), forgetting_enabled=False)
+
+    rng = random.Random(0)
+    now = time.time()
+    items = []
+    for u in range(n_users):
+        for day in range(n_days):
+            for turn in range(turns_per_day):
+                topic = rng.choice(list(TOPICS))
+                items.append({
+                    "user_id": f"user_{u}",
+                    "conversation_text": f"User: {TOPICS[topic]}\nBot: That sounds lovely, tell me more.",
+                    "timestamp": now - (n_days - day) * 86400 + turn * 1800
+                })
+    memory_bank.add_conversations(items)
+
+    before = {
+        "conversations": memory_bank.conversations_collection.count(),
+        "event_summaries": memory_bank.summaries_collection.count(),
+        "retrieval_ms_per_user": retrieval_ms(memory_bank, n_users)
+    }
+
+    consolidator = MemoryConsolidator(
+        memory_bank,
+        ollama_base_url=f"http://127.0.0.1:{server.server_address[1]}",
+        min_age_days=min_age_days,
+        max_summaries_per_minute=0
+    )
+    run = consolidator.run_once(now=now)
+
+    after = {
+        "conversations": memory_bank.conversations_collection.count(),
+        "event_summaries": memory_bank.summaries_collection.count(),
+        "retrieval_ms_per_user": retrieval_ms(memory_bank, n_users)
+    }
+    server.shutdown()
+
+    return {
+        "conversations_written": len(items),
+        "before": before,
+        "after": after,
+        "run": run,
+        "llm_calls": FakeOllamaHandler.calls,
+        "consolidator": consolidator.get_stats()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--turns-per-day", type=int, default=6)
+    parser.add_argument("--min-age-days", type=float, default=None,
+                        help="Consolidation age (default: derived from the expiry horizon)")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.users, args.days, args.turns_per_day, args.min_age_days), indent=2))
@@ -0,0 +1,88 @@
+"""
+Benchmark for forgotten-memory cleanup.
+
+Fills a store with memories of which only a small fraction is past the
+forgetting threshold, then compares the old full scan (get every item,
+score it in Python) with a MemorySweeper pass driven by the expiry index.
+
+Usage:
+    python benchmarks/bench_expiry_sweep.py --memories 20000 --expired 200
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MemoryBank import MemoryBank
+from MemoryExpiry import ExpiryIndex, MemorySweeper
+
+
+def legacy_scan(memory_bank, threshold: float) -> int:
+    """The previous cleanup, without the delete: score every stored memory."""
+    expired = 0
+    for collection in [memory_bank.conversations_collection, memory_bank.summaries_collection]:
+        results = collection.get()
+        for metadata in results["metadatas"]:
+            if memory_bank._calculate_memory_score(metadata["last_access_time"], metadata["memory_strength"]) < threshold:
+                expired += 1
+    return expired
+
+
+def run_benchmark(n_memories: int, n_expired: int, threshold: float) -> dict:
+    memory_bank = MemoryBank(persist_directory=os.path.join(tempfile.mkdtemp(), "memory"))
+    now = time.time()
+
+    # Strength 1.0 expires after ln(1/threshold) days; 30 days is well past it
+    items = [
+        {
+            "user_id": f"user_{i % 20}",
+            "conversation_text": f"Conversation {i}",
+            "timestamp": now - (30 if i < n_expired else 0.1) * 24 * 3600
+        }
+        for i in range(n_memories)
+    ]
+    memory_bank.add_conversations(items)
+
+    start_time = time.time()
+    legacy_expired = legacy_scan(memory_bank, threshold)
+    legacy_seconds = time.time() - start_time
+
+    # Fresh sweeper and index, as after a restart
+    memory_bank.expiry_index = ExpiryIndex(threshold)
+    sweeper = MemorySweeper(memory_bank, max_deletes_per_second=0)
+
+    start_time = time.time()
+    sweeper.build_index()
+    build_seconds = time.time() - start_time
+
+    sweep = sweeper.sweep_once()
+    second_sweep = sweeper.sweep_once()
+
+    return {
+        "memories": n_memories,
+        "expired": n_expired,
+        "legacy_scan_seconds": legacy_seconds,
+        "legacy_items_read": n_memories,
+        "legacy_found_expired": legacy_expired,
+        "index_build_seconds_once_per_start": build_seconds,
+        "sweep_seconds": sweep["seconds"],
+        "sweep_items_read": sweep["checked"],
+        "sweep_deleted": sweep["deleted"],
+        "idle_sweep_seconds": second_sweep["seconds"],
+        "remaining": memory_bank.conversations_collection.count(),
+        "sweeper_stats": sweeper.get_stats()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memories", type=int, default=20000)
+    parser.add_argument("--expired", type=int, default=200)
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.memories, args.expired, args.threshold), indent=2))
@@ -0,0 +1,85 @@
+"""
+Benchmark for the in-process hot memory tier.
+
+Fills a MemoryBank with conversations for a number of users, then runs
+retrieve_conversations for random active users with the hot tier and with
+every query forced to Chroma, and reports p50/p95 latency of both, the raw
+hot tier search time and its hit rate.
+
+Usage:
+    python benchmarks/bench_hot_tier.py --users 50 --items-per-user 300 --queries 500
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MemoryBank import MemoryBank
+
+TOPICS = ["garden", "grandson", "doctor", "cooking", "music", "church", "walk", "weather"]
+
+
+def measure(memory_bank: MemoryBank, n_users: int, n_queries: int) -> dict:
+    rng = random.Random(0)
+    latencies = []
+    for _ in range(n_queries):
+        user_id = f"user_{rng.randrange(n_users)}"
+        query = f"Tell me about the {rng.choice(TOPICS)} again"
+        start_time = time.time()
+        memory_bank.retrieve_conversations(user_id, query, n_results=5)
+        latencies.append(time.time() - start_time)
+    return {
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000)
+    }
+
+
+def run_benchmark(n_users: int, items_per_user: int, n_queries: int) -> dict:
+    work_dir = tempfile.mkdtemp()
+    memory_bank = MemoryBank(persist_directory=os.path.join(work_dir, "memory"), forgetting_enabled=False)
+
+    memory_bank.add_conversations([
+        {
+            "user_id": f"user_{u}",
+            "conversation_text": f"User: Today was about {TOPICS[(u + i) % len(TOPICS)]} ({i}).\nBot: Lovely!"
+        }
+        for u in range(n_users)
+        for i in range(items_per_user)
+    ])
+    # Encode the queries once so only retrieval is timed
+    for topic in TOPICS:
+        memory_bank.embed_query(f"Tell me about the {topic} again")
+
+    # Every query goes to Chroma
+    hot_search = memory_bank.hot_tier.search
+    memory_bank.hot_tier.search = lambda *args, **kwargs: None
+    chroma = measure(memory_bank, n_users, n_queries)
+    memory_bank.hot_tier.search = hot_search
+
+    # First pass loads the users, second pass is served hot
+    measure(memory_bank, n_users, n_queries)
+    hot = measure(memory_bank, n_users, n_queries)
+
+    return {
+        "users": n_users,
+        "items_per_user": items_per_user,
+        "chroma": chroma,
+        "hot_tier": hot,
+        "hot_tier_stats": memory_bank.hot_tier.get_stats()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--items-per-user", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.users, args.items_per_user, args.queries), indent=2))
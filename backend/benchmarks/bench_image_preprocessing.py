@@ -0,0 +1,117 @@
+"""
+Benchmark for the llava image preparation stage.
+
+Compares the raw uploaded PNG against the prepared JPEG: upload bytes, the
+size of the JSON body sent to /api/generate and the preparation time. With
+--ollama-url it also times the llava call on both payloads.
+
+Usage:
+    python benchmarks/bench_image_preprocessing.py --frames 20 --width 1280 --height 720
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import requests
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ImagePreprocessor import ImagePreprocessor
+
+
+def make_frame(width: int, height: int, seed: int) -> Image.Image:
+    """Synthetic webcam-like frame: smooth gradient plus sensor noise."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    noise = rng.normal(0, 12, size=base.shape)
+    return Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8))
+
+
+def payload_size(image_b64: str) -> int:
+    """Size of the JSON body the analyzer posts to Ollama."""
+    return len(json.dumps({"model": "llava:7b", "prompt": "", "images": [image_b64]}))
+
+
+def time_llava(ollama_url: str, image_b64: str) -> float:
+    start_time = time.time()
+    requests.post(
+        f"{ollama_url}/api/generate",
+        json={
+            "model": "llava:7b",
+            "prompt": "Describe the image in one word.",
+            "images": [image_b64],
+            "stream": False,
+            "options": {"num_predict": 1}
+        },
+        timeout=180
+    )
+    return time.time() - start_time
+
+
+def run_benchmark(n_frames: int, width: int, height: int, ollama_url: str = None) -> dict:
+    work_dir = tempfile.mkdtemp()
+    preprocessor = ImagePreprocessor()
+
+    raw_bytes = raw_payload = prepared_bytes = prepared_payload = 0
+    prepare_seconds = cached_seconds = 0.0
+    raw_llava = prepared_llava = 0.0
+
+    for i in range(n_frames):
+        path = os.path.join(work_dir, f"frame_{i}.png")
+        make_frame(width, height, seed=i).save(path)
+
+        with open(path, "rb") as f:
+            raw_b64 = base64.b64encode(f.read()).decode("utf-8")
+
+        start_time = time.time()
+        prepared = preprocessor.prepare(path)
+        prepare_seconds += time.time() - start_time
+
+        # Second call is what the memory store path sees
+        start_time = time.time()
+        preprocessor.prepare(path)
+        cached_seconds += time.time() - start_time
+
+        raw_bytes += prepared["original_size"]
+        prepared_bytes += prepared["prepared_size"]
+        raw_payload += payload_size(raw_b64)
+        prepared_payload += payload_size(prepared["base64"])
+
+        if ollama_url:
+            raw_llava += time_llava(ollama_url, raw_b64)
+            prepared_llava += time_llava(ollama_url, prepared["base64"])
+
+    report = {
+        "frames": n_frames,
+        "resolution": f"{width}x{height}",
+        "avg_upload_bytes_raw": raw_bytes / n_frames,
+        "avg_upload_bytes_prepared": prepared_bytes / n_frames,
+        "avg_json_payload_raw": raw_payload / n_frames,
+        "avg_json_payload_prepared": prepared_payload / n_frames,
+        "payload_reduction": raw_payload / prepared_payload if prepared_payload else 0.0,
+        "avg_prepare_ms": prepare_seconds / n_frames * 1000,
+        "avg_cached_prepare_ms": cached_seconds / n_frames * 1000,
+        "preprocessor_stats": preprocessor.get_stats()
+    }
+    if ollama_url:
+        report["avg_llava_seconds_raw"] = raw_llava / n_frames
+        report["avg_llava_seconds_prepared"] = prepared_llava / n_frames
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--ollama-url", default=None, help="Also time llava:7b on both payloads")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.frames, args.width, args.height, args.ollama_url), indent=2))
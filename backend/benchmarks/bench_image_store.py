@@ -0,0 +1,93 @@
+"""
+Benchmark for emotional image storage.
+
+Simulates webcam sessions where the scene only changes every few turns and
+reports, per stored frame, the CLIP embeddings computed and the bytes kept
+on disk, against the old behaviour of one full-size JPEG and one embedding
+per turn.
+
+Usage:
+    python benchmarks/bench_image_store.py --users 4 --turns 40 --scene-every 8
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MemoryBank import MemoryBank
+
+
+def make_frame(scene: int, rng, width: int = 640, height: int = 480) -> Image.Image:
+    """Smooth scene (changes with `scene`) plus per-frame sensor noise."""
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    angle = scene * 0.7
+    base = np.stack([
+        (np.cos(angle) * x + np.sin(angle) * y) % 256,
+        (y + scene * 40) % 256 + 0 * x,
+        (x + y + scene * 90) % 256
+    ], axis=-1)
+    noise = rng.normal(0, 8, size=base.shape)
+    return Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8))
+
+
+def run_benchmark(n_users: int, n_turns: int, scene_every: int) -> dict:
+    work_dir = tempfile.mkdtemp()
+    memory_bank = MemoryBank(
+        persist_directory=os.path.join(work_dir, "memory"),
+        image_directory=os.path.join(work_dir, "images")
+    )
+
+    embedded = {"images": 0}
+    embed_images = memory_bank.embed_images
+
+    def counting_embed_images(images, batch_size=None):
+        embedded["images"] += len(images)
+        return embed_images(images, batch_size)
+
+    memory_bank.embed_images = counting_embed_images
+
+    rng = np.random.default_rng(0)
+    legacy_bytes = 0
+    start_time = time.time()
+    for turn in range(n_turns):
+        for u in range(n_users):
+            frame = make_frame(u * 1000 + turn // scene_every, rng)
+
+            # The old store saved every frame at full size
+            buffer = io.BytesIO()
+            frame.save(buffer, format="JPEG")
+            legacy_bytes += len(buffer.getvalue())
+
+            memory_bank.add_emotional_image(f"user_{u}", frame, f"Turn {turn}: calm")
+    elapsed = time.time() - start_time
+
+    frames = n_users * n_turns
+    storage = memory_bank.get_image_storage_stats()
+    return {
+        "frames": frames,
+        "seconds": elapsed,
+        "legacy_embeddings": frames,
+        "embeddings": embedded["images"],
+        "legacy_bytes": legacy_bytes,
+        "stored_bytes": storage["bytes"] + storage["thumbnail_bytes"],
+        "image_memories": memory_bank.images_collection.count(),
+        "storage": storage
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--scene-every", type=int, default=8, help="Turns between scene changes")
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.users, args.turns, args.scene_every), indent=2))
@@ -0,0 +1,123 @@
+"""
+Benchmark for memory-strength updates during retrieval.
+
+Counts Chroma round trips (get/query/update calls) made by
+get_prompt_context and times the batched strength update against the old
+per-item get + update over the same candidates.
+
+Usage:
+    python benchmarks/bench_memory_strength_updates.py --conversations 500 --summaries 50 --turns 20
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MemoryBank import MemoryBank
+
+COUNTED_METHODS = ("get", "query", "update", "upsert", "add", "delete")
+
+
+class CountingCollection:
+    """Proxy around a Chroma collection that counts round trips."""
+
+    def __init__(self, collection, counter: Counter):
+        self._collection = collection
+        self._counter = counter
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in COUNTED_METHODS:
+            return attr
+
+        def counted(*args, **kwargs):
+            self._counter[name] += 1
+            return attr(*args, **kwargs)
+        return counted
+
+
+def legacy_update_memory_strength(collection, item_ids):
+    """The previous strategy: one get and one update per candidate."""
+    for item_id in item_ids:
+        item = collection.get(ids=[item_id])
+        if not item["ids"]:
+            continue
+        metadata = item["metadatas"][0].copy()
+        metadata["memory_strength"] += 1.0
+        metadata["last_access_time"] = time.time()
+        collection.update(ids=[item_id], metadatas=[metadata])
+
+
+def run_benchmark(n_conversations: int, n_summaries: int, n_turns: int) -> dict:
+    memory_bank = MemoryBank(persist_directory=os.path.join(tempfile.mkdtemp(), "memory"))
+    user_id = "bench_user"
+
+    memory_bank.add_conversations([
+        {"user_id": user_id, "conversation_text": f"User talked about topic {i % 37} on day {i}"}
+        for i in range(n_conversations)
+    ])
+    for i in range(n_summaries):
+        memory_bank.add_event_summary(user_id, f"Summary of week {i} about topic {i % 37}")
+
+    counter = Counter()
+    for name in ("conversations_collection", "images_collection", "summaries_collection", "user_portrait_collection"):
+        setattr(memory_bank, name, CountingCollection(getattr(memory_bank, name), counter))
+
+    start_time = time.time()
+    for turn in range(n_turns):
+        memory_bank.get_prompt_context(user_id, f"What did we say about topic {turn % 37}?")
+    context_seconds = (time.time() - start_time) / n_turns
+    round_trips = dict(counter)
+
+    # Same candidate set, old strategy vs batched update of the returned items
+    collection = memory_bank.conversations_collection
+    candidates = collection.query(query_texts=["topic 1"], n_results=10, where={"user_id": user_id})
+    candidate_ids = candidates["ids"][0]
+    returned = [
+        {"id": item_id, "metadata": metadata}
+        for item_id, metadata in zip(candidate_ids[:5], candidates["metadatas"][0][:5])
+    ]
+
+    counter.clear()
+    start_time = time.time()
+    legacy_update_memory_strength(collection, candidate_ids)
+    legacy_seconds = time.time() - start_time
+    legacy_round_trips = sum(counter.values())
+
+    counter.clear()
+    start_time = time.time()
+    memory_bank._update_memory_strength(collection, returned)
+    batched_seconds = time.time() - start_time
+    batched_round_trips = sum(counter.values())
+
+    return {
+        "conversations": n_conversations,
+        "summaries": n_summaries,
+        "turns": n_turns,
+        "avg_get_prompt_context_ms": context_seconds * 1000,
+        "round_trips_per_turn": {name: count / n_turns for name, count in round_trips.items()},
+        "query_embedding_cache": memory_bank.get_query_embedding_stats(),
+        "strength_update": {
+            "candidates": len(candidate_ids),
+            "returned": len(returned),
+            "legacy_round_trips": legacy_round_trips,
+            "batched_round_trips": batched_round_trips,
+            "legacy_ms": legacy_seconds * 1000,
+            "batched_ms": batched_seconds * 1000
+        }
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=500)
+    parser.add_argument("--summaries", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.conversations, args.summaries, args.turns), indent=2))
@@ -0,0 +1,106 @@
+"""
+Per-user retrieval latency as the number of tenants grows.
+
+For each partitioning mode, fills a fresh MemoryBank with the given number
+of users (each with the same number of conversations) and reports the p50
+and p95 latency of retrieve_conversations for a sample of users. With
+partitioning the latency should stay flat as tenants are added. Also times
+migrating the shared store to each partitioned layout.
+
+Usage:
+    python benchmarks/bench_partitioning.py --tenants 10 100 1000 --items-per-user 20 --modes shared user bucket
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MemoryBank import MemoryBank
+from MemoryPartitions import migrate_partitions
+
+TOPICS = ["hiking", "cooking", "music", "work", "family", "travel", "sleep", "books"]
+
+
+def fill(memory_bank: MemoryBank, n_tenants: int, items_per_user: int):
+    items = [
+        {
+            "user_id": f"user_{u}",
+            "conversation_text": f"User: I spent time on {TOPICS[(u + i) % len(TOPICS)]} today ({i}).\nBot: Tell me more!"
+        }
+        for u in range(n_tenants)
+        for i in range(items_per_user)
+    ]
+    memory_bank.add_conversations(items)
+
+
+def measure(memory_bank: MemoryBank, n_tenants: int, n_queries: int) -> dict:
+    rng = random.Random(0)
+    # Warm the query embedding cache so only the search is timed
+    for topic in TOPICS:
+        memory_bank.embed_query(f"How was your {topic}?")
+
+    latencies = []
+    for _ in range(n_queries):
+        user_id = f"user_{rng.randrange(n_tenants)}"
+        query = f"How was your {rng.choice(TOPICS)}?"
+        start_time = time.time()
+        memory_bank.retrieve_conversations(user_id, query, n_results=5)
+        latencies.append(time.time() - start_time)
+
+    return {
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000)
+    }
+
+
+def run_benchmark(tenant_counts, items_per_user: int, modes, buckets: int, n_queries: int) -> dict:
+    work_dir = tempfile.mkdtemp()
+    report = {"items_per_user": items_per_user, "results": {}}
+
+    for n_tenants in tenant_counts:
+        results = {}
+        for mode in modes:
+            memory_bank = MemoryBank(
+                persist_directory=os.path.join(work_dir, f"{mode}_{n_tenants}"),
+                forgetting_enabled=False,
+                partitioning=mode,
+                partition_buckets=buckets
+            )
+            start_time = time.time()
+            fill(memory_bank, n_tenants, items_per_user)
+            results[mode] = {"fill_seconds": time.time() - start_time}
+            results[mode].update(measure(memory_bank, n_tenants, n_queries))
+
+        # Migration of the shared store to each partitioned layout
+        if "shared" in modes:
+            shared_directory = os.path.join(work_dir, f"shared_{n_tenants}")
+            for mode in modes:
+                if mode != "shared":
+                    migration = migrate_partitions(shared_directory, mode, buckets)
+                    results[mode]["migration_seconds"] = migration["seconds"]
+                    migrate_partitions(shared_directory, "shared")
+
+        report["results"][n_tenants] = results
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--items-per-user", type=int, default=20)
+    parser.add_argument("--modes", nargs="+", default=["shared", "user", "bucket"])
+    parser.add_argument("--buckets", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(json.dumps(
+        run_benchmark(args.tenants, args.items_per_user, args.modes, args.buckets, args.queries),
+        indent=2
+    ))
@@ -0,0 +1,103 @@
+"""
+Benchmark for incremental portrait updates.
+
+Gives users histories of increasing length (offline embedders, so no model
+is needed), builds a first portrait for each against a local fake Ollama
+server, then adds a few new conversations per user and runs the engine
+again. Reports, per history length, the seconds and prompt size of the
+incremental update, which should not grow with the history.
+
+Usage:
+    python benchmarks/bench_portrait.py --histories 100 1000 10000 --new-memories 8
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MemoryBank import MemoryBank
+from OfflineEmbedder import HashingEmbeddingFunction, HashingImageEmbedder
+from PortraitEngine import PortraitEngine
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Answers every prompt with a fixed portrait and records the prompt sizes."""
+    prompt_bytes = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        FakeOllamaHandler.prompt_bytes.append(len(json.loads(body)["prompt"].encode("utf-8")))
+        payload = json.dumps({"response": "The user enjoys gardening and talks often about family."}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_benchmark(histories, new_memories: int) -> dict:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    work_dir = tempfile.mkdtemp()
+    memory_bank = MemoryBank(
+        persist_directory=os.path.join(work_dir, "memory"),
+        image_directory=os.path.join(work_dir, "images"),
+        text_embedding_function=HashingEmbeddingFunction(),
+        image_embedder=HashingImageEmbedder()
+    )
+    engine = PortraitEngine(
+        memory_bank,
+        ollama_base_url=f"http://127.0.0.1:{server.server_address[1]}",
+        max_updates_per_minute=0
+    )
+
+    now = time.time()
+    for history in histories:
+        memory_bank.add_conversations([
+            {
+                "user_id": f"user_{history}",
+                "conversation_text": f"User: Day {i} in the garden with my grandson.\nBot: How lovely.",
+                "timestamp": now - 3600 - (history - i) * 60
+            }
+            for i in range(history)
+        ])
+    first = engine.run_once()
+
+    results = []
+    for history in histories:
+        memory_bank.add_conversations([
+            {"user_id": f"user_{history}", "conversation_text": f"User: Something new happened ({i}).\nBot: Tell me more."}
+            for i in range(new_memories)
+        ])
+        start_time = time.time()
+        update = engine.update_user(f"user_{history}")
+        results.append({
+            "history": history,
+            "new_memories": new_memories,
+            "update_seconds": time.time() - start_time,
+            "prompt_bytes": FakeOllamaHandler.prompt_bytes[-1],
+            "folded_memories": update["memories"],
+            "version": update["version"]
+        })
+
+    server.shutdown()
+    return {"first_run": first, "incremental": results, "engine": engine.get_stats()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--histories", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--new-memories", type=int, default=8)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.histories, args.new_memories), indent=2))
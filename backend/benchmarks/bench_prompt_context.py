@@ -0,0 +1,113 @@
+"""
+Benchmark for prompt context assembly.
+
+Adds a fixed latency to every Chroma call (as with a remote or busy store)
+and compares running the get_prompt_context lookups one after another with
+the concurrent fan-out. A final run makes one collection slower than the
+lookup timeout to show it degrading to an empty section.
+
+Usage:
+    python benchmarks/bench_prompt_context.py --latency-ms 30 --turns 10
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MemoryBank import MemoryBank
+
+DELAYED_METHODS = ("get", "query", "update", "upsert", "add")
+
+
+class SlowCollection:
+    """Proxy around a Chroma collection that adds latency to every call."""
+
+    def __init__(self, collection, latency: float):
+        self._collection = collection
+        self.latency = latency
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in DELAYED_METHODS:
+            return attr
+
+        def delayed(*args, **kwargs):
+            time.sleep(self.latency)
+            return attr(*args, **kwargs)
+        return delayed
+
+
+def sequential_context(memory_bank, user_id: str, user_input: str):
+    """The lookups of get_prompt_context, one after another."""
+    memory_bank.retrieve_conversations(user_id, user_input)
+    memory_bank.retrieve_emotional_images(user_id, user_input)
+    memory_bank.retrieve_event_summaries(user_id, user_input)
+    memory_bank.get_user_portrait(user_id)
+    memory_bank.increment_session_count(user_id)
+
+
+def run_benchmark(latency_ms: float, n_turns: int) -> dict:
+    memory_bank = MemoryBank(persist_directory=os.path.join(tempfile.mkdtemp(), "memory"))
+    user_id = "bench_user"
+
+    memory_bank.add_conversations([
+        {"user_id": user_id, "conversation_text": f"We talked about topic {i}"} for i in range(200)
+    ])
+    memory_bank.add_event_summaries([
+        {"user_id": user_id, "summary_text": f"Event about topic {i}"} for i in range(20)
+    ])
+    memory_bank.update_user_portrait(user_id, "Enjoys long walks and chess.")
+
+    latency = latency_ms / 1000
+    slow = {}
+    for name in ("conversations_collection", "images_collection", "summaries_collection", "user_portrait_collection"):
+        slow[name] = SlowCollection(getattr(memory_bank, name), latency)
+        setattr(memory_bank, name, slow[name])
+
+    start_time = time.time()
+    for turn in range(n_turns):
+        sequential_context(memory_bank, user_id, f"topic {turn}")
+    sequential_seconds = (time.time() - start_time) / n_turns
+
+    timings = []
+    start_time = time.time()
+    for turn in range(n_turns):
+        timings.append(memory_bank.get_prompt_context(user_id, f"topic {turn}")["lookup_timings"])
+    parallel_seconds = (time.time() - start_time) / n_turns
+
+    # One collection slower than the timeout
+    slow["summaries_collection"].latency = memory_bank.context_lookup_timeout * 2
+    start_time = time.time()
+    degraded = memory_bank.get_prompt_context(user_id, "topic 0")
+    degraded_seconds = time.time() - start_time
+
+    avg_timings = {
+        name: sum(t[name] for t in timings) / n_turns * 1000
+        for name in timings[0]
+    }
+
+    return {
+        "latency_ms_per_call": latency_ms,
+        "turns": n_turns,
+        "sequential_ms": sequential_seconds * 1000,
+        "parallel_ms": parallel_seconds * 1000,
+        "slowest_lookup_ms": max(avg_timings.values()),
+        "avg_lookup_ms": avg_timings,
+        "degraded_turn_ms": degraded_seconds * 1000,
+        "degraded_event_summaries": degraded["event_summaries"],
+        "degraded_lookup_seconds": degraded["lookup_timings"],
+        "hot_cache": memory_bank.hot_cache.get_stats()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=30)
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.latency_ms, args.turns), indent=2))
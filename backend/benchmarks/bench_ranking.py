@@ -0,0 +1,95 @@
+"""
+Benchmark for memory ranking.
+
+Compares the old per-item ranking (a datetime per candidate, sorted by
+retention only) against MemoryRanker on candidate sets of growing size:
+ranking time, and hit rate of a known relevant memory that is older than
+the distractors around it.
+
+Usage:
+    python benchmarks/bench_ranking.py --sizes 10 100 1000 10000 --trials 50
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MemoryRanker import MemoryRanker
+
+
+def legacy_rank(metadatas, n_results):
+    """The previous ranking: retention per item, similarity ignored."""
+    now = datetime.now()
+    scored = []
+    for i, metadata in enumerate(metadatas):
+        last_access = datetime.fromtimestamp(metadata["last_access_time"])
+        days = (now - last_access).total_seconds() / (24 * 3600)
+        scored.append((math.exp(-days / metadata["memory_strength"]), i))
+    scored.sort(reverse=True)
+    return [i for _, i in scored[:n_results]]
+
+
+def make_candidates(size: int, rng):
+    """Candidates in similarity order; index 0 is the relevant but older memory."""
+    now = time.time()
+    distances = np.sort(rng.uniform(0.5, 0.95, size))
+    distances[0] = 0.1
+    ages_days = rng.uniform(0, 10, size)
+    ages_days[0] = 2
+    strengths = rng.uniform(1, 5, size)
+    strengths[0] = 3
+    metadatas = [
+        {"last_access_time": now - age * 24 * 3600, "memory_strength": float(strength)}
+        for age, strength in zip(ages_days, strengths)
+    ]
+    return metadatas, distances.tolist()
+
+
+def run_benchmark(sizes, n_trials: int, n_results: int) -> dict:
+    rng = np.random.default_rng(0)
+    ranker = MemoryRanker()
+    report = {"n_results": n_results, "sizes": {}}
+
+    for size in sizes:
+        legacy_seconds = ranked_seconds = 0.0
+        legacy_hits = ranked_hits = 0
+
+        for _ in range(n_trials):
+            metadatas, distances = make_candidates(size, rng)
+
+            start_time = time.time()
+            legacy = legacy_rank(metadatas, n_results)
+            legacy_seconds += time.time() - start_time
+
+            start_time = time.time()
+            ranked = ranker.rank("bench", metadatas, distances, n_results)
+            ranked_seconds += time.time() - start_time
+
+            legacy_hits += 0 in legacy
+            ranked_hits += 0 in [r["index"] for r in ranked]
+
+        report["sizes"][str(size)] = {
+            "legacy_ms": legacy_seconds / n_trials * 1000,
+            "ranker_ms": ranked_seconds / n_trials * 1000,
+            "speedup": legacy_seconds / ranked_seconds if ranked_seconds else 0.0,
+            "legacy_relevant_hit_rate": legacy_hits / n_trials,
+            "ranker_relevant_hit_rate": ranked_hits / n_trials
+        }
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--trials", type=int, default=50)
+    parser.add_argument("--n-results", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.sizes, args.trials, args.n_results), indent=2))
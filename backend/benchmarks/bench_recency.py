@@ -0,0 +1,82 @@
+"""
+Benchmark for "most recent N" lookups.
+
+Gives one user histories of increasing length (offline embedders, so no
+model is needed) and compares reading the N newest event summaries through
+the recency index against the previous full scan of the user's summaries
+sorted in Python.
+
+Usage:
+    python benchmarks/bench_recency.py --histories 100 1000 10000 --n 6
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MemoryBank import MemoryBank
+from OfflineEmbedder import HashingEmbeddingFunction, HashingImageEmbedder
+
+
+def median_ms(function, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start_time)
+    return float(np.median(timings) * 1000)
+
+
+def run_benchmark(histories, n: int, repeats: int) -> list:
+    work_dir = tempfile.mkdtemp()
+    results = []
+    for history in histories:
+        memory_bank = MemoryBank(
+            persist_directory=os.path.join(work_dir, f"memory_{history}"),
+            image_directory=os.path.join(work_dir, "images"),
+            text_embedding_function=HashingEmbeddingFunction(),
+            image_embedder=HashingImageEmbedder()
+        )
+        now = time.time()
+        rng = np.random.default_rng(history)
+        memory_bank.add_event_summaries([
+            {"user_id": "user_0", "summary_text": f"Summary of day {i}", "timestamp": now - float(rng.random()) * 1e7}
+            for i in range(history)
+        ])
+        collection = memory_bank.partitions.get("event_summaries", "user_0")
+
+        def full_scan():
+            everything = collection.get(where={"user_id": "user_0"})
+            return sorted(
+                zip(everything["ids"], everything["metadatas"]), key=lambda item: item[1]["timestamp"], reverse=True
+            )[:n]
+
+        def indexed():
+            return memory_bank._recent_memories("event_summaries", "user_0", n, ["documents", "metadatas"])
+
+        assert [item_id for item_id, _ in full_scan()] == indexed()["ids"]
+        scan_ms = median_ms(full_scan, repeats)
+        index_ms = median_ms(indexed, repeats)
+        results.append({
+            "history": history,
+            "n": n,
+            "full_scan_ms": scan_ms,
+            "recency_index_ms": index_ms,
+            "speedup": scan_ms / index_ms if index_ms else 0.0
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--histories", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--n", type=int, default=6, help="Most recent memories read per lookup")
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.histories, args.n, args.repeats), indent=2))
@@ -0,0 +1,108 @@
+"""
+Benchmark for memory snapshots.
+
+Fills a MemoryBank with synthetic conversations (random embeddings, so no
+model is needed), then reports export, memory-map load, per-user search on
+the memory-mapped snapshot and restore into a new store, each with seconds
+per million records, plus the size of the snapshot against the Chroma
+directory.
+
+Usage:
+    python benchmarks/bench_snapshot.py --records 100000 --users 1000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MemoryBank import MemoryBank
+from MemorySnapshot import export_snapshot, load_snapshot, restore_snapshot
+
+
+def directory_bytes(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for directory, _, names in os.walk(path) for name in names
+    )
+
+
+def fill(memory_bank: MemoryBank, n_records: int, n_users: int, dim: int, page_size: int = 5000):
+    rng = np.random.default_rng(0)
+    now = time.time()
+    for start in range(0, n_records, page_size):
+        count = min(page_size, n_records - start)
+        ids = [f"conv_{start + i}" for i in range(count)]
+        metadatas = [
+            {
+                "user_id": f"user_{(start + i) % n_users}",
+                "timestamp": now - (start + i),
+                "last_access_time": now - (start + i),
+                "memory_strength": 1.0,
+                "type": "conversation"
+            }
+            for i in range(count)
+        ]
+        documents = [f"User: synthetic turn {start + i}\nBot: noted." for i in range(count)]
+        embeddings = rng.standard_normal((count, dim)).astype(np.float32)
+        for collection, positions in memory_bank.partitions.group("conversations", [m["user_id"] for m in metadatas]):
+            collection.upsert(
+                ids=[ids[i] for i in positions],
+                embeddings=embeddings[positions],
+                documents=[documents[i] for i in positions],
+                metadatas=[metadatas[i] for i in positions]
+            )
+
+
+def run_benchmark(n_records: int, n_users: int, dim: int, n_queries: int) -> dict:
+    work_dir = tempfile.mkdtemp()
+    source = MemoryBank(persist_directory=os.path.join(work_dir, "source"))
+
+    start_time = time.time()
+    fill(source, n_records, n_users, dim)
+    fill_seconds = time.time() - start_time
+
+    snapshot_directory = os.path.join(work_dir, "snapshot")
+    exported = export_snapshot(source, snapshot_directory)
+
+    start_time = time.time()
+    tables = load_snapshot(snapshot_directory)
+    load_seconds = time.time() - start_time
+
+    # Exact per-user search straight from the memory-mapped matrix
+    rng = np.random.default_rng(1)
+    conversations = tables["conversations"]
+    conversations.user_rows("user_0")
+    start_time = time.time()
+    for _ in range(n_queries):
+        conversations.search(f"user_{rng.integers(n_users)}", rng.standard_normal(dim), n_results=5)
+    search_ms = (time.time() - start_time) * 1000 / n_queries
+
+    replica = MemoryBank(persist_directory=os.path.join(work_dir, "replica"))
+    restored = restore_snapshot(replica, snapshot_directory)
+
+    return {
+        "records": n_records,
+        "fill_seconds": fill_seconds,
+        "chroma_bytes": directory_bytes(os.path.join(work_dir, "source")),
+        "export": exported,
+        "mmap_load_seconds": load_seconds,
+        "mmap_search_ms": search_ms,
+        "restore": restored,
+        "replica_conversations": replica.conversations_collection.count()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.records, args.users, args.dim, args.queries), indent=2))
@@ -0,0 +1,233 @@
+"""
+MemoryBank benchmark suite.
+
+Builds a bank per scale with the deterministic, model-free embedders from
+OfflineEmbedder (nothing is downloaded), fills it with synthetic users,
+conversations, emotional images and event summaries, and measures:
+
+- bulk ingest throughput per kind
+- add_conversation / add_emotional_image latency
+- retrieve_conversations / retrieve_emotional_images / retrieve_event_summaries latency
+- get_prompt_context latency
+- clean_expired_memories time and delete throughput (unthrottled)
+
+Results are written as JSON. With --baseline, every latency and throughput
+is compared against an earlier results file and regressions beyond
+--tolerance are listed (exit code 1).
+
+Usage:
+    python benchmarks/bench_suite.py --scales 1000 10000 100000 --output results.json
+    python benchmarks/bench_suite.py --scales 1000 10000 --baseline results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chromadb
+from MemoryBank import MemoryBank
+from MemoryExpiry import get_memory_sweeper
+from OfflineEmbedder import HashingEmbeddingFunction, HashingImageEmbedder
+
+TOPICS = ["garden", "grandson", "doctor", "cooking", "music", "church", "walk", "weather", "football", "birthday"]
+FEELINGS = ["calm", "happy", "tired", "worried", "excited", "sad"]
+SECONDS_PER_DAY = 24 * 3600
+
+
+def latency(function, calls) -> dict:
+    """p50/p95/mean latency in ms of calling function(*args) for each args in calls."""
+    timings = []
+    for args in calls:
+        start_time = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start_time)
+    return {
+        "calls": len(timings),
+        "p50_ms": float(np.percentile(timings, 50) * 1000),
+        "p95_ms": float(np.percentile(timings, 95) * 1000),
+        "mean_ms": float(np.mean(timings) * 1000)
+    }
+
+
+def synthetic_image(rng) -> Image.Image:
+    return Image.fromarray(rng.integers(0, 255, size=(48, 48, 3), dtype=np.uint8))
+
+
+def ingest(memory_bank: MemoryBank, kind: str, count: int, n_users: int, history_days: float,
+           rng, chunk_size: int) -> dict:
+    """Write count synthetic memories of one kind in chunks and time it."""
+    now = time.time()
+    writers = {
+        "conversations": memory_bank.add_conversations,
+        "emotional_images": memory_bank.add_emotional_images,
+        "event_summaries": memory_bank.add_event_summaries
+    }
+
+    elapsed = 0.0
+    for start in range(0, count, chunk_size):
+        items = []
+        for i in range(start, min(start + chunk_size, count)):
+            user_id = f"user_{i % n_users}"
+            topic = TOPICS[int(rng.integers(len(TOPICS)))]
+            item = {"user_id": user_id, "timestamp": now - float(rng.random()) * history_days * SECONDS_PER_DAY}
+            if kind == "conversations":
+                item["conversation_text"] = f"User: Let me tell you about the {topic} ({i}).\nBot: I'd love to hear it."
+            elif kind == "emotional_images":
+                item["image"] = synthetic_image(rng)
+                item["emotion_description"] = f"The user looks {FEELINGS[i % len(FEELINGS)]} talking about the {topic}"
+            else:
+                item["summary_text"] = f"The user spent the week busy with the {topic} and felt {FEELINGS[i % len(FEELINGS)]}."
+            items.append(item)
+
+        start_time = time.perf_counter()
+        writers[kind](items)
+        elapsed += time.perf_counter() - start_time
+
+    return {"count": count, "seconds": elapsed, "items_per_second": count / elapsed if elapsed else 0.0}
+
+
+def run_scale(work_dir: str, scale: int, args) -> dict:
+    rng = np.random.default_rng(scale)
+    sampler = random.Random(scale)
+    n_users = max(1, scale // args.items_per_user)
+    n_images = int(scale * args.images_ratio)
+    n_summaries = int(scale * args.summaries_ratio)
+
+    memory_bank = MemoryBank(
+        persist_directory=os.path.join(work_dir, f"memory_{scale}"),
+        image_directory=os.path.join(work_dir, f"images_{scale}"),
+        text_embedding_function=HashingEmbeddingFunction(),
+        image_embedder=HashingImageEmbedder()
+    )
+
+    result = {"scale": scale, "users": n_users, "images": n_images, "summaries": n_summaries}
+    result["ingest"] = {
+        "conversations": ingest(memory_bank, "conversations", scale, n_users, args.history_days, rng, args.chunk_size),
+        "emotional_images": ingest(memory_bank, "emotional_images", n_images, n_users, args.history_days, rng, 32),
+        "event_summaries": ingest(memory_bank, "event_summaries", n_summaries, n_users, args.history_days, rng,
+                                  args.chunk_size)
+    }
+
+    def random_user():
+        return f"user_{sampler.randrange(n_users)}"
+
+    def random_query():
+        return f"How was the {sampler.choice(TOPICS)}?"
+
+    samples = args.samples
+    result["add_conversation"] = latency(memory_bank.add_conversation, [
+        (random_user(), f"User: One more thing about the {sampler.choice(TOPICS)}.\nBot: Go on.") for _ in range(samples)
+    ])
+    result["add_emotional_image"] = latency(memory_bank.add_emotional_image, [
+        (random_user(), synthetic_image(rng), f"The user looks {sampler.choice(FEELINGS)}") for _ in range(samples // 4 or 1)
+    ])
+    result["retrieve_conversations"] = latency(memory_bank.retrieve_conversations, [
+        (random_user(), random_query()) for _ in range(samples)
+    ])
+    result["retrieve_emotional_images"] = latency(memory_bank.retrieve_emotional_images, [
+        (random_user(), random_query()) for _ in range(samples)
+    ])
+    result["retrieve_event_summaries"] = latency(memory_bank.retrieve_event_summaries, [
+        (random_user(), random_query()) for _ in range(samples)
+    ])
+    result["get_prompt_context"] = latency(memory_bank.get_prompt_context, [
+        (random_user(), random_query()) for _ in range(samples)
+    ])
+
+    # Raw sweep throughput, without the production delete rate limit
+    get_memory_sweeper(memory_bank).max_deletes_per_second = 0
+    start_time = time.perf_counter()
+    swept = memory_bank.clean_expired_memories(args.threshold)
+    elapsed = time.perf_counter() - start_time
+    result["clean_expired_memories"] = {
+        "seconds": elapsed,
+        "checked": swept["checked"],
+        "deleted": swept["deleted"],
+        "deleted_per_second": swept["deleted"] / elapsed if elapsed else 0.0
+    }
+
+    print(f"Scale {scale}: done", file=sys.stderr)
+    return result
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Metrics that got worse than the baseline by more than tolerance."""
+    regressions = []
+    previous = {str(r["scale"]): r for r in baseline["scales"]}
+    for current in results["scales"]:
+        before = previous.get(str(current["scale"]))
+        if before is None:
+            continue
+        for name, metrics in current.items():
+            if not isinstance(metrics, dict) or name not in before:
+                continue
+            pairs = [(f"{name}.{key}", metrics.get(key), before[name].get(key)) for key in ("p50_ms", "p95_ms", "seconds")]
+            pairs += [(f"{name}.{kind}.items_per_second", -metrics[kind]["items_per_second"],
+                       -before[name][kind]["items_per_second"]) for kind in metrics if isinstance(metrics[kind], dict)]
+            for metric, now_value, old_value in pairs:
+                if now_value is None or old_value is None or old_value == 0:
+                    continue
+                # Lower is better (throughputs are negated)
+                ratio = now_value / old_value if old_value > 0 else old_value / now_value
+                if ratio > 1.0 + tolerance:
+                    regressions.append({"scale": current["scale"], "metric": metric, "ratio": ratio})
+    return regressions
+
+
+def run_suite(args) -> dict:
+    work_dir = tempfile.mkdtemp()
+    return {
+        "created": time.time(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "chromadb": chromadb.__version__,
+            "cpu_count": os.cpu_count()
+        },
+        "config": {
+            "items_per_user": args.items_per_user,
+            "images_ratio": args.images_ratio,
+            "summaries_ratio": args.summaries_ratio,
+            "history_days": args.history_days,
+            "samples": args.samples,
+            "threshold": args.threshold
+        },
+        "scales": [run_scale(work_dir, scale, args) for scale in args.scales]
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Conversations per run (e.g. up to 1000000)")
+    parser.add_argument("--items-per-user", type=int, default=100)
+    parser.add_argument("--images-ratio", type=float, default=0.02, help="Images per conversation")
+    parser.add_argument("--summaries-ratio", type=float, default=0.05, help="Summaries per conversation")
+    parser.add_argument("--history-days", type=float, default=30.0)
+    parser.add_argument("--samples", type=int, default=200, help="Calls per latency measurement")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Forgetting threshold for the sweep")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--output", default="bench_suite_results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before a metric is flagged")
+    args = parser.parse_args()
+
+    results = run_suite(args)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            results["regressions"] = compare(results, json.load(f), args.tolerance)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if results.get("regressions"):
+        sys.exit(1)
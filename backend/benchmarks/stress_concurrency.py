@@ -0,0 +1,187 @@
+"""
+Concurrency stress test for the dual response pipeline.
+
+Runs many conversations in parallel through analyze_with_dual_response (the
+entry point app.py uses) against a local fake Ollama server, and checks that
+no request sees another request's question, user or memory. The CrewAI crew
+is replaced by a stub that calls the request's tool once, since the fake
+server cannot drive an agent loop; everything below the crew is real.
+
+Usage:
+    python benchmarks/stress_concurrency.py --users 8 --turns 6 --workers 16 [--partitioning user]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUESTION_PATTERN = re.compile(r"USER QUESTION: (.*)")
+USER_PATTERN = re.compile(r"- User Name: (.*)")
+
+# Shared by every user on purpose, so they go through the answer cache
+CACHEABLE_QUESTIONS = ["Where is France?", "What is the capital of Peru?"]
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Echoes the question (and user, when the prompt has one) after a small delay."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body.get("prompt", "")
+        question = QUESTION_PATTERN.search(prompt)
+        user = USER_PATTERN.search(prompt)
+
+        echo = question.group(1).strip() if question else ""
+        if user:
+            echo += f"|{user.group(1).strip()}"
+
+        # Widen the window for interleaving between requests
+        time.sleep(0.01)
+
+        payload = json.dumps({"response": f"ECHO[{echo}]"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# The fake server must be up before Inference reads OLLAMA_BASE_URL
+server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+
+import Inference
+from MemoryBank import MemoryBank
+
+_request = threading.local()
+_create_dual_response_tool = Inference.create_dual_response_tool
+
+
+def _recording_create_dual_response_tool(analyzer, user_question, user_id="default_user"):
+    tool = _create_dual_response_tool(analyzer, user_question, user_id)
+    _request.tool = tool
+    return tool
+
+
+class StubCrew:
+    """Stands in for crewai.Crew: runs the request's tool once on the frame."""
+
+    def __init__(self, agents, tasks, **kwargs):
+        self.tasks = tasks
+
+    def kickoff(self):
+        return _request.tool.func(_request.image_path)
+
+
+Inference.create_dual_response_tool = _recording_create_dual_response_tool
+Inference.Crew = StubCrew
+
+
+def question_for(user_index: int, turn: int) -> str:
+    if turn % 2 == 0:
+        return CACHEABLE_QUESTIONS[(turn // 2) % len(CACHEABLE_QUESTIONS)]
+    return f"How was turn {turn} for user {user_index}?"
+
+
+def run_stress_test(n_users: int, n_turns: int, n_workers: int, partitioning: str = "shared") -> dict:
+    work_dir = tempfile.mkdtemp()
+
+    memory_bank = MemoryBank(persist_directory=os.path.join(work_dir, "memory"), partitioning=partitioning)
+
+    def run_turn(user_index: int, turn: int):
+        user_id = f"stress_user_{user_index}"
+        question = question_for(user_index, turn)
+
+        # A different scene every turn, so personal turns always run visual analysis
+        image_path = os.path.join(work_dir, f"frame_{user_index}_{turn}.png")
+        rng = np.random.default_rng(user_index * 1000 + turn)
+        Image.fromarray(rng.integers(0, 255, size=(480, 640, 3), dtype=np.uint8)).save(image_path)
+
+        _request.image_path = image_path
+        output = str(Inference.analyze_with_dual_response(
+            image_path, question, user_id=user_id, memory_bank=memory_bank
+        ))
+
+        # Cacheable answers are generated without user context, personal ones with it
+        cacheable = question in CACHEABLE_QUESTIONS
+        expected_answer = f"ECHO[{question}]" if cacheable else f"ECHO[{question}|{user_id}]"
+
+        errors = []
+        if f"USER QUESTION: {question}" not in output:
+            errors.append("tool reported another request's question")
+        if expected_answer not in output:
+            errors.append("direct answer built for another request")
+        return user_id, errors
+
+    jobs = [(u, t) for t in range(n_turns) for u in range(n_users)]
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        results = list(executor.map(lambda job: run_turn(*job), jobs))
+    elapsed = time.time() - start_time
+
+    errors = [(user_id, e) for user_id, errs in results for e in errs]
+
+    # Memory writes are acknowledged before they are stored
+    if not memory_bank.memory_writer.flush(timeout=60):
+        errors.append(("memory_writer", "write-behind queue did not drain"))
+
+    # Personal turns call get_prompt_context twice (direct answer + visual
+    # analysis). Cacheable turns skip it: their answer has no user context
+    # and the visual analysis is routed away for general knowledge questions.
+    personal_turns = sum(1 for t in range(n_turns) if question_for(0, t) not in CACHEABLE_QUESTIONS)
+    expected_sessions = 2 * personal_turns
+    expected_counts = {"conversations": n_turns, "emotional images": personal_turns}
+    for u in range(n_users):
+        user_id = f"stress_user_{u}"
+
+        sessions = memory_bank.increment_session_count(user_id) - 1
+        if sessions != expected_sessions:
+            errors.append((user_id, f"session count {sessions}, expected {expected_sessions}"))
+
+        stored = {
+            "conversations": memory_bank.partitions.get("conversations", user_id).get(where={"user_id": user_id}),
+            "emotional images": memory_bank.partitions.get("emotional_images", user_id).get(where={"user_id": user_id})
+        }
+        for kind, result in stored.items():
+            if len(result["ids"]) != expected_counts[kind]:
+                errors.append((user_id, f"{len(result['ids'])} {kind} stored, expected {expected_counts[kind]}"))
+
+    server.shutdown()
+
+    return {
+        "requests": len(jobs),
+        "workers": n_workers,
+        "elapsed_seconds": elapsed,
+        "requests_per_second": len(jobs) / elapsed if elapsed else 0.0,
+        "answer_cache": memory_bank.dual_analyzer.answer_cache.get_stats(),
+        "memory_writer": memory_bank.memory_writer.get_stats(),
+        "visual_routes": memory_bank.dual_analyzer.visual_route_counts,
+        "errors": errors
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--partitioning", choices=["shared", "user", "bucket"], default="shared")
+    args = parser.parse_args()
+
+    report = run_stress_test(args.users, args.turns, args.workers, args.partitioning)
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report["errors"] else 0)
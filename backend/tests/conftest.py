@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from MemoryBank import MemoryBank
+from OfflineEmbedder import HashingEmbeddingFunction, HashingImageEmbedder
+
+
+@pytest.fixture
+def make_bank(tmp_path):
+    """Factory for banks in a temporary directory using the model-free embedders."""
+    def make(name: str = "memory", **kwargs):
+        kwargs.setdefault("text_embedding_function", HashingEmbeddingFunction())
+        kwargs.setdefault("image_embedder", HashingImageEmbedder())
+        return MemoryBank(
+            persist_directory=str(tmp_path / name),
+            image_directory=str(tmp_path / "images"),
+            **kwargs
+        )
+    return make
@@ -0,0 +1,13 @@
+from AnswerCache import SemanticAnswerCache
+from ForgettingSimulator import SimulatedClock
+
+
+def test_answers_expire_on_the_injected_clock():
+    clock = SimulatedClock(1.7e9)
+    cache = SemanticAnswerCache(lambda texts: [[1.0, 0.0] for _ in texts], ttl_seconds=3600, clock=clock)
+
+    cache.store("What is the capital of France?", "Paris")
+    assert cache.lookup("What is the capital of France?")["answer"] == "Paris"
+
+    clock.advance(seconds=3601)
+    assert cache.lookup("What is the capital of France?")["answer"] is None
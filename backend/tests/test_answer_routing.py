@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("crewai")
+
+from Inference import DualResponseContextualAnalyzer
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def json(self):
+        return {"response": self.text}
+
+
+@pytest.fixture
+def analyzer(make_bank, monkeypatch):
+    answers = iter(f"answer {n}" for n in range(100))
+    monkeypatch.setattr("Inference.requests.post", lambda *args, **kwargs: FakeResponse(next(answers)))
+    analyzer = DualResponseContextualAnalyzer(memory_bank=make_bank())
+    yield analyzer
+    analyzer.memory_writer.close()
+
+
+def test_questions_about_the_frame_bypass_the_answer_cache(analyzer):
+    question = "What color is the shirt in front of the camera?"
+    assert not analyzer._is_cacheable_question(question)
+
+    first = analyzer.generate_direct_answer(question, "alice")
+    second = analyzer.generate_direct_answer(question, "alice")
+    assert first != second
+    assert analyzer.answer_cache.get_stats()["entries"] == 0
+
+
+def test_general_knowledge_questions_are_cached(analyzer):
+    question = "What is the capital of France?"
+    assert analyzer._is_cacheable_question(question)
+
+    first = analyzer.generate_direct_answer(question, "alice")
+    assert analyzer.generate_direct_answer(question, "bob") == first
+    assert analyzer.answer_cache.get_stats()["hits"] == 1
@@ -0,0 +1,57 @@
+from ForgettingSimulator import SimulatedClock
+from MemoryConsolidator import get_memory_consolidator
+from MemoryExpiry import get_memory_sweeper
+
+
+def add_day_of_conversations(bank, user_id: str, count: int = 4):
+    bank.add_conversations([
+        {"user_id": user_id, "conversation_text": f"User: I watered the garden ({i}).\nBot: Lovely."}
+        for i in range(count)
+    ])
+
+
+def test_consolidation_age_precedes_expiry(make_bank):
+    bank = make_bank()
+    consolidator = get_memory_consolidator(bank)
+    untouched_lifetime = bank.expiry_index.projected_expiry(0.0, bank.default_memory_strength)
+    assert 0 < consolidator.min_age_seconds() < untouched_lifetime
+
+
+def test_sweeper_leaves_expired_conversations_to_consolidator(make_bank):
+    clock = SimulatedClock(1.7e9)
+    bank = make_bank(clock=clock)
+    consolidator = get_memory_consolidator(bank)
+    consolidator.max_summaries_per_minute = 0
+    consolidator._summarize = lambda prompt: "The user spent the day in the garden."
+    sweeper = get_memory_sweeper(bank)
+    sweeper.max_deletes_per_second = 0
+
+    add_day_of_conversations(bank, "alice")
+    # Past the expiry horizon of untouched memories (ln(10) days at strength 1)
+    clock.advance(days=3)
+
+    swept = sweeper.sweep_once()
+    assert swept["deleted"] == 0
+    assert swept["deferred"] == 4
+    assert bank.conversations_collection.count() == 4
+
+    run = consolidator.run_once()
+    assert run["archived"] == 4
+    assert bank.conversations_collection.count() == 0
+    # The summary starts a fresh forgetting curve instead of inheriting the sources' age
+    assert sweeper.sweep_once()["deleted"] == 0
+    summaries = bank.retrieve_event_summaries("alice", n_results=3)
+    assert [s["text"] for s in summaries] == ["The user spent the day in the garden."]
+
+
+def test_sweeper_deletes_without_consolidator(make_bank):
+    clock = SimulatedClock(1.7e9)
+    bank = make_bank(clock=clock)
+    sweeper = get_memory_sweeper(bank)
+    sweeper.max_deletes_per_second = 0
+
+    add_day_of_conversations(bank, "alice")
+    clock.advance(days=3)
+
+    assert sweeper.sweep_once()["deleted"] == 4
+    assert bank.conversations_collection.count() == 0
@@ -0,0 +1,31 @@
+import numpy as np
+
+from HotMemoryTier import HotMemoryTier
+
+
+def _loader(ids):
+    return lambda limit: (ids, ["text"] * len(ids), [{}] * len(ids), np.ones((len(ids), 4)), True)
+
+
+def test_writes_to_unloaded_users_leave_no_state_behind():
+    tier = HotMemoryTier()
+    for i in range(1000):
+        tier.add("conversations", f"user{i}", [f"m{i}"], ["text"], [{}], np.ones((1, 4)))
+        tier.invalidate(f"user{i}")
+    assert tier._generations == {} and tier._loading == {}
+
+
+def test_load_racing_a_write_is_not_kept():
+    tier = HotMemoryTier()
+
+    def racing_loader(limit):
+        # A write lands while the user's memories are being read
+        tier.add("conversations", "alice", ["new"], ["text"], [{}], np.ones((1, 4)))
+        return _loader(["old"])(limit)
+
+    tier.search("conversations", "alice", np.ones(4), 1, 1, racing_loader)
+    assert ("alice", "conversations") not in tier._entries
+    assert tier._generations == {} and tier._loading == {}
+
+    tier.search("conversations", "alice", np.ones(4), 1, 1, _loader(["old", "new"]))
+    assert ("alice", "conversations") in tier._entries
@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+from PIL import Image
+
+from ForgettingSimulator import SimulatedClock
+from MemoryExpiry import get_memory_sweeper
+
+
+def noise_image(seed: int) -> Image.Image:
+    pixels = np.random.default_rng(seed).integers(0, 256, (64, 64, 3), dtype=np.uint8)
+    return Image.fromarray(pixels)
+
+
+def test_sweeper_removes_image_files_no_memory_points_at(make_bank):
+    clock = SimulatedClock(1.7e9)
+    bank = make_bank(clock=clock)
+    bank.image_store.grace_seconds = 0
+    sweeper = get_memory_sweeper(bank)
+    sweeper.max_deletes_per_second = 0
+
+    shared_id = bank.add_emotional_image("alice", noise_image(1), "smiling")
+    alone_id = bank.add_emotional_image("alice", noise_image(2), "frowning")
+    images = bank.partitions.get("emotional_images", "alice").get(ids=[shared_id, alone_id])["metadatas"]
+    shared_path, alone_path = (metadata["image_path"] for metadata in images)
+
+    # Bob stores the same frame later; it shares Alice's file
+    clock.advance(days=3)
+    bank.add_emotional_image("bob", noise_image(1), "smiling too")
+
+    assert sweeper.sweep_once()["deleted"] == 2
+    assert os.path.exists(shared_path)
+    assert not os.path.exists(alone_path)
+    assert bank.get_image_storage_stats()["removed"] == 1
+
+    clock.advance(days=3)
+    assert sweeper.sweep_once()["deleted"] == 1
+    assert not os.path.exists(shared_path)
+    assert bank.get_image_storage_stats()["files"] == 0
@@ -0,0 +1,46 @@
+import json
+
+from ForgettingSimulator import SimulatedClock
+from MemoryWriter import MemoryWriter
+
+
+def test_bad_record_is_dead_lettered_without_blocking_later_writes(make_bank):
+    bank = make_bank()
+    writer = MemoryWriter(bank, flush_interval=0.2, retry_delay=0.01, max_retries=2)
+
+    good_before = writer.submit_conversation("alice", "I planted tomatoes today")
+    # Chroma rejects nested metadata values, so this record can never be stored
+    bad = writer.submit_conversation("alice", "broken", metadata={"nested": {"a": 1}})
+    good_after = writer.submit_conversation("alice", "The tomatoes are sprouting")
+    assert writer.flush(timeout=30)
+    writer.close()
+
+    stored = bank.partitions.get("conversations", "alice").get(ids=[good_before, bad, good_after])["ids"]
+    assert sorted(stored) == sorted([good_before, good_after])
+    assert writer.get_stats()["dead_letters"] == 1
+
+    with open(writer.dead_letter_path, encoding="utf-8") as f:
+        letters = [json.loads(line) for line in f]
+    assert [letter["record"]["id"] for letter in letters] == [bad]
+    assert letters[0]["error"]
+
+    # The journal moved past the bad record, so a restart does not replay it
+    restarted = MemoryWriter(bank, retry_delay=0.01, max_retries=2)
+    assert restarted.replayed == 0
+    restarted.close()
+
+
+def test_writes_are_timestamped_by_the_bank_clock(make_bank):
+    clock = SimulatedClock(1.7e9)
+    bank = make_bank(clock=clock)
+    writer = MemoryWriter(bank, flush_interval=0.05)
+
+    memory_id = writer.submit_conversation("alice", "We talked about the garden")
+    assert writer.flush(timeout=30)
+    metadata = bank.partitions.get("conversations", "alice").get(ids=[memory_id])["metadatas"][0]
+    assert metadata["timestamp"] == metadata["last_access_time"] == 1.7e9
+
+    # Forgotten on the simulated timeline, not the wall clock
+    clock.advance(days=30)
+    assert bank._calculate_memory_score(metadata["last_access_time"], metadata["memory_strength"]) < 0.01
+    writer.close()
@@ -0,0 +1,35 @@
+import gc
+import weakref
+
+from MemoryBank import MemoryBank
+from ModelRegistry import get_model_registry
+
+
+def test_last_bank_releases_clip(make_bank):
+    registry = get_model_registry()
+    first = make_bank("first", image_embedder=None)
+    second = make_bank("second", image_embedder=None)
+    key = first._clip_key
+    assert registry.get_stats()["models"][key]["refs"] == 2
+
+    # Loading must not make the registry hold on to a bank
+    registry._entries[key]["model"] = ("processor", "model")
+
+    collected = weakref.ref(first)
+    del first
+    gc.collect()
+    assert collected() is None
+    assert registry.get_stats()["models"][key]["refs"] == 1
+
+    entry = registry._entries[key]
+    del second
+    gc.collect()
+    assert key not in registry.get_stats()["models"]
+    assert entry["model"] is None
+
+
+def test_clip_loader_does_not_reference_the_bank(make_bank):
+    bank = make_bank(image_embedder=None)
+    loader = get_model_registry()._entries[bank._clip_key]["loader"]
+    assert loader.func is MemoryBank._load_clip
+    assert bank not in gc.get_referents(loader)
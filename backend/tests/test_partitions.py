@@ -0,0 +1,32 @@
+import chromadb
+
+from MemoryPartitions import MemoryPartitions, migrate_partitions, read_partition_layout
+
+
+def test_migration_between_overlapping_bucket_counts(make_bank):
+    bank = make_bank(partitioning="bucket", partition_buckets=4)
+    ids = bank.add_conversations([
+        {"user_id": f"user{i}", "conversation_text": f"user{i} talked about topic {n}"}
+        for i in range(24) for n in range(3)
+    ])
+    persist_directory = bank.persist_directory
+
+    # Buckets 0-2 exist in both layouts, so items move in and out of them while they are paged
+    result = migrate_partitions(persist_directory, "bucket", buckets=3, page_size=5)
+    assert read_partition_layout(persist_directory) == {"mode": "bucket", "buckets": 3}
+    assert result["moved"]["conversations"] > 0
+
+    client = chromadb.PersistentClient(path=persist_directory)
+    target = MemoryPartitions(client, {}, "bucket", 3)
+    stored = {}
+    for collection in client.list_collections():
+        if target.kind_of(collection.name) != "conversations":
+            continue
+        assert collection.name != "conversations__b0003"
+        items = client.get_collection(collection.name).get(include=["metadatas"])
+        for memory_id, metadata in zip(items["ids"], items["metadatas"]):
+            # No stale duplicate is left behind, and every memory is in its user's bucket
+            assert memory_id not in stored
+            assert collection.name == target.name("conversations", metadata["user_id"])
+            stored[memory_id] = collection.name
+    assert sorted(stored) == sorted(ids)
@@ -0,0 +1,50 @@
+import sqlite3
+
+from ForgettingSimulator import SimulatedClock
+from PortraitEngine import PortraitEngine
+from RecencyIndex import RecencyIndex
+
+
+def test_memories_with_older_timestamps_are_folded_in(make_bank):
+    clock = SimulatedClock(1.7e9)
+    bank = make_bank(clock=clock)
+    engine = PortraitEngine(bank, min_new_memories=1, max_updates_per_minute=0)
+    prompts = []
+    engine._generate = lambda prompt: prompts.append(prompt) or f"Portrait {len(prompts)}"
+
+    bank.add_conversations([{"user_id": "alice", "conversation_text": "Alice adopted a cat"}])
+    assert engine.update_user("alice")["version"] == 1
+
+    # Imported a day late, with its original timestamp
+    clock.advance(seconds=60)
+    bank.add_conversations([{
+        "user_id": "alice", "conversation_text": "Alice went hiking last week", "timestamp": clock() - 86400
+    }])
+    assert engine.run_once()["updated"] == 1
+    assert "went hiking" in prompts[-1] and "adopted a cat" not in prompts[-1]
+
+    # Nothing new since the last version
+    assert engine.run_once()["users"] == 0
+
+
+def test_existing_index_gets_sequences_in_timestamp_order(tmp_path):
+    path = str(tmp_path / "recency.sqlite3")
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE recency (kind TEXT NOT NULL, memory_id TEXT NOT NULL, user_id TEXT NOT NULL, "
+            "timestamp REAL NOT NULL, PRIMARY KEY (kind, memory_id)) WITHOUT ROWID"
+        )
+        connection.execute(
+            "CREATE TABLE user_activity (user_id TEXT PRIMARY KEY, last_timestamp REAL NOT NULL)"
+        )
+        connection.executemany("INSERT INTO recency VALUES (?, ?, ?, ?)", [
+            ("conversations", "b", "alice", 2.0), ("conversations", "a", "alice", 1.0)
+        ])
+        connection.execute("INSERT INTO user_activity VALUES ('alice', 2.0)")
+
+    index = RecencyIndex(path)
+    assert index.since("conversations", "alice", 0, 10) == [("a", 1), ("b", 2)]
+    index.add("conversations", ["c"], [{"user_id": "alice", "timestamp": 0.5}])
+    assert index.since("conversations", "alice", 2, 10) == [("c", 3)]
+    assert index.user_activity() == {"alice": 3}
+    index.close()
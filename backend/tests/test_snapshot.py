@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+from MemoryBank import load_existing_memory
+from MemorySnapshot import export_snapshot, read_restore_state
+
+
+def test_interrupted_restore_is_resumed(make_bank, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    bank = make_bank()
+    bank.add_conversations([
+        {"user_id": "alice", "conversation_text": f"Conversation number {n}"} for n in range(5)
+    ])
+    snapshot_directory = str(tmp_path / "snapshot")
+    export_snapshot(bank, snapshot_directory)
+    replica_directory = str(tmp_path / "replica")
+
+    def interrupted(memory_bank, directory):
+        raise RuntimeError("killed mid-restore")
+
+    with monkeypatch.context() as patched:
+        patched.setattr("MemoryBank.restore_snapshot", interrupted)
+        with pytest.raises(RuntimeError):
+            load_existing_memory(replica_directory, snapshot_directory=snapshot_directory)
+
+    # The bank already created its ChromaDB files, but the restore is still pending
+    assert os.path.exists(os.path.join(replica_directory, "chroma.sqlite3"))
+    assert read_restore_state(replica_directory)["complete"] is False
+    with pytest.raises(ValueError):
+        load_existing_memory(replica_directory)
+
+    replica = load_existing_memory(replica_directory, snapshot_directory=snapshot_directory)
+    assert replica.partitions.get("conversations", "alice").count() == 5
+    assert read_restore_state(replica_directory)["complete"] is True